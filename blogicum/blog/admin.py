@@ -1,10 +1,68 @@
 """Module of blog app admin panel."""
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.auth import get_permission_codename, get_user_model
+from django.contrib.auth.admin import UserAdmin
 
-from .models import Category, Comment, Location, Post, Profanity
+from .deletion import delete_post, delete_user, dependent_counts
+from .models import (ArchivedComment, ArchivedPost, Category, Comment,
+                     ImageJob, Location, MediaFile, Post, Profanity)
 
+User = get_user_model()
+
+
+class BatchDeletionMixin:
+    """
+    Admin mixin deleting objects through the batched deletion service.
+
+    The confirmation page of objects with many dependent rows lists
+    counts instead of collecting every row into memory.
+    """
+
+    delete_function = None
+
+    def delete_model(self, request, obj):
+        self.delete_function(obj)
+
+    def delete_queryset(self, request, queryset):
+        for obj in queryset.iterator():
+            self.delete_function(obj)
+
+    def get_deleted_objects(self, objs, request):
+        counts = {}
+        for obj in objs:
+            for name, count in dependent_counts(obj).items():
+                counts[name] = counts.get(name, 0) + count
+        if sum(counts.values()) <= settings.DELETION_BATCH_SIZE:
+            return super().get_deleted_objects(objs, request)
+        perms_needed = set()
+        for model in (Post, Comment, ArchivedPost, ArchivedComment):
+            opts = model._meta
+            codename = get_permission_codename('delete', opts)
+            if (counts.get(opts.verbose_name_plural) and not
+                    request.user.has_perm(f'{opts.app_label}.{codename}')):
+                perms_needed.add(opts.verbose_name)
+        counts[self.model._meta.verbose_name_plural] = len(objs)
+        summary = [f'{name}: {count}' for name, count in counts.items()]
+        return summary, counts, perms_needed, []
+
+
+@admin.register(Post)
+class PostAdmin(BatchDeletionMixin, admin.ModelAdmin):
+    delete_function = staticmethod(delete_post)
+
+
+class BlogUserAdmin(BatchDeletionMixin, UserAdmin):
+    delete_function = staticmethod(delete_user)
+
+
+admin.site.unregister(User)
+admin.site.register(User, BlogUserAdmin)
+admin.site.register(ArchivedComment)
+admin.site.register(ArchivedPost)
 admin.site.register(Category)
 admin.site.register(Comment)
+admin.site.register(ImageJob)
 admin.site.register(Location)
-admin.site.register(Post)
+admin.site.register(MediaFile)
 admin.site.register(Profanity)
@@ -8,3 +8,15 @@ class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
     verbose_name = 'Блог'
+
+    def ready(self):
+        """Connect signal handlers."""
+        from django.db.models.signals import post_init, post_migrate
+
+        from . import signals
+        from .models import Post
+
+        post_migrate.connect(signals.repair_search_index, sender=self)
+        post_init.disconnect(
+            Post.image.field.update_dimension_fields, sender=Post
+        )
@@ -0,0 +1,59 @@
+"""Moving old posts and their comments out of the hot tables."""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+from .signals import keep_images
+
+ARCHIVED_POST_FIELDS: tuple = (
+    'id', 'is_published', 'created_at', 'title', 'text', 'pub_date',
+    'author_id', 'location_id', 'category_id', 'image', 'image_width',
+    'image_height', 'image_renditions',
+)
+
+ARCHIVED_COMMENT_FIELDS: tuple = (
+    'id', 'is_published', 'created_at', 'text', 'post_id', 'author_id',
+)
+
+
+def archive_cutoff(days: int = None):
+    """Return the publication date before which posts are archived."""
+    if days is None:
+        days = settings.ARCHIVE_POSTS_AFTER_DAYS
+    return timezone.now() - timedelta(days=days)
+
+
+def archive_batch(cutoff, batch_size: int) -> tuple:
+    """
+    Move up to batch_size posts published before cutoff to the archive.
+
+    Posts keep their ids, so links to them stay valid. Returns the
+    numbers of moved posts and comments; nothing is left to move when
+    no posts were moved.
+    """
+    with transaction.atomic():
+        posts = list(
+            Post.objects.filter(pub_date__lt=cutoff).order_by(
+                'pub_date'
+            ).values(*ARCHIVED_POST_FIELDS)[:batch_size]
+        )
+        if not posts:
+            return 0, 0
+        ids = [post['id'] for post in posts]
+        comments = Comment.objects.filter(post_id__in=ids)
+        archived_comments = [
+            ArchivedComment(**comment)
+            for comment in comments.values(*ARCHIVED_COMMENT_FIELDS)
+        ]
+        ArchivedPost.objects.bulk_create(
+            ArchivedPost(**post) for post in posts
+        )
+        ArchivedComment.objects.bulk_create(archived_comments)
+        comments.delete()
+        # Images now belong to the archived copies.
+        with keep_images():
+            Post.objects.filter(pk__in=ids).delete()
+    return len(posts), len(archived_comments)
@@ -0,0 +1,78 @@
+"""Deleting users and posts with many dependent rows in batches."""
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Model, QuerySet
+
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+
+logger = logging.getLogger(__name__)
+
+
+def delete_in_batches(queryset: QuerySet, batch_size: int = None,
+                      progress=None) -> int:
+    """
+    Delete rows of a queryset in chunks, each in its own transaction.
+
+    Other writers get the database between chunks, so a large delete
+    never holds the SQLite write lock for long. progress is called
+    with the model and the number of rows deleted so far.
+    """
+    batch_size = batch_size or settings.DELETION_BATCH_SIZE
+    model = queryset.model
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            ids = list(
+                queryset.order_by('pk').values_list('pk', flat=True)[
+                    :batch_size
+                ]
+            )
+            if not ids:
+                break
+            model.objects.filter(pk__in=ids).delete()
+        deleted += len(ids)
+        logger.info('Deleted %s %s', deleted, model._meta.verbose_name_plural)
+        if progress:
+            progress(model, deleted)
+    return deleted
+
+
+def delete_post(post: Post, batch_size: int = None, progress=None) -> None:
+    """Delete a post after its comments."""
+    delete_in_batches(post.comments.all(), batch_size, progress)
+    post.delete()
+
+
+def delete_user(user: Model, batch_size: int = None, progress=None) -> None:
+    """Delete a user after their posts and every comment they touch."""
+    for queryset in (
+        Comment.objects.filter(author=user),
+        Comment.objects.filter(post__author=user),
+        Post.objects.filter(author=user),
+        ArchivedComment.objects.filter(author=user),
+        ArchivedComment.objects.filter(post__author=user),
+        ArchivedPost.objects.filter(author=user),
+    ):
+        delete_in_batches(queryset, batch_size, progress)
+    user.delete()
+
+
+def dependent_counts(obj: Model) -> dict:
+    """Count rows deleted together with a post or a user."""
+    if isinstance(obj, Post):
+        querysets = (obj.comments.all(),)
+    else:
+        querysets = (
+            Post.objects.filter(author=obj),
+            Comment.objects.filter(author=obj)
+            | Comment.objects.filter(post__author=obj),
+            ArchivedPost.objects.filter(author=obj),
+            ArchivedComment.objects.filter(author=obj)
+            | ArchivedComment.objects.filter(post__author=obj),
+        )
+    return {
+        queryset.model._meta.verbose_name_plural: queryset.count()
+        for queryset in querysets
+    }
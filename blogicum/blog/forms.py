@@ -11,6 +11,16 @@ User = get_user_model()
 class PostForm(forms.ModelForm):
     """Post creation form."""
 
+    def __init__(self, *args, upload_errors=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.upload_errors = upload_errors or {}
+
+    def clean_image(self):
+        """Report an image rejected while it was uploaded."""
+        if 'image' in self.upload_errors:
+            raise forms.ValidationError(self.upload_errors['image'])
+        return self.cleaned_data['image']
+
     class Meta:
         """Inner Meta class of Post creation form."""
 
@@ -0,0 +1,159 @@
+"""Post image renditions in modern formats."""
+import hashlib
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+RENDITIONS_DIR: str = 'renditions'
+
+WEBP: str = 'webp'
+
+EXTENSIONS: dict = {'webp': 'webp', 'jpeg': 'jpg', 'png': 'png'}
+
+
+def describe_file(file) -> tuple:
+    """Return size in bytes and SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    size = 0
+    file.seek(0)
+    for chunk in file.chunks():
+        digest.update(chunk)
+        size += len(chunk)
+    file.seek(0)
+    return size, digest.hexdigest()
+
+
+def has_alpha(image: Image.Image) -> bool:
+    """Check whether an image carries transparency."""
+    return image.mode in ('RGBA', 'LA', 'PA') or (
+        image.mode == 'P' and 'transparency' in image.info
+    )
+
+
+def fallback_format(image: Image.Image) -> str:
+    """Pick the format served to browsers without WebP support."""
+    return 'png' if has_alpha(image) else 'jpeg'
+
+
+def encoder_options(rendition: dict, image_format: str) -> dict:
+    """Merge default encoder options with rendition overrides."""
+    options = dict(settings.POST_IMAGE_ENCODER_DEFAULTS.get(image_format, {}))
+    options.update(rendition.get(image_format, {}))
+    return options
+
+
+def rendition_name(image_name: str, width: int, image_format: str) -> str:
+    """Build the storage name of a rendition of the given image."""
+    stem, _ = os.path.splitext(image_name)
+    return (
+        f'{RENDITIONS_DIR}/{stem}-{width}w.{EXTENSIONS[image_format]}'
+    )
+
+
+def encode(image: Image.Image, image_format: str, options: dict) -> bytes:
+    """Encode an image with the given encoder options."""
+    if image_format == 'jpeg' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+        image = image.convert('RGBA' if has_alpha(image) else 'RGB')
+    buffer = BytesIO()
+    image.save(buffer, format=image_format.upper(), **options)
+    return buffer.getvalue()
+
+
+def build_renditions(source, image_name: str,
+                     renditions: dict = None) -> list:
+    """
+    Encode every configured rendition of an image.
+
+    Source is a path or a file object. Returns a list of dicts with
+    the storage name, format, dimensions and encoded content; nothing
+    is written, so the function is safe to run in a worker process.
+    """
+    if renditions is None:
+        renditions = settings.POST_IMAGE_RENDITIONS
+    with Image.open(source) as original:
+        original = ImageOps.exif_transpose(original)
+        original.load()
+    formats = (WEBP, fallback_format(original))
+    built, widths = [], set()
+    specs = sorted(renditions.values(), key=lambda spec: spec['width'])
+    for spec in specs:
+        width = min(spec['width'], original.width)
+        if width in widths:
+            continue
+        widths.add(width)
+        height = max(1, round(original.height * width / original.width))
+        resized = (
+            original if width == original.width
+            else original.resize((width, height), Image.LANCZOS)
+        )
+        for image_format in formats:
+            content = encode(
+                resized, image_format, encoder_options(spec, image_format)
+            )
+            built.append({
+                'name': rendition_name(image_name, width, image_format),
+                'format': image_format,
+                'width': width,
+                'height': height,
+                'bytes': len(content),
+                'content': content,
+            })
+    return built
+
+
+def store_renditions(built: list, storage=None) -> dict:
+    """Save built renditions and group their descriptions by format."""
+    storage = storage or default_storage
+    grouped = {}
+    for rendition in built:
+        rendition = dict(rendition)
+        content = rendition.pop('content')
+        if storage.exists(rendition['name']):
+            storage.delete(rendition['name'])
+        storage.save(rendition['name'], ContentFile(content))
+        grouped.setdefault(rendition.pop('format'), []).append(rendition)
+    return grouped
+
+
+def generate_renditions(post) -> dict:
+    """Encode, store and record the renditions of a post image."""
+    if not post.image:
+        return {}
+    shared = shared_renditions(post)
+    if shared:
+        post.image_renditions = shared
+    else:
+        with post.image.open('rb') as source:
+            built = build_renditions(source, post.image.name)
+        post.image_renditions = store_renditions(built)
+    type(post).objects.filter(pk=post.pk).update(
+        image_renditions=post.image_renditions
+    )
+    return post.image_renditions
+
+
+def shared_renditions(post) -> dict:
+    """
+    Return renditions already built for the same image file.
+
+    Identical content shares a name in content-addressed storage, so
+    its renditions can be reused without encoding.
+    """
+    return type(post).objects.filter(image=post.image.name).exclude(
+        image_renditions={}
+    ).values_list('image_renditions', flat=True).first() or {}
+
+
+def srcset(renditions: list, storage=None) -> str:
+    """Build a srcset attribute value from rendition descriptions."""
+    storage = storage or default_storage
+    return ', '.join(
+        f'{storage.url(rendition["name"])} {rendition["width"]}w'
+        for rendition in renditions
+    )
@@ -0,0 +1,51 @@
+"""Management command to move old posts into the archive tables."""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from blog.archive import archive_batch, archive_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        'Move posts published long ago, with their comments, into the '
+        'archive tables.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int,
+            help='Archive posts older than this; ARCHIVE_POSTS_AFTER_DAYS '
+                 'by default.'
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--pause', type=float, default=0,
+            help='Seconds to sleep between batches to let writers in.'
+        )
+        parser.add_argument(
+            '--vacuum', action='store_true',
+            help='Rebuild an SQLite database afterwards to return the '
+                 'freed pages.'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = archive_cutoff(options['days'])
+        posts = comments = 0
+        while True:
+            moved, moved_comments = archive_batch(
+                cutoff, options['batch_size']
+            )
+            if not moved:
+                break
+            posts += moved
+            comments += moved_comments
+            self.stdout.write(f'Archived {posts} posts...')
+            time.sleep(options['pause'])
+        if options['vacuum'] and connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('VACUUM')
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived posts: {posts}, comments: {comments}.'
+        ))
@@ -0,0 +1,70 @@
+"""Management command to benchmark rendition encoding against originals."""
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.images import build_renditions
+from blog.models import Post
+
+IMAGE_SUFFIXES: tuple = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp')
+
+
+class Command(BaseCommand):
+    help = (
+        'Encode renditions of a sample of images and report byte savings '
+        'over the originals. Nothing is written to storage.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dir', type=Path,
+            help='Directory with sample images instead of post images.'
+        )
+        parser.add_argument('--limit', type=int, default=50)
+
+    def sample(self, options):
+        if options['dir']:
+            paths = sorted(
+                path for path in options['dir'].rglob('*')
+                if path.suffix.lower() in IMAGE_SUFFIXES
+            )
+            return paths[:options['limit']]
+        posts = Post.objects.exclude(image='').only(
+            'image', 'image_width', 'image_height'
+        )
+        return [
+            Path(post.image.path)
+            for post in posts[:options['limit']]
+        ]
+
+    def handle(self, *args, **options):
+        paths = self.sample(options)
+        if not paths:
+            raise CommandError('No sample images found.')
+        original_total = 0
+        totals = {}
+        started = time.perf_counter()
+        for path in paths:
+            original_total += path.stat().st_size
+            by_format = {}
+            for rendition in build_renditions(path, path.name):
+                by_format.setdefault(rendition['format'], []).append(
+                    rendition['bytes']
+                )
+            for image_format, sizes in by_format.items():
+                for label, size in (('smallest', sizes[0]),
+                                    ('largest', sizes[-1])):
+                    key = (image_format, label)
+                    totals[key] = totals.get(key, 0) + size
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'Images: {len(paths)}, originals: {original_total} bytes, '
+            f'encoding: {elapsed / len(paths) * 1000:.1f} ms per image'
+        )
+        for (image_format, label), size in sorted(totals.items()):
+            saving = 100 * (1 - size / original_total)
+            self.stdout.write(
+                f'{image_format:>5} {label:>8}: {size:>12} bytes '
+                f'({saving:+.1f}% saved)'
+            )
@@ -0,0 +1,125 @@
+"""Management command to remove media files no post refers to."""
+import os
+import shutil
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.images import RENDITIONS_DIR
+from blog.models import ArchivedPost, ImageJob, MediaFile, Post
+
+MEDIA_DIRS: tuple = (Post.image.field.upload_to, RENDITIONS_DIR)
+
+
+def scan_files(root: str, directory: str = ''):
+    """Recursively yield (name, stat) of files below a directory."""
+    try:
+        entries = os.scandir(os.path.join(root, directory))
+    except FileNotFoundError:
+        return
+    with entries:
+        for entry in entries:
+            name = f'{directory}/{entry.name}' if directory else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                yield from scan_files(root, name)
+            elif entry.is_file(follow_symlinks=False):
+                yield name, entry.stat(follow_symlinks=False)
+
+
+def referenced_names(chunk_size: int) -> set:
+    """Collect media names referenced by posts and pending jobs."""
+    names = set()
+    for model in (Post, ArchivedPost):
+        posts = model.objects.exclude(image='').values_list(
+            'image', 'image_renditions'
+        )
+        for image, renditions in posts.iterator(chunk_size=chunk_size):
+            names.add(image)
+            for items in renditions.values():
+                names.update(item['name'] for item in items)
+    names.update(
+        ImageJob.objects.values_list('image_name', flat=True).iterator(
+            chunk_size=chunk_size
+        )
+    )
+    return names
+
+
+class Command(BaseCommand):
+    help = 'Delete or quarantine media files that no post refers to.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report orphans.'
+        )
+        parser.add_argument(
+            '--quarantine', type=Path,
+            help='Move orphans into this directory instead of deleting.'
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--rate', type=float, default=0,
+            help='Maximum files removed per second, 0 for no limit.'
+        )
+        parser.add_argument(
+            '--min-age', type=int, default=3600,
+            help='Skip files modified less than this many seconds ago.'
+        )
+
+    def handle(self, *args, **options):
+        root = str(settings.MEDIA_ROOT)
+        # Take the cut-off before reading references, so a file uploaded
+        # while the set is built is too young to be collected.
+        cutoff = time.time() - options['min_age']
+        referenced = referenced_names(options['batch_size'])
+        self.found = self.removed = self.reclaimed = 0
+        batch = []
+        for directory in MEDIA_DIRS:
+            for name, stat in scan_files(root, directory):
+                if name in referenced or stat.st_mtime > cutoff:
+                    continue
+                self.found += 1
+                self.reclaimed += stat.st_size
+                batch.append(name)
+                if len(batch) >= options['batch_size']:
+                    self.collect(root, batch, options)
+                    batch = []
+        self.collect(root, batch, options)
+        if options['dry_run']:
+            summary = f'would remove {self.found}'
+        else:
+            summary = f'removed {self.removed}'
+        self.stdout.write(self.style.SUCCESS(
+            f'Orphans: {self.found}, {summary}, {self.reclaimed} bytes.'
+        ))
+
+    def collect(self, root, batch, options):
+        if not batch:
+            return
+        if options['dry_run']:
+            for name in batch:
+                self.stdout.write(f'orphan: {name}')
+            return
+        started = time.monotonic()
+        for name in batch:
+            path = os.path.join(root, name)
+            try:
+                if options['quarantine']:
+                    target = options['quarantine'] / name
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.move(path, target)
+                else:
+                    os.remove(path)
+            except FileNotFoundError:
+                continue
+            self.removed += 1
+        MediaFile.objects.filter(name__in=batch).delete()
+        if options['rate']:
+            pause = len(batch) / options['rate'] - (
+                time.monotonic() - started
+            )
+            if pause > 0:
+                time.sleep(pause)
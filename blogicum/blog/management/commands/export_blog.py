@@ -0,0 +1,27 @@
+"""Management command to export blog content as JSON lines."""
+from django.core.management.base import BaseCommand
+
+from blog.transfer import export_records, open_dump, write_records
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream categories, locations, posts, comments and forbidden words '
+        'to a JSON lines file, gzipped if its name ends in .gz. Image files '
+        'are not included; copy MEDIA_ROOT separately.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        with open_dump(options['path'], 'w') as stream:
+            counts = write_records(
+                stream, export_records(options['chunk_size'])
+            )
+        for label, count in counts.items():
+            self.stdout.write(f'{label}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Exported {sum(counts.values())} records.'
+        ))
@@ -0,0 +1,330 @@
+"""Management command to generate a large synthetic dataset."""
+import itertools
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post
+from blog.search import drop_index, install_index
+from core.backends.sqlite3.base import apply_pragmas
+
+User = get_user_model()
+
+SYLLABLES: tuple = (
+    'ба', 'ве', 'го', 'да', 'же', 'зи', 'ка', 'ло', 'ми', 'но', 'пу', 'ра',
+    'се', 'ти', 'ус', 'фе', 'ха', 'це', 'чи', 'ша', 'эн', 'ют', 'яр', 'ост',
+    'ник', 'ство', 'тель', 'ние', 'ный', 'ая',
+)
+
+VOCABULARY_SIZE: int = 5000
+
+# Texts are drawn from pools built of pre-generated phrases: drawing
+# every word of millions of texts would dominate the run time.
+PHRASES: int = 20_000
+
+TEXTS: int = 50_000
+
+PASSWORD: str = 'password'
+
+# The dataset can be generated again if the machine crashes mid-load,
+# so skip syncing and the write-ahead log while loading.
+BULK_LOAD_PRAGMAS: dict = {'synchronous': 'OFF', 'journal_mode': 'MEMORY'}
+
+
+@contextmanager
+def bulk_load_pragmas():
+    """Relax SQLite durability for a load, then restore the settings."""
+    if connection.vendor != 'sqlite':
+        yield
+        return
+    connection.ensure_connection()
+    apply_pragmas(connection.connection, BULK_LOAD_PRAGMAS)
+    try:
+        yield
+    finally:
+        apply_pragmas(
+            connection.connection,
+            connection.settings_dict.get('PRAGMAS', {})
+        )
+
+
+@contextmanager
+def deferred_indexes(table: str):
+    """
+    Drop secondary indexes of an SQLite table and rebuild them on exit.
+
+    Building an index once over sorted keys is several times cheaper
+    than updating it for every row inserted in random key order.
+    """
+    if connection.vendor != 'sqlite':
+        yield
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' "
+            'AND tbl_name = %s AND sql IS NOT NULL', [table]
+        )
+        indexes = cursor.fetchall()
+        for name, _ in indexes:
+            cursor.execute(f'DROP INDEX {connection.ops.quote_name(name)}')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for _, sql in indexes:
+                cursor.execute(sql)
+
+
+def zipf_weights(count: int, skew: float) -> list:
+    """Cumulative weights of a Zipf-like popularity distribution."""
+    return list(itertools.accumulate(
+        1 / rank ** skew for rank in range(1, count + 1)
+    ))
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill the database with users, categories, locations, posts and '
+        'comments with skewed popularity for load testing.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=30)
+        parser.add_argument('--locations', type=int, default=200)
+        parser.add_argument('--posts', type=int, default=100_000)
+        parser.add_argument('--comments', type=int, default=1_000_000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=20_000)
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help='Zipf exponent of author and post popularity.'
+        )
+        parser.add_argument(
+            '--future', type=float, default=0.02,
+            help='Share of posts with a publication date in the future.'
+        )
+        parser.add_argument(
+            '--days', type=int, default=3 * 365,
+            help='Spread publication dates over this many past days.'
+        )
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.options = options
+        self.now = timezone.now()
+        self.vocabulary = [
+            ''.join(
+                self.random.choices(SYLLABLES, k=self.random.randint(2, 4))
+            )
+            for _ in range(VOCABULARY_SIZE)
+        ]
+        self.word_weights = zipf_weights(VOCABULARY_SIZE, 1.0)
+        self.phrases = [self.words(3, 12) for _ in range(PHRASES)]
+        search_index = connection.vendor == 'sqlite'
+        if search_index:
+            # Refilling the index once is far cheaper than a trigger per row.
+            drop_index(connection)
+        started = time.monotonic()
+        rows = 0
+        try:
+            with bulk_load_pragmas():
+                for step in (self.create_users, self.create_places,
+                             self.create_posts, self.create_comments):
+                    rows += step()
+        finally:
+            seconds = time.monotonic() - started
+            self.stdout.write(
+                f'{rows} rows in {seconds:.1f}s, {rows / seconds:.0f} rows/s'
+            )
+            if search_index:
+                started = time.monotonic()
+                install_index(connection)
+                seconds = time.monotonic() - started
+                self.stdout.write(f'Search index rebuilt in {seconds:.1f}s')
+
+    def words(self, low: int, high: int) -> str:
+        return ' '.join(self.random.choices(
+            self.vocabulary, cum_weights=self.word_weights,
+            k=self.random.randint(low, high)
+        ))
+
+    def text(self, low: int, high: int) -> str:
+        """Build a text of low to high phrases."""
+        return '. '.join(self.random.choices(
+            self.phrases, k=self.random.randint(low, high)
+        ))
+
+    def bulk_create(self, model, objects) -> int:
+        """Insert objects in transactions of --batch-size rows."""
+        batch_size = self.options['batch_size']
+        created = 0
+        objects = iter(objects)
+        while True:
+            batch = list(itertools.islice(objects, batch_size))
+            if not batch:
+                break
+            with transaction.atomic():
+                model.objects.bulk_create(batch, batch_size=batch_size)
+            created += len(batch)
+        self.stdout.write(f'{model._meta.verbose_name_plural}: {created}')
+        return created
+
+    def batches(self, total: int, make_rows):
+        """Yield rows built by make_rows(count) in --batch-size steps."""
+        batch_size = self.options['batch_size']
+        for start in range(0, total, batch_size):
+            yield from make_rows(min(batch_size, total - start))
+
+    def insert(self, model, columns: tuple, rows) -> int:
+        """
+        Insert tuples of values of the given columns in batches.
+
+        Builds the INSERT bulk_create would, but skips creating a model
+        instance and compiling every value, the bulk of its per-row cost.
+        Other columns get their field defaults. Rows only refer to ids
+        read from the database, so foreign keys are not checked per row.
+        """
+        fields = {
+            field.attname: field for field in model._meta.concrete_fields
+            if not field.primary_key
+        }
+        rest = [name for name in fields if name not in columns]
+        tail = tuple(
+            self.adapt(self.now) if name == 'created_at'
+            else fields[name].get_db_prep_save(
+                fields[name].get_default(), connection
+            )
+            for name in rest
+        )
+        quote = connection.ops.quote_name
+        names = [fields[name].column for name in (*columns, *rest)]
+        sql = (
+            f'INSERT INTO {quote(model._meta.db_table)} '
+            f'({", ".join(map(quote, names))}) '
+            f'VALUES ({", ".join(["%s"] * len(names))})'
+        )
+        batch_size = self.options['batch_size']
+        created = 0
+        rows = iter(rows)
+        with deferred_indexes(model._meta.db_table), \
+                connection.constraint_checks_disabled():
+            while True:
+                batch = [
+                    row + tail for row in itertools.islice(rows, batch_size)
+                ]
+                if not batch:
+                    break
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.executemany(sql, batch)
+                created += len(batch)
+        self.stdout.write(f'{model._meta.verbose_name_plural}: {created}')
+        return created
+
+    def adapt(self, value):
+        return connection.ops.adapt_datetimefield_value(value)
+
+    def ids(self, model) -> list:
+        return list(model.objects.order_by('pk').values_list('pk', flat=True))
+
+    def create_users(self) -> int:
+        password = make_password(PASSWORD)
+        first = User.objects.count()
+        return self.bulk_create(User, (
+            User(
+                username=f'user{number}', email=f'user{number}@example.com',
+                first_name=self.words(1, 1).title(),
+                last_name=self.words(1, 1).title(),
+                password=password, date_joined=self.now
+            )
+            for number in range(first, first + self.options['users'])
+        ))
+
+    def create_places(self) -> int:
+        first = Category.objects.count()
+        created = self.bulk_create(Category, (
+            Category(
+                title=self.words(1, 3).capitalize(),
+                description=self.words(10, 30),
+                slug=f'category-{number}',
+                is_published=self.random.random() > 0.05
+            )
+            for number in range(first, first + self.options['categories'])
+        ))
+        return created + self.bulk_create(Location, (
+            Location(
+                name=self.words(1, 2).title(),
+                is_published=self.random.random() > 0.05
+            )
+            for _ in range(self.options['locations'])
+        ))
+
+    def create_posts(self) -> int:
+        authors = self.ids(User)
+        categories = self.ids(Category)
+        locations = self.ids(Location) + [None] * len(self.ids(Location))
+        author_weights = zipf_weights(len(authors), self.options['skew'])
+        category_weights = zipf_weights(len(categories), 1.0)
+        titles = [self.words(2, 8).capitalize() for _ in range(TEXTS)]
+        texts = [self.text(3, 15) for _ in range(TEXTS)]
+        span = self.options['days'] * 24 * 3600
+        future = self.options['future']
+        delta = timedelta(seconds=1)
+
+        def pub_date():
+            if self.random.random() < future:
+                offset = self.random.uniform(60, 30 * 24 * 3600)
+            else:
+                offset = -self.random.uniform(0, span)
+            return self.adapt(self.now + offset * delta)
+
+        def posts(count):
+            return zip(
+                self.random.choices(titles, k=count),
+                self.random.choices(texts, k=count),
+                [pub_date() for _ in range(count)],
+                self.random.choices(
+                    authors, cum_weights=author_weights, k=count
+                ),
+                self.random.choices(
+                    categories, cum_weights=category_weights, k=count
+                ),
+                self.random.choices(locations, k=count),
+                [self.random.random() > 0.03 for _ in range(count)],
+            )
+
+        return self.insert(
+            Post, ('title', 'text', 'pub_date', 'author_id', 'category_id',
+                   'location_id', 'is_published'),
+            self.batches(self.options['posts'], posts)
+        )
+
+    def create_comments(self) -> int:
+        authors = self.ids(User)
+        posts = self.ids(Post)
+        # Popularity is independent of age, so shuffle before weighting.
+        self.random.shuffle(posts)
+        post_weights = zipf_weights(len(posts), self.options['skew'])
+        author_weights = zipf_weights(len(authors), self.options['skew'])
+        texts = [self.text(1, 2) for _ in range(TEXTS)]
+
+        def comments(count):
+            return zip(
+                self.random.choices(texts, k=count),
+                self.random.choices(posts, cum_weights=post_weights, k=count),
+                self.random.choices(
+                    authors, cum_weights=author_weights, k=count
+                ),
+            )
+
+        return self.insert(
+            Comment, ('text', 'post_id', 'author_id'),
+            self.batches(self.options['comments'], comments)
+        )
@@ -0,0 +1,31 @@
+"""Management command to (re)generate post image renditions."""
+from django.core.management.base import BaseCommand
+
+from blog.images import generate_renditions
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Encode WebP and fallback renditions of post images.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Re-encode posts that already have renditions.'
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').only(
+            'pk', 'image', 'image_width', 'image_height'
+        )
+        if not options['all']:
+            posts = posts.filter(image_renditions={})
+        done = 0
+        for post in posts.iterator(chunk_size=100):
+            try:
+                generate_renditions(post)
+            except (OSError, ValueError) as error:
+                self.stderr.write(f'{post.image.name}: {error}')
+                continue
+            done += 1
+        self.stdout.write(self.style.SUCCESS(f'Renditions generated: {done}'))
@@ -0,0 +1,30 @@
+"""Management command to import blog content from JSON lines."""
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.transfer import Importer, open_dump
+
+
+class Command(BaseCommand):
+    help = (
+        'Import a file written by export_blog. Records get new ids; '
+        'categories with an existing slug and known forbidden words are '
+        'merged, and unknown authors are created without a password.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        importer = Importer(options['batch_size'], self.report)
+        try:
+            with open_dump(options['path']) as stream:
+                counts = importer.load(stream)
+        except (OSError, ValueError) as error:
+            raise CommandError(f'Import failed: {error}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {sum(counts.values())} records.'
+        ))
+
+    def report(self, model, imported):
+        self.stdout.write(f'{model._meta.verbose_name_plural}: {imported}')
@@ -0,0 +1,31 @@
+"""Management command to delete a user with all their content."""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.deletion import delete_user
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete a user with their posts and comments in batches, without '
+        'locking the database for long.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('--batch-size', type=int)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'User {options["username"]} does not exist.')
+        delete_user(user, options['batch_size'], self.report)
+        self.stdout.write(self.style.SUCCESS(
+            f'User {options["username"]} deleted.'
+        ))
+
+    def report(self, model, deleted):
+        self.stdout.write(f'{model._meta.verbose_name_plural}: {deleted}')
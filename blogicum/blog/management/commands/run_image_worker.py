@@ -0,0 +1,91 @@
+"""Management command to run the post image processing worker."""
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from blog.tasks import (IMAGE_JOBS_IN_FLIGHT, IMAGE_JOBS_QUEUED, claim_jobs,
+                        complete_job, fail_job, job_arguments, process_image,
+                        requeue_stale_jobs, worker_name)
+from core.metrics import flush_if_due
+
+
+class Command(BaseCommand):
+    help = (
+        'Process queued post images in a bounded pool of worker processes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=settings.IMAGE_WORKERS,
+            help='Number of worker processes (defaults to CPU count).'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit when the queue is drained.'
+        )
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        worker = worker_name()
+        stale = requeue_stale_jobs()
+        if stale:
+            self.stdout.write(f'Requeued stale jobs: {stale}')
+        while True:
+            try:
+                self.run_pool(workers, worker, options['once'])
+            except BrokenProcessPool as error:
+                self.stderr.write(f'Process pool broke, restarting: {error}')
+                continue
+            break
+
+    def run_pool(self, workers, worker, once):
+        limit = workers * settings.IMAGE_JOB_QUEUE_FACTOR
+        in_flight = {}
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            try:
+                while True:
+                    close_old_connections()
+                    for job in claim_jobs(limit - len(in_flight), worker):
+                        try:
+                            arguments = job_arguments(job)
+                        except Exception as error:
+                            fail_job(job, error)
+                            continue
+                        future = pool.submit(process_image, *arguments)
+                        in_flight[future] = job
+                    IMAGE_JOBS_IN_FLIGHT.set(len(in_flight))
+                    flush_if_due()
+                    if not in_flight:
+                        if once:
+                            return
+                        time.sleep(settings.IMAGE_JOB_POLL_INTERVAL)
+                        continue
+                    done, _ = wait(
+                        in_flight, timeout=settings.IMAGE_JOB_POLL_INTERVAL,
+                        return_when=FIRST_COMPLETED
+                    )
+                    for future in done:
+                        self.finish(in_flight.pop(future), future)
+                    self.stdout.write(
+                        f'queued={IMAGE_JOBS_QUEUED.value()} '
+                        f'in_flight={len(in_flight)}'
+                    )
+            finally:
+                for job in in_flight.values():
+                    fail_job(job, BrokenProcessPool('worker stopped'))
+                IMAGE_JOBS_IN_FLIGHT.set(0)
+
+    def finish(self, job, future):
+        try:
+            built = future.result()
+        except BrokenProcessPool as error:
+            fail_job(job, error)
+            raise
+        except Exception as error:
+            fail_job(job, error)
+        else:
+            complete_job(job, built)
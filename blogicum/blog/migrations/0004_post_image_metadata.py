@@ -0,0 +1,76 @@
+# Generated by Django 3.2.16 on 2026-10-19 08:16
+
+import hashlib
+
+from django.core.files.images import get_image_dimensions
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+FIELDS = ('image_width', 'image_height', 'image_bytes', 'image_sha256')
+
+
+def describe_images(apps, schema_editor):
+    """Backfill dimensions, size and hash of existing post images."""
+    Post = apps.get_model('blog', 'Post')
+    rows = Post.objects.exclude(image='').values_list('pk', 'image')
+    batch = []
+    for pk, name in rows.iterator(chunk_size=BATCH_SIZE):
+        try:
+            with default_storage.open(name, 'rb') as file:
+                width, height = get_image_dimensions(file)
+                file.seek(0)
+                digest = hashlib.sha256()
+                size = 0
+                for chunk in file.chunks():
+                    digest.update(chunk)
+                    size += len(chunk)
+        except OSError:
+            # Missing files keep empty metadata; blog.signals stops
+            # loading a post from reading its file, so it still renders.
+            continue
+        batch.append(Post(
+            pk=pk, image_width=width, image_height=height,
+            image_bytes=size, image_sha256=digest.hexdigest()
+        ))
+        if len(batch) >= BATCH_SIZE:
+            Post.objects.bulk_update(batch, FIELDS)
+            batch = []
+    Post.objects.bulk_update(batch, FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_post_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_bytes',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True, verbose_name='Размер изображения в байтах'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Высота изображения'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_sha256',
+            field=models.CharField(blank=True, editable=False, max_length=64, verbose_name='SHA-256 изображения'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина изображения'),
+        ),
+        migrations.RunPython(describe_images, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, height_field='image_height', upload_to='post_images', verbose_name='Изображение', width_field='image_width'),
+        ),
+    ]
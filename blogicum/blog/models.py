@@ -3,6 +3,8 @@ from django.contrib.auth import get_user_model
 from django.db import models
 from django.utils import timezone
 
+from .images import describe_file
+from .storage import post_image_storage, release_on_commit
 from .validators import is_profanity, post_pub_date
 
 CHARS_LIMIT: int = 30
@@ -123,7 +125,40 @@ class Post(PublishedModel):
     image = models.ImageField(
         'Изображение',
         upload_to='post_images',
-        blank=True
+        blank=True,
+        storage=post_image_storage,
+        width_field='image_width',
+        height_field='image_height'
+    )
+    image_width = models.PositiveIntegerField(
+        verbose_name='Ширина изображения',
+        null=True,
+        blank=True,
+        editable=False
+    )
+    image_height = models.PositiveIntegerField(
+        verbose_name='Высота изображения',
+        null=True,
+        blank=True,
+        editable=False
+    )
+    image_bytes = models.PositiveBigIntegerField(
+        verbose_name='Размер изображения в байтах',
+        null=True,
+        blank=True,
+        editable=False
+    )
+    image_sha256 = models.CharField(
+        verbose_name='SHA-256 изображения',
+        max_length=64,
+        blank=True,
+        editable=False
+    )
+    image_renditions = models.JSONField(
+        verbose_name='Варианты изображения',
+        default=dict,
+        blank=True,
+        editable=False
     )
 
     class Meta:
@@ -132,11 +167,37 @@ class Post(PublishedModel):
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(fields=('pub_date',), name='post_pub_date_idx'),
+        )
 
     def __str__(self) -> str:
         """Display Post title in admin panel."""
         return self.title[:CHARS_LIMIT]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the stored image name to detect replacement."""
+        instance = super().from_db(db, field_names, values)
+        image = instance.__dict__.get('image')
+        instance._loaded_image_name = getattr(image, 'name', image)
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Describe a new image once and release the replaced one."""
+        uploaded = bool(self.image) and not self.image._committed
+        if not self.image:
+            self.image_bytes, self.image_sha256 = None, ''
+            self.image_renditions = {}
+        elif uploaded:
+            self.image_bytes, self.image_sha256 = describe_file(self.image)
+            self.image_renditions = {}
+        super().save(*args, **kwargs)
+        previous = getattr(self, '_loaded_image_name', None)
+        if previous and (uploaded or previous != self.image.name):
+            release_on_commit(self.image.storage, previous)
+        self._loaded_image_name = self.image.name
+
 
 class Comment(PublishedModel):
     """Model for comments data."""
@@ -165,6 +226,105 @@ class Comment(PublishedModel):
         return self.text[:CHARS_LIMIT]
 
 
+class ArchivedPost(PublishedModel):
+    """Model for old posts moved out of the hot post table."""
+
+    id = models.BigIntegerField(primary_key=True)
+    created_at = models.DateTimeField(verbose_name='Добавлено')
+    title = models.CharField(
+        verbose_name='Заголовок',
+        max_length=MAX_LENGTH
+    )
+    text = models.TextField(verbose_name='Текст')
+    pub_date = models.DateTimeField(verbose_name='Дата и время публикации')
+    author = models.ForeignKey(
+        User,
+        verbose_name='Автор публикации',
+        on_delete=models.CASCADE,
+        related_name='archived_posts'
+    )
+    location = models.ForeignKey(
+        Location,
+        verbose_name='Местоположение',
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='archived_posts'
+    )
+    category = models.ForeignKey(
+        Category,
+        verbose_name='Категория',
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='archived_posts'
+    )
+    image = models.ImageField(
+        'Изображение',
+        upload_to='post_images',
+        blank=True,
+        storage=post_image_storage
+    )
+    image_width = models.PositiveIntegerField(
+        verbose_name='Ширина изображения',
+        null=True,
+        blank=True
+    )
+    image_height = models.PositiveIntegerField(
+        verbose_name='Высота изображения',
+        null=True,
+        blank=True
+    )
+    image_renditions = models.JSONField(
+        verbose_name='Варианты изображения',
+        default=dict,
+        blank=True
+    )
+    archived_at = models.DateTimeField(
+        verbose_name='Перенесено в архив',
+        auto_now_add=True
+    )
+
+    class Meta:
+        """Inner Meta class of ArchivedPost model."""
+
+        verbose_name = 'архивная публикация'
+        verbose_name_plural = 'Архив публикаций'
+        ordering = ('-pub_date',)
+
+    def __str__(self) -> str:
+        """Display ArchivedPost title in admin panel."""
+        return self.title[:CHARS_LIMIT]
+
+
+class ArchivedComment(PublishedModel):
+    """Model for comments of archived posts."""
+
+    id = models.BigIntegerField(primary_key=True)
+    created_at = models.DateTimeField(verbose_name='Добавлено')
+    text = models.TextField('Текст комментария')
+    post = models.ForeignKey(
+        ArchivedPost,
+        verbose_name='Публикация',
+        on_delete=models.CASCADE,
+        related_name='comments'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_comments'
+    )
+
+    class Meta:
+        """Inner Meta class of ArchivedComment model."""
+
+        verbose_name = 'архивный комментарий'
+        verbose_name_plural = 'Архив комментариев'
+        ordering = ('created_at',)
+
+    def __str__(self) -> str:
+        """Display ArchivedComment text in admin panel."""
+        return self.text[:CHARS_LIMIT]
+
+
 class Profanity(models.Model):
     """Model for add profanity."""
 
@@ -180,3 +340,110 @@ class Profanity(models.Model):
     def __str__(self) -> str:
         """Display Profanity word in admin panel."""
         return self.word[:CHARS_LIMIT]
+
+
+class MediaFile(models.Model):
+    """Model for content-addressed media files and their references."""
+
+    name = models.CharField(
+        verbose_name='Имя файла',
+        max_length=MAX_LENGTH,
+        unique=True
+    )
+    sha256 = models.CharField(
+        verbose_name='SHA-256',
+        max_length=64
+    )
+    size = models.PositiveBigIntegerField(
+        verbose_name='Размер в байтах'
+    )
+    references = models.PositiveIntegerField(
+        verbose_name='Количество ссылок',
+        default=1
+    )
+    created_at = models.DateTimeField(
+        verbose_name='Добавлено',
+        auto_now_add=True
+    )
+
+    class Meta:
+        """Inner Meta class of MediaFile model."""
+
+        verbose_name = 'медиафайл'
+        verbose_name_plural = 'Медиафайлы'
+
+    def __str__(self) -> str:
+        """Display MediaFile name in admin panel."""
+        return self.name
+
+
+class ImageJob(models.Model):
+    """Model for queued post image processing jobs."""
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Ошибка'),
+    )
+
+    post = models.ForeignKey(
+        Post,
+        verbose_name='Публикация',
+        on_delete=models.CASCADE,
+        related_name='image_jobs'
+    )
+    image_name = models.CharField(
+        verbose_name='Имя файла',
+        max_length=MAX_LENGTH
+    )
+    status = models.CharField(
+        verbose_name='Статус',
+        max_length=16,
+        choices=STATUSES,
+        default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Попытки',
+        default=0
+    )
+    run_after = models.DateTimeField(
+        verbose_name='Не раньше',
+        default=timezone.now
+    )
+    locked_by = models.CharField(
+        verbose_name='Обработчик',
+        max_length=MAX_LENGTH,
+        blank=True
+    )
+    locked_at = models.DateTimeField(
+        verbose_name='Взято в работу',
+        null=True,
+        blank=True
+    )
+    last_error = models.TextField(
+        verbose_name='Последняя ошибка',
+        blank=True
+    )
+    created_at = models.DateTimeField(
+        verbose_name='Добавлено',
+        auto_now_add=True
+    )
+
+    class Meta:
+        """Inner Meta class of ImageJob model."""
+
+        verbose_name = 'задача обработки изображения'
+        verbose_name_plural = 'Задачи обработки изображений'
+        ordering = ('run_after',)
+        indexes = (
+            models.Index(
+                fields=('status', 'run_after'), name='image_job_queue_idx'
+            ),
+        )
+
+    def __str__(self) -> str:
+        """Display ImageJob image name in admin panel."""
+        return f'{self.image_name} ({self.status})'
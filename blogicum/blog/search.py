@@ -0,0 +1,198 @@
+"""Full-text search over posts."""
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+FTS_TABLE: str = 'blog_post_fts'
+
+
+def folded(column: str) -> str:
+    """Build an SQL expression treating ё as е, as Russian readers do."""
+    return f"replace(replace({column}, 'ё', 'е'), 'Ё', 'Е')"
+
+
+FTS_INSERT: str = (
+    'INSERT INTO blog_post_fts (rowid, title, text) '
+    f"VALUES (new.id, {folded('new.title')}, {folded('new.text')});"
+)
+
+# A contentless table has to be given the indexed values to delete.
+FTS_DELETE: str = (
+    'INSERT INTO blog_post_fts (blog_post_fts, rowid, title, text) '
+    f"VALUES ('delete', old.id, {folded('old.title')}, "
+    f"{folded('old.text')});"
+)
+
+# Trigger names double as a marker that the index is installed.
+FTS_TRIGGERS: dict = {
+    'blog_post_fts_insert': (
+        f'AFTER INSERT ON blog_post BEGIN {FTS_INSERT} END'
+    ),
+    'blog_post_fts_delete': (
+        f'AFTER DELETE ON blog_post BEGIN {FTS_DELETE} END'
+    ),
+    'blog_post_fts_update': (
+        'AFTER UPDATE OF title, text ON blog_post '
+        f'BEGIN {FTS_DELETE} {FTS_INSERT} END'
+    ),
+}
+
+# Title matches weigh more than text matches. Stored as the rank
+# function of the table, so the rank column applies the weights.
+FTS_RANK: str = 'bm25(5.0, 1.0)'
+
+PG_SEARCH_CONFIG: str = 'russian'
+
+PG_DOCUMENT: str = (
+    f"to_tsvector('{PG_SEARCH_CONFIG}', "
+    "blog_post.title || ' ' || blog_post.text)"
+)
+
+PG_INDEX: str = 'blog_post_search_idx'
+
+MAX_TERMS: int = 8
+
+TERM_RE = re.compile(r'\w+')
+
+
+def search_terms(query: str) -> list:
+    """Split a user query into at most MAX_TERMS words."""
+    return TERM_RE.findall(query.lower().replace('ё', 'е'))[:MAX_TERMS]
+
+
+def fts_query(terms: list) -> str:
+    """Build an FTS5 query matching posts that contain every term."""
+    return ' '.join(f'"{term}"' for term in terms)
+
+
+def install_index(connection) -> bool:
+    """
+    Create the search index of posts, returning whether it was missing.
+
+    On SQLite the index is a contentless FTS5 table kept in sync by
+    triggers and refilled whenever one of them was missing; on
+    PostgreSQL a GIN index over the tsvector of a post.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {PG_INDEX} '
+                f'ON blog_post USING GIN (({PG_DOCUMENT}))'
+            )
+            return True
+        if connection.vendor != 'sqlite':
+            return False
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+            'AND tbl_name = %s', ['blog_post']
+        )
+        existing = {name for name, in cursor.fetchall()}
+        missing = set(FTS_TRIGGERS) - existing
+        if not missing:
+            return False
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+            "title, text, content='', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        for name in missing:
+            cursor.execute(f'CREATE TRIGGER {name} {FTS_TRIGGERS[name]}')
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rank) VALUES ('rank', %s)",
+            [FTS_RANK]
+        )
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('delete-all')"
+        )
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+            f"SELECT id, {folded('title')}, {folded('text')} FROM blog_post"
+        )
+    return True
+
+
+def drop_index(connection) -> None:
+    """Remove the search index of posts."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'DROP INDEX IF EXISTS {PG_INDEX}')
+        elif connection.vendor == 'sqlite':
+            for name in FTS_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def ranked_ids(connection, terms: list) -> list:
+    """
+    Return ids of posts matching every term, best matches first.
+
+    Only the SEARCH_MAX_RESULTS newest matches are ranked, which bounds
+    the cost of common words no matter how many posts contain them.
+    """
+    limit = settings.SEARCH_MAX_RESULTS
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            document_query = f"plainto_tsquery('{PG_SEARCH_CONFIG}', %s)"
+            cursor.execute(
+                'SELECT id FROM (SELECT id, title, text FROM blog_post '
+                f'WHERE {PG_DOCUMENT} @@ {document_query} '
+                'ORDER BY id DESC LIMIT %s) AS blog_post '
+                f'ORDER BY ts_rank({PG_DOCUMENT}, {document_query}) DESC, '
+                'id DESC',
+                [' '.join(terms), limit, ' '.join(terms)]
+            )
+            return [pk for pk, in cursor.fetchall()]
+        cursor.execute(
+            f'SELECT rowid, rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            'ORDER BY rowid DESC LIMIT %s',
+            [fts_query(terms), limit]
+        )
+        # The sort is stable, so equally ranked posts stay newest first.
+        return [pk for pk, rank in sorted(
+            cursor.fetchall(), key=lambda row: row[1]
+        )]
+
+
+class SearchResults:
+    """
+    Posts of a queryset ordered by search rank.
+
+    Filtering the ranked ids through the queryset only reads their
+    primary keys; posts are loaded with the joins and annotations of
+    the queryset for the slice Paginator asks for.
+    """
+
+    def __init__(self, queryset: QuerySet, ids: list):
+        self.queryset = queryset
+        self.ranked_ids = ids
+
+    @cached_property
+    def ids(self) -> list:
+        visible = set(
+            self.queryset.filter(pk__in=self.ranked_ids).order_by(
+            ).values_list('pk', flat=True)
+        )
+        return [pk for pk in self.ranked_ids if pk in visible]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            posts = self[index:index + 1 or None]
+            if not posts:
+                raise IndexError(index)
+            return posts[0]
+        ids = self.ids[index]
+        posts = self.queryset.in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+
+def search_posts(queryset: QuerySet, query: str) -> SearchResults:
+    """Search posts of a queryset for every word of a query."""
+    terms = search_terms(query)
+    ids = ranked_ids(connections[queryset.db], terms) if terms else []
+    return SearchResults(queryset, ids)
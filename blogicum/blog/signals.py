@@ -0,0 +1,59 @@
+"""Signal handlers of blog app."""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connections, router
+from django.db.models.signals import post_delete, post_init
+from django.dispatch import receiver
+
+from .models import ArchivedPost, Post
+from .search import FTS_TABLE, install_index
+from .storage import release_on_commit
+
+
+images_kept: ContextVar = ContextVar('images_kept', default=False)
+
+
+@contextmanager
+def keep_images():
+    """Delete posts without releasing their images, e.g. to move them."""
+    token = images_kept.set(True)
+    try:
+        yield
+    finally:
+        images_kept.reset(token)
+
+
+@receiver(post_delete, sender=ArchivedPost)
+@receiver(post_delete, sender=Post)
+def release_post_image(sender, instance, **kwargs):
+    """Release the image of a deleted post."""
+    if instance.image and not images_kept.get():
+        release_on_commit(instance.image.storage, instance.image.name)
+
+
+@receiver(post_init, sender=Post)
+def fill_new_image_dimensions(sender, instance, **kwargs):
+    """
+    Take dimensions of a post image passed to the constructor.
+
+    Replaces the post_init handler of ImageField, which opens the
+    stored file whenever the dimension fields are empty: a post whose
+    file went missing then failed every page listing it. Stored files
+    get their dimensions when they are saved or assigned instead.
+    """
+    if 'image' in instance.__dict__ and not instance.image._committed:
+        sender.image.field.update_dimension_fields(instance)
+
+
+def repair_search_index(sender, using, **kwargs):
+    """
+    Recreate search triggers after migrations.
+
+    SQLite rebuilds a table to alter it, dropping its triggers, so a
+    later migration of Post would silently stop indexing new posts.
+    """
+    connection = connections[using]
+    if (router.allow_migrate_model(using, Post)
+            and FTS_TABLE in connection.introspection.table_names()):
+        install_index(connection)
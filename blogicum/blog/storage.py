@@ -0,0 +1,92 @@
+"""Content-addressed storage for post images."""
+import os
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from django.utils.module_loading import import_string
+
+from .images import describe_file
+
+SHARD_LEVELS: int = 2
+
+SHARD_WIDTH: int = 2
+
+
+def post_image_storage():
+    """Return the storage configured for post images."""
+    return import_string(settings.POST_IMAGE_STORAGE)()
+
+
+def release_on_commit(storage, name: str) -> None:
+    """Delete a file from storage once the transaction commits."""
+    transaction.on_commit(lambda: storage.delete(name))
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage that names files by the SHA-256 of their content.
+
+    Identical uploads are written once and share a name; MediaFile rows
+    count references, and delete() only removes a file once nothing
+    refers to it. Files are sharded into nested directories by hash
+    prefix to keep directory sizes bounded.
+    """
+
+    def hashed_name(self, name: str, digest: str) -> str:
+        """Build a sharded name for content with the given digest."""
+        dirname = os.path.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        shards = [
+            digest[level * SHARD_WIDTH:(level + 1) * SHARD_WIDTH]
+            for level in range(SHARD_LEVELS)
+        ]
+        return '/'.join(
+            part for part in (dirname, *shards, digest + extension) if part
+        )
+
+    def _save(self, name, content):
+        from .models import MediaFile
+        size, digest = describe_file(content)
+        name = self.hashed_name(name, digest)
+        with transaction.atomic():
+            updated = MediaFile.objects.filter(name=name).update(
+                references=F('references') + 1
+            )
+            if not updated:
+                MediaFile.objects.create(
+                    name=name, size=size, sha256=digest
+                )
+        if self.exists(name):
+            # Refresh mtime so the garbage collector treats a reused file
+            # as recently uploaded.
+            os.utime(self.path(name))
+        else:
+            saved = super()._save(name, content)
+            if saved != name:
+                # A concurrent upload of the same content won the race.
+                super().delete(saved)
+        return name
+
+    def delete(self, name):
+        """Release one reference and remove the file when unused."""
+        from .models import MediaFile
+        with transaction.atomic():
+            media_file = MediaFile.objects.select_for_update().filter(
+                name=name
+            ).first()
+            if media_file is None:
+                super().delete(name)
+                return
+            if media_file.references > 1:
+                MediaFile.objects.filter(pk=media_file.pk).update(
+                    references=F('references') - 1
+                )
+                return
+            media_file.delete()
+            # Unlink while the delete holds the write lock: a concurrent
+            # _save of the same content waits for the commit, finds no
+            # row and writes the file again, rather than reusing a file
+            # about to be removed.
+            super().delete(name)
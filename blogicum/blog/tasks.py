@@ -0,0 +1,137 @@
+"""Durable queue of post image processing jobs."""
+import logging
+import os
+import socket
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.metrics import Counter, Gauge
+
+from .images import build_renditions, shared_renditions, store_renditions
+from .models import ImageJob, Post
+
+logger = logging.getLogger(__name__)
+
+IMAGE_JOBS = Counter(
+    'blog_image_jobs_total', 'Image jobs by outcome.', ('outcome',)
+)
+IMAGE_JOBS_QUEUED = Gauge(
+    'blog_image_jobs_queued', 'Image jobs waiting in the queue.'
+)
+IMAGE_JOBS_IN_FLIGHT = Gauge(
+    'blog_image_jobs_in_flight', 'Image jobs submitted to the process pool.'
+)
+
+
+def enqueue_image_processing(post: Post) -> None:
+    """Queue processing of a post image once the transaction commits."""
+    if post.image:
+        transaction.on_commit(
+            lambda: enqueue_image_job(post, post.image.name)
+        )
+
+
+def enqueue_image_job(post: Post, image_name: str):
+    """Reuse shared renditions or create a job for the image."""
+    shared = shared_renditions(post)
+    if shared:
+        Post.objects.filter(pk=post.pk, image=image_name).update(
+            image_renditions=shared
+        )
+        return None
+    job = ImageJob.objects.create(post=post, image_name=image_name)
+    IMAGE_JOBS.inc(outcome='queued')
+    if settings.IMAGE_JOBS_EAGER:
+        run_job(job)
+    return job
+
+
+def worker_name() -> str:
+    """Identify the current worker process."""
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def requeue_stale_jobs() -> int:
+    """Return jobs of crashed workers to the queue."""
+    deadline = timezone.now() - timedelta(seconds=settings.IMAGE_JOB_TIMEOUT)
+    return ImageJob.objects.filter(
+        status=ImageJob.RUNNING, locked_at__lt=deadline
+    ).update(status=ImageJob.PENDING, locked_by='', locked_at=None)
+
+
+def claim_jobs(limit: int, worker: str) -> list:
+    """Atomically take up to limit due jobs for a worker."""
+    now = timezone.now()
+    due = ImageJob.objects.filter(status=ImageJob.PENDING, run_after__lte=now)
+    IMAGE_JOBS_QUEUED.set(due.count())
+    if limit <= 0:
+        return []
+    ids = list(due.values_list('pk', flat=True)[:limit])
+    ImageJob.objects.filter(pk__in=ids, status=ImageJob.PENDING).update(
+        status=ImageJob.RUNNING, locked_by=worker, locked_at=now,
+        attempts=F('attempts') + 1
+    )
+    return list(ImageJob.objects.filter(
+        pk__in=ids, status=ImageJob.RUNNING, locked_by=worker
+    ).select_related('post'))
+
+
+def process_image(path: str, image_name: str, renditions: dict) -> list:
+    """Encode renditions of an image; runs in a worker process."""
+    return build_renditions(path, image_name, renditions)
+
+
+def complete_job(job: ImageJob, built: list) -> None:
+    """Store renditions of a processed image and drop its job."""
+    renditions = store_renditions(built)
+    with transaction.atomic():
+        Post.objects.filter(pk=job.post_id, image=job.image_name).update(
+            image_renditions=renditions
+        )
+        job.delete()
+    IMAGE_JOBS.inc(outcome='done')
+
+
+def fail_job(job: ImageJob, error: BaseException) -> None:
+    """Schedule a retry with exponential backoff or give up."""
+    job.last_error = f'{type(error).__name__}: {error}'
+    if job.attempts >= settings.IMAGE_JOB_MAX_ATTEMPTS:
+        job.status = ImageJob.FAILED
+        IMAGE_JOBS.inc(outcome='failed')
+        logger.error('Image job %s failed: %s', job.pk, job.last_error)
+    else:
+        job.status = ImageJob.PENDING
+        job.run_after = timezone.now() + timedelta(
+            seconds=settings.IMAGE_JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+        )
+        IMAGE_JOBS.inc(outcome='retried')
+        logger.warning('Image job %s will be retried: %s',
+                       job.pk, job.last_error)
+    # The post may have been deleted meanwhile, so never re-insert.
+    ImageJob.objects.filter(pk=job.pk).update(
+        status=job.status, run_after=job.run_after,
+        last_error=job.last_error, locked_by='', locked_at=None
+    )
+
+
+def job_arguments(job: ImageJob) -> tuple:
+    """Build picklable arguments of process_image for a job."""
+    path = job.post.image.storage.path(job.image_name)
+    return path, job.image_name, settings.POST_IMAGE_RENDITIONS
+
+
+def run_job(job: ImageJob) -> None:
+    """Process a job in the current process."""
+    if job.status == ImageJob.PENDING:
+        ImageJob.objects.filter(pk=job.pk).update(attempts=F('attempts') + 1)
+        job.refresh_from_db()
+    try:
+        built = process_image(*job_arguments(job))
+    except Exception as error:
+        fail_job(job, error)
+    else:
+        complete_job(job, built)
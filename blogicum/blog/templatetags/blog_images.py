@@ -0,0 +1,37 @@
+"""Template tags for post images."""
+from django import template
+from django.conf import settings
+
+from blog.images import WEBP, srcset
+
+register = template.Library()
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, loading='lazy'):
+    """Render a responsive picture for a post image."""
+    renditions = post.image_renditions or {}
+    fallback = next(
+        (items for image_format, items in renditions.items()
+         if image_format != WEBP),
+        []
+    )
+    context = {
+        'original': post.image.url,
+        'src': post.image.url,
+        'alt': post.title,
+        'loading': loading,
+        'sizes': settings.POST_IMAGE_SIZES,
+        'webp_srcset': srcset(renditions.get(WEBP, [])),
+        'srcset': srcset(fallback),
+        'width': post.image_width,
+        'height': post.image_height,
+    }
+    if fallback:
+        largest = fallback[-1]
+        context.update(
+            src=srcset([largest]).rsplit(' ', 1)[0],
+            width=largest['width'],
+            height=largest['height'],
+        )
+    return context
@@ -0,0 +1,267 @@
+"""Streaming export and import of blog content as JSON lines."""
+import datetime
+import gzip
+import json
+from collections import Counter
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import F, Max
+
+from .models import Category, Comment, Location, MediaFile, Post, Profanity
+
+User = get_user_model()
+
+# In dependency order: every record only refers to records above it.
+TRANSFERRED_MODELS: tuple = (Profanity, Category, Location, Post, Comment)
+
+# zlib's default: the maximum level compresses text a few percent better
+# but takes more than twice as long.
+GZIP_LEVEL: int = 6
+
+# Records that match an existing row by these fields reuse that row.
+NATURAL_KEYS: dict = {Category: 'slug', Profanity: 'word'}
+
+
+class DumpEncoder(DjangoJSONEncoder):
+    """JSON encoder keeping the microseconds DjangoJSONEncoder drops."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def open_dump(path: str, mode: str = 'r'):
+    """Open a dump for reading or writing, gzipped if it ends in .gz."""
+    if str(path).endswith('.gz'):
+        return gzip.open(
+            path, mode + 't', compresslevel=GZIP_LEVEL, encoding='utf-8'
+        )
+    return open(path, mode, encoding='utf-8')
+
+
+def transferred_fields(model) -> list:
+    return [
+        field for field in model._meta.concrete_fields
+        if not field.primary_key
+    ]
+
+
+@contextmanager
+def keeping_timestamps(model):
+    """Let bulk_create save created_at values instead of the time now."""
+    fields = [
+        field for field in transferred_fields(model)
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def export_records(chunk_size: int = 2000):
+    """
+    Yield a dict per row of the transferred models.
+
+    Records look like those of dumpdata, but authors are referred to by
+    username. Rows are read with iterator() in ascending pk order up to
+    the largest pks seen at the start, so rows written meanwhile do not
+    leave comments pointing at posts missing from the dump.
+    """
+    bounds = {
+        model: model.objects.aggregate(last=Max('pk'))['last'] or 0
+        for model in TRANSFERRED_MODELS
+    }
+    for model in TRANSFERRED_MODELS:
+        lookups = {
+            field.name: (
+                f'{field.name}__{User.USERNAME_FIELD}'
+                if field.related_model is User else field.attname
+            )
+            for field in transferred_fields(model)
+        }
+        queryset = model.objects.filter(pk__lte=bounds[model])
+        if model is Comment:
+            queryset = queryset.filter(post_id__lte=bounds[Post])
+        rows = queryset.order_by('pk').values(
+            'pk', *lookups.values()
+        ).iterator(chunk_size=chunk_size)
+        label = model._meta.label_lower
+        for row in rows:
+            yield {
+                'model': label, 'pk': row['pk'],
+                'fields': {
+                    name: row[lookup] for name, lookup in lookups.items()
+                },
+            }
+
+
+def write_records(stream, records) -> Counter:
+    """Write records to a text stream, one JSON document per line."""
+    counts = Counter()
+    for record in records:
+        stream.write(
+            json.dumps(record, cls=DumpEncoder, ensure_ascii=False)
+        )
+        stream.write('\n')
+        counts[record['model']] += 1
+    return counts
+
+
+class Importer:
+    """
+    Insert exported records with bulk_create in batches.
+
+    Imported rows get new pks after the largest existing one. Since a
+    dump is sorted by pk, the remapping table of a model is a single
+    shift plus the pks of records merged into existing rows by their
+    natural key, so memory does not grow with the size of the dump.
+    Authors are matched by username; unknown ones are created with an
+    unusable password.
+    """
+
+    def __init__(self, batch_size: int = 1000, progress=None):
+        self.batch_size = batch_size
+        self.progress = progress
+        self.shifts = {}
+        self.merged = {model: {} for model in TRANSFERRED_MODELS}
+        self.last_pks = {}
+        self.counts = Counter()
+        self.models = {
+            model._meta.label_lower: model for model in TRANSFERRED_MODELS
+        }
+        self.model = None
+        self.batch = []
+
+    def load(self, stream) -> Counter:
+        """Import records from a text stream of JSON lines."""
+        for line in stream:
+            if line.strip():
+                self.add(json.loads(line))
+        self.flush()
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                no_style(), TRANSFERRED_MODELS
+            ):
+                cursor.execute(sql)
+        return self.counts
+
+    def add(self, record: dict) -> None:
+        try:
+            model = self.models[record['model']]
+        except KeyError:
+            raise ValueError(f'Unknown model: {record["model"]!r}.')
+        if model is not self.model or len(self.batch) >= self.batch_size:
+            self.flush()
+            self.model = model
+        pk = record['pk']
+        if pk <= self.last_pks.get(model, 0):
+            raise ValueError(
+                f'Records of {record["model"]} are not sorted by pk.'
+            )
+        self.last_pks[model] = pk
+        if model not in self.shifts:
+            last = model.objects.aggregate(last=Max('pk'))['last'] or 0
+            self.shifts[model] = last + 1 - pk
+        self.batch.append(record)
+
+    def new_pk(self, model, pk):
+        if pk is None:
+            return None
+        return self.merged[model].get(pk, pk + self.shifts.get(model, 0))
+
+    def flush(self) -> None:
+        if not self.batch:
+            return
+        model = self.model
+        with transaction.atomic(), keeping_timestamps(model):
+            records = self.merge(model, self.batch)
+            authors = self.authors(records)
+            objects = [
+                self.build(model, record, authors) for record in records
+            ]
+            model.objects.bulk_create(objects)
+            if model is Post:
+                count_image_references(objects)
+        self.counts[model._meta.label_lower] += len(objects)
+        self.batch = []
+        if self.progress:
+            self.progress(model, self.counts[model._meta.label_lower])
+
+    def merge(self, model, records: list) -> list:
+        """Map records that match existing rows and return the rest."""
+        key = NATURAL_KEYS.get(model)
+        if key is None:
+            return records
+        existing = dict(model.objects.filter(**{
+            f'{key}__in': [record['fields'][key] for record in records]
+        }).values_list(key, 'pk'))
+        new = []
+        for record in records:
+            pk = existing.get(record['fields'][key])
+            if pk is None:
+                new.append(record)
+            else:
+                self.merged[model][record['pk']] = pk
+        return new
+
+    def authors(self, records: list) -> dict:
+        """Return user pks by username, creating missing users."""
+        names = {
+            record['fields']['author'] for record in records
+            if 'author' in record['fields']
+        }
+        if not names:
+            return {}
+        lookup = f'{User.USERNAME_FIELD}__in'
+        known = set(User.objects.filter(**{lookup: names}).values_list(
+            User.USERNAME_FIELD, flat=True
+        ))
+        missing = []
+        for name in names - known:
+            user = User(**{User.USERNAME_FIELD: name})
+            user.set_unusable_password()
+            missing.append(user)
+        User.objects.bulk_create(missing)
+        return dict(User.objects.filter(**{lookup: names}).values_list(
+            User.USERNAME_FIELD, 'pk'
+        ))
+
+    def build(self, model, record: dict, authors: dict):
+        values = record['fields']
+        kwargs = {'pk': self.new_pk(model, record['pk'])}
+        for field in transferred_fields(model):
+            if field.name not in values:
+                continue
+            value = values[field.name]
+            if field.related_model is User:
+                kwargs[field.attname] = authors[value]
+            elif field.is_relation:
+                kwargs[field.attname] = self.new_pk(field.related_model, value)
+            else:
+                kwargs[field.attname] = field.to_python(value)
+        return model(**kwargs)
+
+
+def count_image_references(posts: list) -> None:
+    """Add references of imported posts to their image files."""
+    images = Counter(post.image.name for post in posts if post.image)
+    described = {post.image.name: post for post in posts if post.image}
+    for name, count in images.items():
+        updated = MediaFile.objects.filter(name=name).update(
+            references=F('references') + count
+        )
+        if not updated:
+            post = described[name]
+            MediaFile.objects.create(
+                name=name, size=post.image_bytes or 0,
+                sha256=post.image_sha256, references=count
+            )
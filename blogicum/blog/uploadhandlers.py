@@ -0,0 +1,105 @@
+"""Upload handlers for post images."""
+import time
+import warnings
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadhandler import (SkipFile,
+                                             TemporaryFileUploadHandler)
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
+
+from core.metrics import Counter
+
+UPLOADS = Counter(
+    'blog_uploads_total', 'Post image uploads by outcome.', ('outcome',)
+)
+UPLOAD_BYTES = Counter(
+    'blog_upload_bytes_total', 'Bytes of accepted post image uploads.'
+)
+UPLOAD_SECONDS = Counter(
+    'blog_upload_seconds_total', 'Time spent receiving accepted uploads.'
+)
+
+
+def sniff_image(header: bytes):
+    """
+    Read format and size of an image from its leading bytes.
+
+    Returns None while the header is incomplete. Only the header is
+    parsed, the pixel data is never decoded.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', Image.DecompressionBombWarning)
+        try:
+            with Image.open(BytesIO(header)) as image:
+                return image.format, image.size
+        except Image.DecompressionBombError:
+            return 'bomb', (0, 0)
+        except (OSError, SyntaxError, ValueError):
+            return None
+
+
+class CappedImageUploadHandler(TemporaryFileUploadHandler):
+    """
+    Stream uploads to a temporary file with early image checks.
+
+    Files above POST_IMAGE_MAX_BYTES, with more than POST_IMAGE_MAX_PIXELS
+    pixels or in formats outside POST_IMAGE_FORMATS are skipped as soon
+    as that is known, and the reason is kept in request.upload_errors.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+        self.header = b''
+        self.sniffed = False
+        self.started = time.perf_counter()
+
+    def reject(self, message: str, outcome: str):
+        self.request.upload_errors = {
+            **getattr(self.request, 'upload_errors', {}),
+            self.field_name: message,
+        }
+        UPLOADS.inc(outcome=outcome)
+        raise SkipFile(message)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.POST_IMAGE_MAX_BYTES:
+            self.reject(
+                'Размер файла превышает '
+                f'{filesizeformat(settings.POST_IMAGE_MAX_BYTES)}.',
+                'too_large'
+            )
+        if not self.sniffed:
+            self.header += raw_data
+            self.check_header()
+        return super().receive_data_chunk(raw_data, start)
+
+    def check_header(self):
+        sniffed = sniff_image(self.header)
+        if sniffed is None:
+            if len(self.header) >= settings.POST_IMAGE_SNIFF_BYTES:
+                self.reject('Загрузите корректное изображение.', 'invalid')
+            return
+        self.sniffed, self.header = True, b''
+        image_format, (width, height) = sniffed
+        if image_format == 'bomb' or (
+            width * height > settings.POST_IMAGE_MAX_PIXELS
+        ):
+            self.reject(
+                'Изображение слишком большое: не более '
+                f'{settings.POST_IMAGE_MAX_PIXELS} пикселей.',
+                'too_many_pixels'
+            )
+        if image_format not in settings.POST_IMAGE_FORMATS:
+            self.reject(
+                f'Формат {image_format} не поддерживается.', 'bad_format'
+            )
+
+    def file_complete(self, file_size):
+        UPLOADS.inc(outcome='accepted')
+        UPLOAD_BYTES.inc(file_size)
+        UPLOAD_SECONDS.inc(time.perf_counter() - self.started)
+        return super().file_complete(file_size)
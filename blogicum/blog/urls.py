@@ -7,6 +7,7 @@ app_name = 'blog'
 
 urlpatterns = [
     path('', views.PostListView.as_view(), name='index'),
+    path('search/', views.SearchView.as_view(), name='search'),
     path('category/<slug:category_slug>/',
          views.CategoryListView.as_view(), name='category_posts'),
     path('posts/create/', views.PostCreateView.as_view(), name='create_post'),
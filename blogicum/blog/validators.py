@@ -5,8 +5,17 @@ from django.utils import timezone
 
 from difflib import SequenceMatcher
 
+from core.metrics import Counter
+
 PROFANITY_RATIO: float = 0.6
 
+PROFANITY_CHECKS = Counter(
+    'blog_profanity_checks_total', 'Texts checked for profanity.'
+)
+PROFANITY_REJECTIONS = Counter(
+    'blog_profanity_rejections_total', 'Texts rejected for profanity.'
+)
+
 
 def post_pub_date(pub_date: timezone) -> None:
     """Validate post pub_date."""
@@ -22,12 +31,14 @@ def post_pub_date(pub_date: timezone) -> None:
 def is_profanity(text: str) -> None:
     """Validate profanity in Post text."""
     from .models import Profanity
+    PROFANITY_CHECKS.inc()
     profanity_list = list(Profanity.objects.values_list('word', flat=True))
     words = text.replace(',', ' ').lower().split()
     for word in words:
         for profanity in profanity_list:
             compare = SequenceMatcher(None, word, profanity).ratio()
             if compare > PROFANITY_RATIO:
+                PROFANITY_REJECTIONS.inc()
                 raise ValidationError(
                     'Пожалуйста, не используйте обсценную лексику.'
                 )
@@ -1,24 +1,46 @@
 """Views of blog app."""
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import PermissionDenied
 from django.db.models import Count
 from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect
+from django.template import engines
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.utils.http import urlencode
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from django.views.generic import (CreateView, DeleteView, DetailView, ListView,
                                   UpdateView)
 
+from .deletion import delete_post
 from .forms import CommentForm, PostForm, UserEditForm
-from .models import Category, Comment, Post
+from .models import ArchivedPost, Category, Comment, Post
+from .search import search_posts
+from .tasks import enqueue_image_processing
+from .uploadhandlers import CappedImageUploadHandler
 
 PAGINATOR_ITEMS: int = 10
 POST_ORDERING: str = '-pub_date'
+POST_RELATIONS: tuple = ('category', 'location', 'author')
+JINJA2_ENGINE: str = 'jinja2'
 
 User = get_user_model()
 
 
+class TemplateEngineMixin:
+    """Mixin rendering with Jinja2 views listed in JINJA2_VIEWS."""
+
+    @property
+    def template_engine(self):
+        view_name = self.request.resolver_match.view_name
+        if view_name in settings.JINJA2_VIEWS and JINJA2_ENGINE in engines:
+            return JINJA2_ENGINE
+        return None
+
+
 class PostListMixin(ListView):
     """Mixin Class for posts list."""
 
@@ -30,12 +52,12 @@ class PostListMixin(ListView):
         is_published=True,
         category__is_published=True
     ).select_related(
-        'category', 'location', 'author'
+        *POST_RELATIONS
     ).annotate(comment_count=Count('comments'))
     ordering = POST_ORDERING
 
 
-class PostListView(ListView):
+class PostListView(TemplateEngineMixin, ListView):
     """List view for posts."""
 
     model = Post
@@ -49,20 +71,35 @@ class PostListView(ListView):
             is_published=True,
             category__is_published=True
         ).select_related(
-            'category', 'location', 'author'
+            *POST_RELATIONS
         ).annotate(comment_count=Count('comments')).order_by(POST_ORDERING)
 
 
-class Profile(ListView):
+class SearchView(PostListView):
+    """List view for posts matching a search query."""
+
+    template_name = 'blog/search.html'
+
+    def get_queryset(self):
+        return search_posts(
+            super().get_queryset(), self.request.GET.get('q', '')
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.request.GET.get('q', '').strip()
+        context['page_query'] = '&' + urlencode({'q': context['query']})
+        return context
+
+
+class Profile(TemplateEngineMixin, ListView):
     """List view for posts in user profile."""
 
     template_name = 'blog/profile.html'
     paginate_by = PAGINATOR_ITEMS
 
     def get_queryset(self):
-        return Post.objects.prefetch_related(
-            'category', 'location', 'author'
-        ).filter(
+        return Post.objects.select_related(*POST_RELATIONS).filter(
             author__username=self.kwargs['profile']
         ).annotate(comment_count=Count('comments')).order_by(POST_ORDERING)
 
@@ -90,16 +127,14 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
         )
 
 
-class CategoryListView(ListView):
+class CategoryListView(TemplateEngineMixin, ListView):
     """List view for posts in a category."""
 
     template_name = 'blog/category.html'
     paginate_by = PAGINATOR_ITEMS
 
     def get_queryset(self):
-        return Post.objects.prefetch_related(
-            'category', 'location', 'author'
-        ).filter(
+        return Post.objects.select_related(*POST_RELATIONS).filter(
             category__slug=self.kwargs['category_slug'],
             pub_date__lte=timezone.now(),
             is_published=True, category__is_published=True
@@ -114,34 +149,68 @@ class CategoryListView(ListView):
         return context
 
 
-class PostDetailView(DetailView):
+class PostDetailView(TemplateEngineMixin, DetailView):
     """Detail view for a post."""
 
     model = Post
+    context_object_name = 'post'
     slug_field = 'id'
     slug_url_kwarg = 'post_id'
     template_name = 'blog/detail.html'
 
     def dispatch(self, request, *args, **kwargs):
-        instance = get_object_or_404(Post, pk=kwargs['post_id'])
+        instance = Post.objects.select_related(*POST_RELATIONS).filter(
+            pk=kwargs['post_id']
+        ).first()
+        self.archived = instance is None
+        if self.archived:
+            instance = get_object_or_404(
+                ArchivedPost.objects.select_related(*POST_RELATIONS),
+                pk=kwargs['post_id']
+            )
         if (
             (not instance.is_published or not instance.category.is_published
              or instance.pub_date > timezone.now())
             and instance.author != request.user
         ):
             raise Http404('Страница не найдена')
+        self.instance = instance
         return super().dispatch(request, *args, **kwargs)
 
+    def get_object(self, queryset=None):
+        return self.instance
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['form'] = CommentForm()
+        context['archived'] = self.archived
+        if not self.archived:
+            context['form'] = CommentForm()
         context['comments'] = (
             self.object.comments.select_related('author')
         )
         return context
 
 
-class PostCreateView(LoginRequiredMixin, CreateView):
+@method_decorator(csrf_exempt, name='dispatch')
+class ImageUploadMixin:
+    """
+    Mixin streaming uploads through CappedImageUploadHandler.
+
+    Upload handlers must be replaced before the request body is read,
+    and CsrfViewMiddleware reads it, so CSRF is checked in dispatch.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        request.upload_handlers = [CappedImageUploadHandler(request)]
+        return csrf_protect(super().dispatch)(request, *args, **kwargs)
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['upload_errors'] = getattr(self.request, 'upload_errors', {})
+        return kwargs
+
+
+class PostCreateView(ImageUploadMixin, LoginRequiredMixin, CreateView):
     """Create view for post creation."""
 
     model = Post
@@ -150,7 +219,9 @@ class PostCreateView(LoginRequiredMixin, CreateView):
 
     def form_valid(self, form):
         form.instance.author = self.request.user
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        enqueue_image_processing(self.object)
+        return response
 
     def get_success_url(self):
         return reverse('blog:profile', kwargs={'profile': self.request.user})
@@ -167,17 +238,26 @@ class PostUpdateDeleteMixin(LoginRequiredMixin):
 
     def dispatch(self, request, *args, **kwargs):
         """Dispatch method depends on child class."""
-        instance = get_object_or_404(Post, pk=kwargs['post_id'])
-        if instance.author != request.user:
+        self.instance = get_object_or_404(Post, pk=kwargs['post_id'])
+        if self.instance.author_id != request.user.pk:
             if type(self).__name__ == 'PostUpdateView':
                 return redirect('blog:post_detail', kwargs['post_id'])
             raise PermissionDenied('Ошибка доступа')
         return super().dispatch(request, *args, **kwargs)
 
+    def get_object(self, queryset=None):
+        return self.instance
+
 
-class PostUpdateView(PostUpdateDeleteMixin, UpdateView):
+class PostUpdateView(ImageUploadMixin, PostUpdateDeleteMixin, UpdateView):
     """Update view for post update."""
 
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        if 'image' in form.changed_data:
+            enqueue_image_processing(self.object)
+        return response
+
     def get_success_url(self):
         return reverse(
             'blog:post_detail', kwargs={'post_id': self.kwargs['post_id']}
@@ -187,6 +267,11 @@ class PostUpdateView(PostUpdateDeleteMixin, UpdateView):
 class PostDeleteView(PostUpdateDeleteMixin, DeleteView):
     """Delete view for post deletion."""
 
+    def delete(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        delete_post(self.object)
+        return redirect(self.get_success_url())
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = {'instance': self.object}
@@ -229,11 +314,14 @@ class CommentUpdateDeleteMixin(LoginRequiredMixin):
     template_name = 'blog/comment.html'
 
     def dispatch(self, request, *args, **kwargs):
-        instance = get_object_or_404(Comment, pk=kwargs['comment_id'])
-        if instance.author != request.user:
+        self.instance = get_object_or_404(Comment, pk=kwargs['comment_id'])
+        if self.instance.author_id != request.user.pk:
             raise PermissionDenied('Ошибка доступа')
         return super().dispatch(request, *args, **kwargs)
 
+    def get_object(self, queryset=None):
+        return self.instance
+
     def get_success_url(self):
         return reverse(
             'blog:post_detail', kwargs={'post_id': self.kwargs['post_id']}
@@ -10,8 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import importlib.util
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -23,7 +27,8 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = 'django-insecure-9i(+5wgp4l9)yi0-3j&(l-=u*d$)hz$r!b&ey3-x(l7%n&jpfw'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# BLOGICUM_DEBUG=0 turns it off, e.g. for the bench_http server.
+DEBUG = os.environ.get('BLOGICUM_DEBUG', '1') != '0'
 
 ALLOWED_HOSTS = [
     'localhost',
@@ -42,6 +47,7 @@ LOGIN_URL = 'login'
 
 INSTALLED_APPS = [
     'blog.apps.BlogConfig',
+    'core.apps.CoreConfig',
     'pages.apps.PagesConfig',
     'django.contrib.admin',
     'django.contrib.auth',
@@ -54,11 +60,17 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.ServerTimingMiddleware',
+    'core.middleware.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.middleware.ReplicaStickinessMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ProfilingMiddleware',
+    'core.middleware.MemoryTrackingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware'
@@ -70,6 +82,87 @@ EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+MEDIA_URL = '/media/'
+
+# Media serving. Names matching MEDIA_IMMUTABLE_NAMES never change
+# content and are cached for a year; other files for
+# MEDIA_CACHE_MAX_AGE seconds. Set MEDIA_SENDFILE to 'x-sendfile'
+# (Apache, lighttpd) or 'x-accel-redirect' (nginx, with an internal
+# location at MEDIA_ACCEL_REDIRECT_PREFIX) to let the proxy send files.
+MEDIA_IMMUTABLE_NAMES = (
+    r'^post_images/(?:[0-9a-f]{2}/){2}[0-9a-f]{64}\.\w+$',
+    r'^renditions/post_images/(?:[0-9a-f]{2}/){2}[0-9a-f]{64}-\d+w\.\w+$',
+)
+
+MEDIA_CACHE_MAX_AGE = 3600
+
+MEDIA_SENDFILE = None
+
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
+# Storage class for post images. Content-addressed storage keeps one
+# copy of identical uploads in directories sharded by hash prefix.
+POST_IMAGE_STORAGE = 'blog.storage.ContentAddressedStorage'
+
+# Post image renditions. Every rendition is encoded as WebP and as
+# a JPEG fallback (PNG for images with transparency); per-format
+# options of a rendition override POST_IMAGE_ENCODER_DEFAULTS.
+POST_IMAGE_RENDITIONS = {
+    'sm': {'width': 320, 'webp': {'quality': 72}, 'jpeg': {'quality': 76}},
+    'md': {'width': 640, 'webp': {'quality': 76}, 'jpeg': {'quality': 80}},
+    'lg': {'width': 1280, 'webp': {'quality': 80}, 'jpeg': {'quality': 82}},
+}
+
+POST_IMAGE_ENCODER_DEFAULTS = {
+    'webp': {'quality': 80, 'method': 6},
+    'jpeg': {'quality': 82, 'optimize': True, 'progressive': True},
+    'png': {'optimize': True},
+}
+
+POST_IMAGE_SIZES = '(min-width: 768px) 40rem, 100vw'
+
+# Post image upload limits, checked while the upload streams in.
+# Pixel count and format are read from the first
+# POST_IMAGE_SNIFF_BYTES bytes, before any pixel data is decoded.
+POST_IMAGE_MAX_BYTES = 10 * 1024 * 1024
+
+POST_IMAGE_MAX_PIXELS = 40_000_000
+
+POST_IMAGE_SNIFF_BYTES = 256 * 1024
+
+POST_IMAGE_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+
+# Post image processing queue, drained by `manage.py run_image_worker`.
+# At most IMAGE_WORKERS * IMAGE_JOB_QUEUE_FACTOR jobs are in flight;
+# failed jobs are retried with exponential backoff starting at
+# IMAGE_JOB_RETRY_DELAY seconds. Eager mode processes images in the
+# request thread, which is only meant for development.
+IMAGE_WORKERS = os.cpu_count() or 1
+
+IMAGE_JOB_QUEUE_FACTOR = 2
+
+IMAGE_JOB_POLL_INTERVAL = 1.0
+
+IMAGE_JOB_MAX_ATTEMPTS = 3
+
+IMAGE_JOB_RETRY_DELAY = 30
+
+IMAGE_JOB_TIMEOUT = 600
+
+IMAGE_JOBS_EAGER = False
+
+# Post search ranks only this many newest matches of a query, which
+# keeps searches for common words fast and bounds the result pages.
+SEARCH_MAX_RESULTS = 1000
+
+# `manage.py archive_posts` moves posts published more than this many
+# days ago, with their comments, into the archive tables.
+ARCHIVE_POSTS_AFTER_DAYS = 365
+
+# Users and posts are deleted with their comments in batches of this
+# many rows, each in its own short transaction.
+DELETION_BATCH_SIZE = 1000
+
 INTERNAL_IPS = [
     '127.0.0.1',
 ]
@@ -78,12 +171,24 @@ ROOT_URLCONF = 'blogicum.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+# Production keeps parsed templates in memory; with DEBUG they are read
+# and parsed on every render so that edits show up without a restart.
+# bench_templates measures the difference.
+CACHED_TEMPLATE_LOADERS = [
+    ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS if DEBUG else CACHED_TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -94,19 +199,220 @@ TEMPLATES = [
     },
 ]
 
+# Views rendered with the Jinja2 templates in jinja2/, by URL name, as
+# listed in BLOGICUM_JINJA2_VIEWS separated by commas. Jinja2 is an
+# optional dependency; without it every view uses Django templates.
+JINJA2_VIEWS = tuple(
+    filter(None, os.environ.get('BLOGICUM_JINJA2_VIEWS', '').split(','))
+)
+
+if importlib.util.find_spec('jinja2'):
+    TEMPLATES.append({
+        'BACKEND': 'django.template.backends.jinja2.Jinja2',
+        'NAME': 'jinja2',
+        'DIRS': [BASE_DIR / 'jinja2'],
+        'OPTIONS': {
+            'environment': 'core.jinja.environment',
+            'context_processors': TEMPLATES[0]['OPTIONS'][
+                'context_processors'
+            ],
+        },
+    })
+
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# SQLite tuning applied to every new connection by the core backend:
+# WAL lets readers proceed while a writer commits, synchronous=NORMAL
+# is durable enough under WAL, and busy_timeout makes writers wait for
+# the lock instead of failing. cache_size is in KiB when negative.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+# Keep connections open between requests for CONN_MAX_AGE seconds, so
+# the connection setup above runs once per worker thread rather than
+# once per request. Reused connections are health-checked first.
+CONN_MAX_AGE = 600
+
+# BLOGICUM_DATABASE points the site at another SQLite file, such as a
+# dataset made by generate_dataset for bench_http.
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'ENGINE': 'core.backends.sqlite3',
+        'NAME': os.environ.get('BLOGICUM_DATABASE', BASE_DIR / 'db.sqlite3'),
+        'PRAGMAS': SQLITE_PRAGMAS,
+        'TRANSACTION_MODE': 'IMMEDIATE',
+        'CONN_MAX_AGE': CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Read replicas of the default database, listed in BLOGICUM_REPLICAS
+# as SQLite paths separated by os.pathsep. Reads of
+# REPLICA_ROUTED_APPS go to a random replica, writes to the primary;
+# a client that wrote reads from the primary for REPLICA_STICKY_SECONDS.
+DATABASE_REPLICAS = []
+
+for number, replica in enumerate(
+    filter(None, os.environ.get('BLOGICUM_REPLICAS', '').split(os.pathsep))
+):
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'NAME': replica,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+
+REPLICA_ROUTED_APPS = ('blog',)
+
+REPLICA_STICKY_SECONDS = 15
+
+# Process-local cache; lookups are counted for Server-Timing.
+CACHES = {
+    'default': {
+        'BACKEND': 'core.cache.LocMemCache',
+    },
+}
+
+# Memcached servers shared by all workers, separated by commas, for
+# sessions of the 'cached_db' profile (BLOGICUM_SESSION_CACHE).
+SESSION_CACHE_SERVERS = [
+    server.strip()
+    for server in os.environ.get('BLOGICUM_SESSION_CACHE', '').split(',')
+    if server.strip()
+]
+
+if SESSION_CACHE_SERVERS:
+    CACHES['sessions'] = {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': SESSION_CACHE_SERVERS,
+    }
+
+# Session storage, chosen by BLOGICUM_SESSION_PROFILE. 'db' reads
+# django_session on every request of a logged-in user. 'cached_db'
+# reads sessions from the sessions cache and writes them through to
+# the database. A logout or password change must reach every worker,
+# so it needs the shared cache of SESSION_CACHE_SERVERS: with a
+# process-local one other workers would keep the session valid.
+# 'signed_cookies' keeps the session, just the user id and hashes, in a
+# signed cookie that cannot be revoked before it expires except by a
+# password change. bench_sessions compares them; purge_sessions deletes
+# expired rows.
+SESSION_PROFILES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+
+SESSION_PROFILE = os.environ.get('BLOGICUM_SESSION_PROFILE', 'db')
+
+if SESSION_PROFILE not in SESSION_PROFILES:
+    raise ImproperlyConfigured(
+        f'Unknown BLOGICUM_SESSION_PROFILE {SESSION_PROFILE!r}, expected '
+        f'one of: {", ".join(SESSION_PROFILES)}.'
+    )
+
+if SESSION_PROFILE == 'cached_db' and not SESSION_CACHE_SERVERS:
+    raise ImproperlyConfigured(
+        "The 'cached_db' session profile needs a cache shared by all "
+        'workers; set BLOGICUM_SESSION_CACHE to memcached servers.'
+    )
+
+SESSION_ENGINE = SESSION_PROFILES[SESSION_PROFILE]
+
+SESSION_CACHE_ALIAS = 'sessions' if SESSION_CACHE_SERVERS else 'default'
+
+# Request cost accounting. SERVER_TIMING_SAMPLE_RATE of requests have
+# their total, SQL, template and cache costs logged to core.timing;
+# the Server-Timing header goes to staff, or to everyone when
+# SERVER_TIMING_PUBLIC is set.
+SERVER_TIMING_SAMPLE_RATE = 1.0 if DEBUG else 0.05
+
+SERVER_TIMING_PUBLIC = DEBUG
+
+# Queries of a request taking SLOW_QUERY_THRESHOLD_MS or longer are
+# appended to SLOW_QUERY_LOG, set by BLOGICUM_SLOW_QUERY_LOG and off by
+# default; keep it outside the checkout. The plan of a new query shape
+# is captured at most once per SLOW_QUERY_EXPLAIN_INTERVAL seconds; see
+# `manage.py slow_query_report`.
+SLOW_QUERY_THRESHOLD_MS = 100
+
+SLOW_QUERY_LOG = os.environ.get('BLOGICUM_SLOW_QUERY_LOG')
+
+SLOW_QUERY_EXPLAIN_INTERVAL = 1.0
+
+# Prometheus metrics at /metrics, for staff and the scrapers listed in
+# BLOGICUM_METRICS_ALLOWED_IPS, separated by commas. None by default:
+# behind a local reverse proxy every client comes from 127.0.0.1.
+# Worker processes sharing METRICS_DIR (BLOGICUM_METRICS_DIR) write
+# their metrics there at most every METRICS_FLUSH_INTERVAL seconds and
+# /metrics sums them; without it only the serving process is reported.
+METRICS_DIR = os.environ.get('BLOGICUM_METRICS_DIR')
+
+METRICS_FLUSH_INTERVAL = 5
+
+METRICS_ALLOWED_IPS = [
+    address.strip()
+    for address in os.environ.get('BLOGICUM_METRICS_ALLOWED_IPS', '').split(',')
+    if address.strip()
+]
+
+# Request profiling: collapsed stacks sampled every PROFILE_INTERVAL
+# seconds are written to PROFILE_DIR (BLOGICUM_PROFILE_DIR) for
+# requests of staff carrying a signed flag from `manage.py profile_url`,
+# valid for PROFILE_TOKEN_MAX_AGE seconds, and for one in PROFILE_ONE_IN
+# requests when it is set. Without PROFILE_DIR profiling is off.
+PROFILE_DIR = os.environ.get('BLOGICUM_PROFILE_DIR')
+
+PROFILE_ONE_IN = 0
+
+PROFILE_INTERVAL = 0.005
+
+PROFILE_TOKEN_MAX_AGE = 3600
+
+# Opt-in tracemalloc accounting of every request, reported by URL name
+# to the core.memory log and at /memory/ for staff. It slows requests
+# down noticeably, so enable it (BLOGICUM_MEMORY_TRACKING=1) while
+# hunting a leak. MEMORY_TRACKING_TOP allocation sites are kept.
+MEMORY_TRACKING = bool(os.environ.get('BLOGICUM_MEMORY_TRACKING'))
+
+MEMORY_TRACKING_FRAMES = 1
+
+MEMORY_TRACKING_TOP = 10
+
+MEMORY_REPORT_SIZE = 20
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'core.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+        'core.memory': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -1,11 +1,11 @@
 """URL dispatcher for blogicum project."""
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path, reverse_lazy
 from django.views.generic.edit import CreateView
 
 from blog.forms import CustomUserCreationForm
+from core.views import memory, metrics, serve_media
 
 handler403 = 'pages.views.forbidden'
 handler404 = 'pages.views.page_not_found'
@@ -15,6 +15,8 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('pages/', include('pages.urls')),
     path('auth/', include('django.contrib.auth.urls')),
+    path('metrics', metrics, name='metrics'),
+    path('memory/', memory, name='memory'),
     path('', include('blog.urls')),
     path(
         'auth/registration/',
@@ -31,4 +33,7 @@ if settings.DEBUG:
     import debug_toolbar
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
 
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+urlpatterns += (
+    path(f'{settings.MEDIA_URL.lstrip("/")}<path:path>', serve_media,
+         name='media'),
+)
@@ -0,0 +1,10 @@
+"""Module of core app configuration."""
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    """Configuration class of core app."""
+
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+    verbose_name = 'Инфраструктура'
@@ -0,0 +1,94 @@
+"""Persistent database connections with health checks."""
+import atexit
+import threading
+import weakref
+from contextlib import suppress
+
+from django.db import DatabaseError
+
+from core.metrics import Counter
+
+DB_CONNECTIONS = Counter(
+    'db_connections_total',
+    'Database connection lifecycle events: opened, reused, closed '
+    'and health_check_failed.',
+    ('alias', 'event')
+)
+
+# Wrappers with an open connection, of every thread: connections holds
+# only those of the calling thread.
+OPEN_CONNECTIONS = weakref.WeakSet()
+
+OPEN_CONNECTIONS_LOCK = threading.Lock()
+
+
+class HealthCheckedConnectionMixin:
+    """
+    Database wrapper mixin checking persistent connections before reuse.
+
+    Mirrors CONN_HEALTH_CHECKS of newer Django: a connection kept alive
+    by CONN_MAX_AGE is checked with is_usable() at its first use in each
+    request and reopened if the check fails. Lifecycle events are
+    counted in DB_CONNECTIONS.
+    """
+
+    health_check_done = False
+
+    @property
+    def health_check_enabled(self) -> bool:
+        return self.settings_dict.get('CONN_HEALTH_CHECKS', False)
+
+    def connect(self):
+        super().connect()
+        self.health_check_done = True
+        with OPEN_CONNECTIONS_LOCK:
+            OPEN_CONNECTIONS.add(self)
+        DB_CONNECTIONS.inc(alias=self.alias, event='opened')
+
+    def ensure_connection(self):
+        if self.connection is not None and not self.health_check_done:
+            self.health_check_done = True
+            if (self.health_check_enabled and not self.in_atomic_block
+                    and not self.is_usable()):
+                DB_CONNECTIONS.inc(
+                    alias=self.alias, event='health_check_failed'
+                )
+                self.close()
+            else:
+                DB_CONNECTIONS.inc(alias=self.alias, event='reused')
+        super().ensure_connection()
+
+    def close_if_unusable_or_obsolete(self):
+        connected = self.connection is not None
+        super().close_if_unusable_or_obsolete()
+        if connected and self.connection is None:
+            DB_CONNECTIONS.inc(alias=self.alias, event='closed')
+        # Called at request boundaries: check again before the next use.
+        self.health_check_done = False
+
+
+def close_all_connections() -> None:
+    """Close the open connections of all threads."""
+    with OPEN_CONNECTIONS_LOCK:
+        wrappers = list(OPEN_CONNECTIONS)
+    for wrapper in wrappers:
+        if wrapper.connection is None:
+            continue
+        # Connections of other threads may be closed once sharing is
+        # allowed; Django opens SQLite ones without check_same_thread.
+        wrapper.inc_thread_sharing()
+        with suppress(DatabaseError):
+            wrapper.close()
+
+
+def close_connections_at_exit() -> None:
+    """
+    Close the connections of all threads when the process exits.
+
+    Persistent connections otherwise outlive the worker until the OS
+    reclaims them; closing the last SQLite connection also checkpoints
+    and removes the WAL file. Threaded servers open a connection per
+    request thread, so those are tracked rather than taken from
+    connections, which only has the connections of the exiting thread.
+    """
+    atexit.register(close_all_connections)
@@ -0,0 +1,44 @@
+"""SQLite backend tuned for concurrent web traffic."""
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+from core.backends.persistent import HealthCheckedConnectionMixin
+
+PRAGMA_NAME_RE = re.compile(r'^[a-z_]+$')
+
+TRANSACTION_MODES: tuple = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+def apply_pragmas(connection, pragmas: dict) -> None:
+    """Execute PRAGMA statements on a DB-API SQLite connection."""
+    for name, value in pragmas.items():
+        if not PRAGMA_NAME_RE.match(name):
+            raise ImproperlyConfigured(f'Invalid SQLite pragma: {name!r}.')
+        connection.execute(f'PRAGMA {name} = {value}')
+
+
+class DatabaseWrapper(HealthCheckedConnectionMixin, base.DatabaseWrapper):
+    """
+    SQLite connection wrapper with settings-driven tuning.
+
+    PRAGMAS from the database settings are applied to every new
+    connection, and TRANSACTION_MODE picks how atomic blocks begin:
+    IMMEDIATE takes the write lock upfront, so concurrent writers wait
+    for busy_timeout instead of failing with "database is locked" on
+    a read-to-write lock upgrade.
+    """
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        apply_pragmas(connection, self.settings_dict.get('PRAGMAS', {}))
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict.get('TRANSACTION_MODE', 'DEFERRED').upper()
+        if mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f'Invalid SQLite transaction mode: {mode!r}.'
+            )
+        self.cursor().execute(f'BEGIN {mode}')
@@ -0,0 +1,288 @@
+"""Load benchmark replaying a traffic mix against a running server."""
+import http.client
+import json
+import math
+import platform
+import random
+import threading
+import time
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+from django.contrib.auth import get_user_model
+from django.db.models import Max
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.models import Category, Post
+
+User = get_user_model()
+
+# Share of requests of each kind. Deep feed pages make the database
+# skip many rows, so they are reported apart from the first pages.
+TRAFFIC_MIX: dict = {
+    'blog:index': 30,
+    'blog:index:deep': 10,
+    'blog:category_posts': 15,
+    'blog:profile': 10,
+    'blog:post_detail': 30,
+    'blog:add_comment': 4,
+    'login': 1,
+}
+
+# The feed pages a reader usually stays on.
+SHALLOW_PAGES: int = 5
+
+PERCENTILES: tuple = (50, 95, 99)
+
+# Targets sampled from the dataset before the run.
+SAMPLE_SIZE: int = 1000
+
+COMMENT_TEXT: str = 'Интересная публикация, спасибо за подробности.'
+
+CSRF_COOKIE: str = 'csrftoken'
+
+
+class Targets:
+    """Objects of the dataset the traffic mix refers to."""
+
+    def __init__(self, seed: int, password: str):
+        rng = random.Random(seed)
+        posts = Post.objects.filter(
+            is_published=True, category__is_published=True,
+            pub_date__lte=timezone.now()
+        )
+        last_pk = posts.aggregate(last=Max('pk'))['last'] or 0
+        self.posts = list(posts.filter(
+            pk__in=rng.sample(range(1, last_pk + 1), min(last_pk, SAMPLE_SIZE))
+        ).values_list('pk', flat=True))
+        self.categories = list(Category.objects.filter(
+            is_published=True
+        ).values_list('slug', flat=True)[:SAMPLE_SIZE])
+        self.authors = list(posts.values_list(
+            'author__username', flat=True
+        ).distinct()[:SAMPLE_SIZE])
+        self.users = list(User.objects.filter(
+            is_active=True, is_staff=False
+        ).values_list('username', flat=True)[:SAMPLE_SIZE])
+        self.last_page = max(1, math.ceil(posts.count() / 10))
+        self.password = password
+        if not (self.posts and self.categories and self.authors):
+            raise ValueError('The dataset has no published posts.')
+
+
+class Client:
+    """Keep-alive HTTP client with cookies, logged in as a dataset user."""
+
+    def __init__(self, base_url: str, timeout: float):
+        parts = urlsplit(base_url)
+        self.connection = http.client.HTTPConnection(
+            parts.hostname, parts.port or 80, timeout=timeout
+        )
+        self.cookies = SimpleCookie()
+
+    def request(self, method: str, path: str, data: dict = None):
+        headers = {}
+        if self.cookies:
+            headers['Cookie'] = '; '.join(
+                f'{key}={morsel.value}' for key, morsel in self.cookies.items()
+            )
+        body = None
+        if data is not None:
+            body = urlencode(data)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        try:
+            self.connection.request(method, path, body, headers)
+            response = self.connection.getresponse()
+            content = response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            raise
+        for header in response.headers.get_all('Set-Cookie') or ():
+            self.cookies.load(header)
+        return response.status, content
+
+    def post_form(self, path: str, form_path: str, data: dict):
+        """Post data, opening the form first if there is no CSRF cookie."""
+        if CSRF_COOKIE not in self.cookies:
+            self.request('GET', form_path)
+        token = self.cookies[CSRF_COOKIE].value
+        return self.request(
+            'POST', path, {**data, 'csrfmiddlewaretoken': token}
+        )
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+class Worker(threading.Thread):
+    """One client replaying the traffic mix until the deadline."""
+
+    def __init__(self, number, base_url, targets, options, started):
+        super().__init__(daemon=True)
+        self.rng = random.Random(options['seed'] * 1000 + number)
+        self.client = Client(base_url, options['timeout'])
+        self.targets = targets
+        self.started = started
+        self.warmup = options['warmup']
+        self.seconds = options['seconds']
+        self.latencies = {name: [] for name in TRAFFIC_MIX}
+        self.errors = {name: 0 for name in TRAFFIC_MIX}
+        self.kinds = list(TRAFFIC_MIX)
+        self.weights = list(TRAFFIC_MIX.values())
+        self.logged_in = False
+
+    def run(self) -> None:
+        deadline = self.started + self.warmup + self.seconds
+        while time.monotonic() < deadline:
+            name = self.rng.choices(self.kinds, self.weights)[0]
+            if name == 'blog:add_comment' and not self.logged_in:
+                name = 'login'
+            begin = time.monotonic()
+            try:
+                status = getattr(self, name.replace(':', '_'))()
+                failed = status >= 400
+            except (OSError, http.client.HTTPException):
+                failed = True
+            end = time.monotonic()
+            if begin >= self.started + self.warmup:
+                self.latencies[name].append(end - begin)
+                self.errors[name] += failed
+        self.client.close()
+
+    def get(self, path: str) -> int:
+        return self.client.request('GET', path)[0]
+
+    def blog_index(self) -> int:
+        page = self.rng.randint(1, min(SHALLOW_PAGES, self.targets.last_page))
+        return self.get(f'{reverse("blog:index")}?page={page}')
+
+    def blog_index_deep(self) -> int:
+        first = min(SHALLOW_PAGES + 1, self.targets.last_page)
+        page = self.rng.randint(first, self.targets.last_page)
+        return self.get(f'{reverse("blog:index")}?page={page}')
+
+    def blog_category_posts(self) -> int:
+        slug = self.rng.choice(self.targets.categories)
+        return self.get(reverse('blog:category_posts', args=(slug,)))
+
+    def blog_profile(self) -> int:
+        username = self.rng.choice(self.targets.authors)
+        return self.get(reverse('blog:profile', args=(username,)))
+
+    def blog_post_detail(self) -> int:
+        post = self.rng.choice(self.targets.posts)
+        return self.get(reverse('blog:post_detail', args=(post,)))
+
+    def blog_add_comment(self) -> int:
+        post = self.rng.choice(self.targets.posts)
+        return self.client.post_form(
+            reverse('blog:add_comment', args=(post,)),
+            reverse('blog:post_detail', args=(post,)),
+            {'text': COMMENT_TEXT},
+        )[0]
+
+    def login(self) -> int:
+        status, _ = self.client.post_form(
+            reverse('login'), reverse('login'), {
+                'username': self.rng.choice(self.targets.users),
+                'password': self.targets.password,
+            }
+        )
+        # A successful login redirects; a failed one shows the form.
+        self.logged_in = status == 302
+        return status if self.logged_in else 401
+
+
+def percentile(values: list, rank: int) -> float:
+    """Return the nearest-rank percentile of sorted values."""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(rank / 100 * len(values)) - 1)]
+
+
+def summarize(latencies: list, errors: int, seconds: float) -> dict:
+    latencies = sorted(latencies)
+    summary = {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': len(latencies) / seconds,
+    }
+    for rank in PERCENTILES:
+        summary[f'p{rank}_ms'] = percentile(latencies, rank) * 1000
+    return summary
+
+
+def run(base_url: str, targets: Targets, options: dict) -> dict:
+    """Replay the traffic mix from concurrent clients and return results."""
+    started = time.monotonic()
+    workers = [
+        Worker(number, base_url, targets, options, started)
+        for number in range(options['clients'])
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    views = {}
+    for name in TRAFFIC_MIX:
+        latencies = [
+            latency for worker in workers for latency in worker.latencies[name]
+        ]
+        errors = sum(worker.errors[name] for worker in workers)
+        views[name] = summarize(latencies, errors, options['seconds'])
+    total = summarize(
+        [latency for worker in workers
+         for name in TRAFFIC_MIX for latency in worker.latencies[name]],
+        sum(view['errors'] for view in views.values()),
+        options['seconds'],
+    )
+    return {
+        'started': timezone.now().isoformat(),
+        'machine': platform.platform(),
+        'python': platform.python_version(),
+        'options': {
+            key: options[key]
+            for key in ('clients', 'seconds', 'warmup', 'seed')
+        },
+        'mix': TRAFFIC_MIX,
+        'total': total,
+        'views': views,
+    }
+
+
+def compare(baseline: dict, current: dict) -> list:
+    """Return rows of relative changes of throughput and latencies."""
+    rows = []
+    names = ['total'] + sorted(set(baseline['views']) | set(current['views']))
+    for name in names:
+        before = baseline['total'] if name == 'total' else (
+            baseline['views'].get(name))
+        after = current['total'] if name == 'total' else (
+            current['views'].get(name))
+        if not before or not after:
+            continue
+        row = {'view': name}
+        for key in ['rps'] + [f'p{rank}_ms' for rank in PERCENTILES]:
+            row[key] = (
+                before[key], after[key], change(before[key], after[key])
+            )
+        rows.append(row)
+    return rows
+
+
+def change(before: float, after: float):
+    """Return the relative change in percent, or None without a base."""
+    if not before:
+        return None
+    return (after - before) / before * 100
+
+
+def save(results: dict, path) -> None:
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(results, file, ensure_ascii=False, indent=2)
+
+
+def load(path) -> dict:
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
@@ -0,0 +1,32 @@
+"""Cache backends reporting hits and misses to request timings."""
+from django.core.cache.backends import locmem
+
+from .metrics import Counter
+from .timing import count_cache_lookup
+
+CACHE_LOOKUPS = Counter(
+    'cache_lookups_total', 'Cache lookups by result: hit or miss.',
+    ('result',)
+)
+
+MISSING = object()
+
+
+class InstrumentedCacheMixin:
+    """
+    Count lookups of a cache backend for Server-Timing.
+
+    BaseCache implements get_many() and get_or_set() with get(), so
+    overriding get() alone counts every lookup of such backends.
+    """
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, MISSING, version)
+        hit = value is not MISSING
+        CACHE_LOOKUPS.inc(result='hit' if hit else 'miss')
+        count_cache_lookup(hit)
+        return default if value is MISSING else value
+
+
+class LocMemCache(InstrumentedCacheMixin, locmem.LocMemCache):
+    """Process-local memory cache with lookup accounting."""
@@ -0,0 +1,58 @@
+"""Jinja2 environment with the helpers the blog templates use."""
+from django.template import defaultfilters
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils import formats
+from django.utils.timezone import template_localtime
+from django_bootstrap5.templatetags.django_bootstrap5 import (bootstrap_button,
+                                                              bootstrap_css,
+                                                              bootstrap_form)
+from jinja2 import Environment, Undefined, pass_environment
+from markupsafe import Markup
+
+from blog.templatetags import blog_images
+
+
+def url(view_name: str, *args, **kwargs) -> str:
+    """Reverse a URL like the url template tag."""
+    return reverse(view_name, args=args or None, kwargs=kwargs or None)
+
+
+def date(value, arg: str = None) -> str:
+    """Format a date in the current time zone like the date filter."""
+    return defaultfilters.date(template_localtime(value), arg)
+
+
+def localize(value) -> str:
+    """Format a value as Django templates print it."""
+    return formats.localize(template_localtime(value))
+
+
+@pass_environment
+def post_image(env, post, loading: str = 'lazy') -> Markup:
+    """Render a responsive picture for a post image."""
+    return Markup(env.get_template('includes/post_image.html').render(
+        blog_images.post_image(post, loading)
+    ))
+
+
+def environment(**options) -> Environment:
+    """Return the environment of the Jinja2 engine in TEMPLATES."""
+    # Missing variables render empty, as in Django templates, rather
+    # than as their names like with DEBUG by default.
+    env = Environment(**{**options, 'undefined': Undefined})
+    env.globals.update(
+        url=url,
+        static=static,
+        post_image=post_image,
+        bootstrap_css=bootstrap_css,
+        bootstrap_form=bootstrap_form,
+        bootstrap_button=bootstrap_button,
+    )
+    env.filters.update(
+        date=date,
+        localize=localize,
+        truncatewords=defaultfilters.truncatewords,
+        linebreaksbr=defaultfilters.linebreaksbr,
+    )
+    return env
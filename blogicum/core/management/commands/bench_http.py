@@ -0,0 +1,166 @@
+"""Management command to load test the site with a traffic mix."""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import (get_internal_wsgi_application,
+                                          run)
+
+from blog.management.commands.generate_dataset import PASSWORD
+from core import bench
+
+HOST: str = '127.0.0.1'
+
+SERVER_START_TIMEOUT: float = 30
+
+# Settings are read once at import, so the server gets its production
+# configuration, DEBUG off and with it the cached template loader,
+# through the environment of its process.
+SERVER_ENVIRONMENT: dict = {'BLOGICUM_DEBUG': '0'}
+
+# Lines of the server's output shown when it fails to start.
+SERVER_LOG_LINES: int = 20
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay a mix of feed, category, profile, post, comment and login '
+        'requests from concurrent clients and report requests/s and '
+        'latency percentiles per URL name. Without --base-url a server '
+        'with DEBUG off is started against the configured database, '
+        'which should hold a dataset made by generate_dataset '
+        '(set BLOGICUM_DATABASE to keep it apart). Comments posted '
+        'during the run stay in the database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url',
+            help='Benchmark a running server instead of starting one.'
+        )
+        parser.add_argument('--clients', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=30)
+        parser.add_argument(
+            '--warmup', type=float, default=3,
+            help='Seconds of requests left out of the results.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--timeout', type=float, default=30)
+        parser.add_argument(
+            '--password', default=PASSWORD,
+            help='Password of dataset users, used to log in.'
+        )
+        parser.add_argument('--output', help='Save results as JSON.')
+        parser.add_argument(
+            '--compare', nargs='+', metavar='RESULTS',
+            help='Compare the run with saved results; given two files, '
+                 'compare them without running.'
+        )
+        parser.add_argument('--serve', type=int, help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['serve']:
+            return self.serve(options['serve'])
+        compare = options['compare'] or []
+        if len(compare) > 2:
+            raise CommandError('--compare takes one or two result files.')
+        if len(compare) == 2:
+            baseline, current = map(bench.load, compare)
+            self.write_comparison(baseline, current)
+            return
+        try:
+            targets = bench.Targets(options['seed'], options['password'])
+        except ValueError as error:
+            raise CommandError(error)
+        if options['base_url']:
+            results = bench.run(options['base_url'], targets, options)
+        else:
+            server, base_url = self.start_server()
+            try:
+                results = bench.run(base_url, targets, options)
+            finally:
+                server.terminate()
+                server.wait()
+        self.write_results(results)
+        if options['output']:
+            bench.save(results, options['output'])
+        if compare:
+            self.write_comparison(bench.load(compare[0]), results)
+
+    def serve(self, port):
+        """Run the site in this process, started by start_server()."""
+        run(HOST, port, get_internal_wsgi_application(), threading=True)
+
+    def start_server(self):
+        with socket.socket() as probe:
+            probe.bind((HOST, 0))
+            port = probe.getsockname()[1]
+        log = tempfile.TemporaryFile()
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'django', 'bench_http',
+             '--serve', str(port)],
+            cwd=settings.BASE_DIR, stdout=log, stderr=subprocess.STDOUT,
+            env={**os.environ, **SERVER_ENVIRONMENT},
+        )
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(
+                    'The benchmark server failed to start:\n'
+                    + self.server_output(log)
+                )
+            try:
+                socket.create_connection((HOST, port), timeout=1).close()
+            except OSError:
+                time.sleep(0.1)
+            else:
+                log.close()
+                return server, f'http://{HOST}:{port}'
+        server.terminate()
+        server.wait()
+        raise CommandError(
+            'The benchmark server did not start in time:\n'
+            + self.server_output(log)
+        )
+
+    def server_output(self, log) -> str:
+        """Return the last lines the server wrote to its log."""
+        log.seek(0)
+        lines = log.read().decode(errors='replace').splitlines()
+        log.close()
+        return '\n'.join(lines[-SERVER_LOG_LINES:])
+
+    def write_results(self, results):
+        self.stdout.write(
+            f'{"view":<22}{"requests":>10}{"errors":>8}{"req/s":>9}'
+            f'{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}'
+        )
+        rows = [*results['views'].items(), ('total', results['total'])]
+        for name, view in rows:
+            self.stdout.write(
+                f'{name:<22}{view["requests"]:>10}{view["errors"]:>8}'
+                f'{view["rps"]:>9.1f}{view["p50_ms"]:>9.1f}'
+                f'{view["p95_ms"]:>9.1f}{view["p99_ms"]:>9.1f}'
+            )
+
+    def write_comparison(self, baseline, current):
+        self.stdout.write(
+            f'{"view":<22}{"req/s":>26}{"p50 ms":>26}'
+            f'{"p95 ms":>26}{"p99 ms":>26}'
+        )
+        for row in bench.compare(baseline, current):
+            cells = ''.join(
+                self.format_change(*row[key])
+                for key in ('rps', 'p50_ms', 'p95_ms', 'p99_ms')
+            )
+            self.stdout.write(f'{row["view"]:<22}{cells}')
+
+    def format_change(self, before, after, change):
+        change = 'n/a' if change is None else f'{change:+.1f}%'
+        return f'{before:>7.1f} -> {after:>7.1f} {change:>7}'
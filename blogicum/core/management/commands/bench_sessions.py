@@ -0,0 +1,46 @@
+"""Management command to benchmark session storage profiles."""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core import session_bench
+
+
+class Command(BaseCommand):
+    help = (
+        'Log in and make authenticated requests with each session '
+        'profile and report the time and queries sessions add to a '
+        'request and the size of the session cookie.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'profiles', nargs='*',
+            help='Profiles of SESSION_PROFILES to compare; all by default.'
+        )
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--logins', type=int, default=200)
+
+    def handle(self, *args, **options):
+        profiles = options['profiles'] or list(settings.SESSION_PROFILES)
+        unknown = set(profiles) - set(settings.SESSION_PROFILES)
+        if unknown:
+            raise CommandError(
+                f'Unknown profiles: {", ".join(sorted(unknown))}.'
+            )
+        if options['requests'] < 1 or options['logins'] < 1:
+            raise CommandError('Requests and logins must be positive.')
+        results = session_bench.run(
+            profiles, options['requests'], options['logins']
+        )
+        self.stdout.write(
+            f'{"profile":<16}{"request ms":>12}{"queries":>9}'
+            f'{"login ms":>10}{"queries":>9}{"cookie B":>10}'
+        )
+        for profile, result in results.items():
+            self.stdout.write(
+                f'{profile:<16}{result["request"] * 1000:>12.3f}'
+                f'{result["request_queries"]:>9.1f}'
+                f'{result["login"] * 1000:>10.3f}'
+                f'{result["login_queries"]:>9.1f}'
+                f'{result["cookie_bytes"]:>10}'
+            )
@@ -0,0 +1,133 @@
+"""Management command to benchmark SQLite tuning under concurrency."""
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.backends.sqlite3.base import apply_pragmas
+
+SCHEMA: str = (
+    'CREATE TABLE comment ('
+    'id INTEGER PRIMARY KEY, post_id INTEGER NOT NULL, text TEXT NOT NULL)'
+)
+
+READ_SQL: str = (
+    'SELECT id, text FROM comment WHERE post_id = ? ORDER BY id DESC LIMIT 10'
+)
+
+PROFILES: dict = {
+    'default': ({}, 'DEFERRED'),
+    'tuned': (settings.SQLITE_PRAGMAS, 'IMMEDIATE'),
+}
+
+# Seconds a connection waits for a lock, as Django opens the site's
+# database: OPTIONS are passed to sqlite3.connect(), whose default is 5.
+TIMEOUT: float = settings.DATABASES['default'].get('OPTIONS', {}).get(
+    'timeout', 5.0
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare read/write throughput of concurrent SQLite connections '
+        'with default settings and with the tuned profile.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--rows', type=int, default=50_000)
+
+    def handle(self, *args, **options):
+        for profile, (pragmas, mode) in PROFILES.items():
+            with tempfile.TemporaryDirectory() as directory:
+                path = Path(directory) / 'bench.sqlite3'
+                self.prepare(path, pragmas, options['rows'])
+                result = self.run(path, pragmas, mode, options)
+            seconds = options['seconds']
+            self.stdout.write(
+                f'{profile:>8}: {result["reads"] / seconds:10.0f} reads/s '
+                f'{result["writes"] / seconds:8.0f} writes/s '
+                f'{result["locked"]:6} locked errors'
+            )
+
+    def prepare(self, path, pragmas, rows):
+        connection = sqlite3.connect(path)
+        apply_pragmas(connection, pragmas)
+        connection.execute(SCHEMA)
+        connection.execute('CREATE INDEX comment_post ON comment (post_id)')
+        connection.executemany(
+            'INSERT INTO comment (post_id, text) VALUES (?, ?)',
+            ((row % 1000, 'x' * 200) for row in range(rows))
+        )
+        connection.commit()
+        connection.close()
+
+    def run(self, path, pragmas, mode, options):
+        self.result = {'reads': 0, 'writes': 0, 'locked': 0}
+        self.lock = threading.Lock()
+        self.deadline = time.monotonic() + options['seconds']
+        threads = [
+            threading.Thread(
+                target=self.reader, args=(path, pragmas, number)
+            )
+            for number in range(options['readers'])
+        ] + [
+            threading.Thread(
+                target=self.writer, args=(path, pragmas, mode, number)
+            )
+            for number in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.result
+
+    def count(self, key):
+        with self.lock:
+            self.result[key] += 1
+
+    def connect(self, path, pragmas):
+        connection = sqlite3.connect(
+            path, timeout=TIMEOUT, isolation_level=None,
+            check_same_thread=False
+        )
+        apply_pragmas(connection, pragmas)
+        return connection
+
+    def reader(self, path, pragmas, number):
+        connection = self.connect(path, pragmas)
+        post = number
+        while time.monotonic() < self.deadline:
+            try:
+                connection.execute(READ_SQL, (post % 1000,)).fetchall()
+                self.count('reads')
+            except sqlite3.OperationalError:
+                self.count('locked')
+            post += 7
+        connection.close()
+
+    def writer(self, path, pragmas, mode, number):
+        connection = self.connect(path, pragmas)
+        while time.monotonic() < self.deadline:
+            try:
+                connection.execute(f'BEGIN {mode}')
+                # Read before writing, like a view validating input.
+                connection.execute(READ_SQL, (number,)).fetchall()
+                connection.execute(
+                    'INSERT INTO comment (post_id, text) VALUES (?, ?)',
+                    (number, 'new comment')
+                )
+                connection.execute('COMMIT')
+                self.count('writes')
+            except sqlite3.OperationalError:
+                if connection.in_transaction:
+                    connection.execute('ROLLBACK')
+                self.count('locked')
+        connection.close()
@@ -0,0 +1,75 @@
+"""Management command to benchmark template rendering."""
+from django.core.management.base import BaseCommand, CommandError
+
+from core import template_bench
+
+
+def ratio(before: float, after: float) -> float:
+    """Return how many times faster after is, or 0 if it took no time."""
+    return before / after if after else 0
+
+
+class Command(BaseCommand):
+    help = (
+        'Render templates with sample contexts, read and parsed on every '
+        'render, with the cached loader and with Jinja2 where a template '
+        'has a Jinja2 equivalent, and report render times and the time '
+        'and memory taken by each template and include.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'templates', nargs='*',
+            help='Templates to render; all project templates by default.'
+        )
+        parser.add_argument('--repeat', type=int, default=100)
+        parser.add_argument(
+            '--breakdown-repeat', type=int, default=20,
+            help='Renders per template traced for the include breakdown.'
+        )
+
+    def handle(self, *args, **options):
+        known = template_bench.template_names()
+        names = options['templates'] or known
+        unknown = set(names) - set(known)
+        if unknown:
+            raise CommandError(
+                f'Unknown templates: {", ".join(sorted(unknown))}.'
+            )
+        results = template_bench.run(
+            names, options['repeat'], options['breakdown_repeat']
+        )
+        self.stdout.write(
+            f'{"template":<52}{"uncached ms":>13}{"cached ms":>11}'
+            f'{"gain":>8}{"jinja2 ms":>11}{"vs cached":>11}'
+        )
+        for name, timings in results['pages'].items():
+            uncached = timings['uncached'] * 1000
+            cached = timings['cached'] * 1000
+            line = (
+                f'{name:<52}{uncached:>13.3f}{cached:>11.3f}'
+                f'{ratio(uncached, cached):>7.1f}x'
+            )
+            if 'jinja2' in timings:
+                jinja2 = timings['jinja2'] * 1000
+                line += f'{jinja2:>11.3f}{ratio(cached, jinja2):>10.1f}x'
+            self.stdout.write(line)
+        self.stdout.write(
+            '\nIncludes and widgets, rendered with the cached loader while '
+            'tracing allocations, which slows them down:'
+        )
+        self.stdout.write(
+            f'{"template or include":<52}{"calls":>8}{"self ms":>10}'
+            f'{"total ms":>10}{"peak KiB":>10}'
+        )
+        templates = sorted(
+            results['templates'].items(),
+            key=lambda item: item[1]['self_seconds'], reverse=True
+        )
+        for name, entry in templates:
+            self.stdout.write(
+                f'{name:<52}{entry["calls"]:>8}'
+                f'{entry["self_seconds"] / entry["calls"] * 1000:>10.3f}'
+                f'{entry["seconds"] / entry["calls"] * 1000:>10.3f}'
+                f'{entry["peak"] / 1024:>10.1f}'
+            )
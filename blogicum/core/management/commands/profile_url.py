@@ -0,0 +1,27 @@
+"""Management command to print a URL that profiles one request."""
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.profiling import PROFILE_PARAMETER, profile_token
+
+
+class Command(BaseCommand):
+    help = (
+        'Print a URL with a signed profile flag. Requested by a staff '
+        'user, the page is profiled into PROFILE_DIR.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help='Path with an optional query.')
+
+    def handle(self, *args, **options):
+        if not settings.PROFILE_DIR:
+            raise CommandError('Set PROFILE_DIR to enable profiling.')
+        url = urlsplit(options['url'])
+        query = urlencode({PROFILE_PARAMETER: profile_token(url.path)})
+        separator = '&' if url.query else ''
+        self.stdout.write(
+            f'{url.path}?{url.query}{separator}{query}'
+        )
@@ -0,0 +1,37 @@
+"""Management command to delete expired sessions."""
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.deletion import delete_in_batches
+
+DATABASE_ENGINES: tuple = (
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete expired sessions in batches, without locking the database '
+        'for long. Meant to be run periodically, e.g. from cron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int)
+
+    def handle(self, *args, **options):
+        if settings.SESSION_ENGINE not in DATABASE_ENGINES:
+            self.stdout.write(
+                f'Sessions of {settings.SESSION_ENGINE} are not stored in '
+                'the database; only rows left from a previous profile are '
+                'purged.'
+            )
+        deleted = delete_in_batches(
+            Session.objects.filter(expire_date__lt=timezone.now()),
+            options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Expired sessions deleted: {deleted}.'
+        ))
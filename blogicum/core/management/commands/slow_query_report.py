@@ -0,0 +1,70 @@
+"""Management command to summarize the slow query log."""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.slowlog import read_log
+
+
+class Command(BaseCommand):
+    help = (
+        'List the query shapes of the slow query log that took the most '
+        'time in total, with their views and plans.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=10)
+        parser.add_argument(
+            '--path', help='Log to read; SLOW_QUERY_LOG by default.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path'] or settings.SLOW_QUERY_LOG
+        if path is None:
+            raise CommandError(
+                'SLOW_QUERY_LOG is not set; pass --path or set '
+                'BLOGICUM_SLOW_QUERY_LOG.'
+            )
+        try:
+            groups = self.aggregate(read_log(path))
+        except OSError as error:
+            raise CommandError(f'Cannot read {path}: {error}')
+        ranked = sorted(
+            groups.values(), key=lambda group: group['total_ms'],
+            reverse=True
+        )[:options['top']]
+        for number, group in enumerate(ranked, 1):
+            self.write_group(number, group)
+        if not ranked:
+            self.stdout.write('No slow queries logged.')
+
+    def aggregate(self, entries) -> dict:
+        groups = {}
+        for entry in entries:
+            group = groups.setdefault(entry['fingerprint'], {
+                'fingerprint': entry['fingerprint'], 'count': 0,
+                'total_ms': 0.0, 'max_ms': 0.0, 'views': set(),
+                'sql': entry['sql'], 'plan': None, 'full_scans': [],
+            })
+            group['count'] += 1
+            group['total_ms'] += entry['duration_ms']
+            group['max_ms'] = max(group['max_ms'], entry['duration_ms'])
+            group['views'].add(entry['view'] or '-')
+            if 'plan' in entry and group['plan'] is None:
+                group['plan'] = entry['plan']
+                group['full_scans'] = entry['full_scans']
+        return groups
+
+    def write_group(self, number: int, group: dict) -> None:
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{number}. {group["fingerprint"]}: {group["count"]} times, '
+            f'{group["total_ms"]:.0f} ms total, '
+            f'{group["max_ms"]:.0f} ms max'
+        ))
+        self.stdout.write(f'   views: {", ".join(sorted(group["views"]))}')
+        self.stdout.write(f'   {group["sql"]}')
+        for line in group['plan'] or ():
+            self.stdout.write(f'     {line}')
+        if group['full_scans']:
+            self.stdout.write(self.style.WARNING(
+                f'   full scan of {", ".join(group["full_scans"])}'
+            ))
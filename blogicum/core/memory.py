@@ -0,0 +1,73 @@
+"""Memory allocated while serving requests, traced with tracemalloc."""
+import threading
+import tracemalloc
+
+from .metrics import Histogram
+
+# Allocations of the tracing machinery itself are not the view's.
+IGNORED_TRACES: tuple = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+REQUEST_MEMORY_PEAK = Histogram(
+    'http_request_memory_peak_bytes',
+    'Peak of memory allocated while serving a request, by URL name.',
+    ('view',),
+    buckets=tuple(2 ** power for power in range(20, 31, 2)),
+)
+
+
+def take_snapshot():
+    return tracemalloc.take_snapshot().filter_traces(IGNORED_TRACES)
+
+
+def allocation_sites(before, after, top: int) -> list:
+    """Return the lines that allocated the most memory between snapshots."""
+    sites = []
+    for stat in after.compare_to(before, 'lineno')[:top]:
+        frame = stat.traceback[0]
+        sites.append({
+            'site': f'{frame.filename}:{frame.lineno}',
+            'size_diff': stat.size_diff,
+            'count_diff': stat.count_diff,
+        })
+    return sites
+
+
+class MemoryReport:
+    """Worst memory peaks seen per URL name in this process."""
+
+    def __init__(self):
+        self.views = {}
+        self.lock = threading.Lock()
+
+    def add(self, view: str, path: str, peak: int, sites: list) -> None:
+        with self.lock:
+            entry = self.views.setdefault(view, {
+                'view': view, 'requests': 0, 'total_peak': 0, 'max_peak': 0,
+            })
+            entry['requests'] += 1
+            entry['total_peak'] += peak
+            if peak >= entry['max_peak']:
+                entry.update(max_peak=peak, path=path, sites=sites)
+
+    def worst(self, limit: int = None) -> list:
+        """Return entries with the largest peaks first."""
+        with self.lock:
+            entries = [
+                {**entry,
+                 'mean_peak': entry['total_peak'] // entry['requests']}
+                for entry in self.views.values()
+            ]
+        entries.sort(key=lambda entry: entry['max_peak'], reverse=True)
+        return entries[:limit]
+
+    def clear(self) -> None:
+        with self.lock:
+            self.views.clear()
+
+
+memory_report = MemoryReport()
@@ -0,0 +1,436 @@
+"""In-process metrics registry."""
+import bisect
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+
+# Latency buckets in seconds, from 5 ms to 10 s.
+DEFAULT_BUCKETS: tuple = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+CONTENT_TYPE: str = 'text/plain; version=0.0.4; charset=utf-8'
+
+LABEL_ESCAPES: dict = str.maketrans({'\\': '\\\\', '"': '\\"', '\n': '\\n'})
+
+# Counters and histograms of exited processes, folded together so their
+# files can be removed; read back like the file of a running process.
+EXITED_FILE: str = 'exited.json'
+
+LOCK_FILE: str = 'metrics.lock'
+
+
+class Registry:
+    """Collection of metrics known to the process."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric) -> None:
+        """Add a metric, refusing duplicate names."""
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f'Metric {metric.name} already registered.')
+            self._metrics[metric.name] = metric
+
+    def get(self, name: str):
+        """Return a registered metric by name."""
+        return self._metrics[name]
+
+    def collect(self) -> list:
+        """Return registered metrics ordered by name."""
+        with self._lock:
+            return [self._metrics[name] for name in sorted(self._metrics)]
+
+    def snapshot(self) -> dict:
+        """Return current values of every metric."""
+        return {metric.name: metric.samples() for metric in self.collect()}
+
+    def export(self) -> dict:
+        """Return metric descriptions and samples as JSON-ready data."""
+        return {metric.name: metric.export() for metric in self.collect()}
+
+
+REGISTRY = Registry()
+
+
+class Metric:
+    """Base class of labelled metrics."""
+
+    kind: str = ''
+
+    def __init__(self, name: str, documentation: str, labelnames=(),
+                 registry: Registry = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f'{self.name} expects labels {self.labelnames}, '
+                f'got {tuple(labels)}.'
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> dict:
+        """Return values keyed by label value tuples."""
+        with self._lock:
+            return dict(self._values)
+
+    def value(self, **labels):
+        """Return the value for the given labels."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def export(self) -> dict:
+        return {
+            'kind': self.kind, 'documentation': self.documentation,
+            'labelnames': list(self.labelnames),
+            'samples': [
+                [list(key), value] for key, value in self.samples().items()
+            ],
+        }
+
+
+class Counter(Metric):
+    """Monotonically increasing value."""
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels) -> None:
+        """Increase the counter."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """Value that can go up and down."""
+
+    kind = 'gauge'
+
+    def set(self, value, **labels) -> None:
+        """Set the gauge to a value."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels) -> None:
+        """Increase the gauge."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels) -> None:
+        """Decrease the gauge."""
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """Distribution of observed values over fixed buckets."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames=(),
+                 buckets: tuple = DEFAULT_BUCKETS,
+                 registry: Registry = REGISTRY):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value: float, **labels) -> None:
+        """Count a value in the first bucket with a bound above it."""
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {
+                    'buckets': [0] * (len(self.buckets) + 1),
+                    'sum': 0.0, 'count': 0,
+                }
+            state['buckets'][index] += 1
+            state['sum'] += value
+            state['count'] += 1
+
+    def samples(self) -> dict:
+        """Return per-bucket counts, sum and count keyed by labels."""
+        with self._lock:
+            return {
+                key: {**state, 'buckets': list(state['buckets'])}
+                for key, state in self._values.items()
+            }
+
+    def export(self) -> dict:
+        return {**super().export(), 'bounds': list(self.buckets)}
+
+
+PROCESS_MEMORY = Gauge(
+    'process_resident_memory_bytes',
+    'Resident memory of the processes serving the blog.'
+)
+
+_flush_lock = threading.Lock()
+
+_last_flush: float = float('-inf')
+
+_process_token: tuple = (None, None)
+
+
+def resident_memory() -> int:
+    """Return the resident set size of this process in bytes."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def process_alive(pid: int) -> bool:
+    if os.name != 'posix':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def process_file_name() -> str:
+    """
+    Return the name of the metrics file of this process.
+
+    A pid alone may be reused, e.g. in containers, and a new process
+    would overwrite the counters of an exited one, so the name also has
+    a token made once per process, after any fork.
+    """
+    global _process_token
+    pid = os.getpid()
+    if _process_token[0] != pid:
+        _process_token = (pid, uuid.uuid4().hex[:12])
+    return f'{pid}-{_process_token[1]}.json'
+
+
+def write_json(path: Path, data: dict) -> None:
+    """Atomically replace a JSON file."""
+    descriptor, temporary = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as stream:
+            json.dump(data, stream)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def read_json(path: Path):
+    """Return the data of a JSON file, or None if it cannot be read."""
+    try:
+        with open(path, encoding='utf-8') as stream:
+            return json.load(stream)
+    except (OSError, ValueError):
+        return None
+
+
+def write_process_file(directory, registry: Registry = REGISTRY) -> None:
+    """Atomically replace the metrics file of this process."""
+    PROCESS_MEMORY.set(resident_memory())
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    write_json(
+        directory / process_file_name(),
+        {'pid': os.getpid(), 'metrics': registry.export()}
+    )
+
+
+def flush_if_due() -> None:
+    """
+    Write this process's metrics to METRICS_DIR if it is time to.
+
+    Files are rewritten at most once per METRICS_FLUSH_INTERVAL seconds,
+    so incrementing a metric never touches the disk.
+    """
+    global _last_flush
+    if not settings.METRICS_DIR:
+        return
+    now = time.monotonic()
+    if now - _last_flush < settings.METRICS_FLUSH_INTERVAL:
+        return
+    if not _flush_lock.acquire(blocking=False):
+        return
+    try:
+        _last_flush = now
+        write_process_file(settings.METRICS_DIR)
+    finally:
+        _flush_lock.release()
+
+
+def merge_exports(exports: list) -> dict:
+    """
+    Sum exported metrics of several processes.
+
+    Counters and histograms of exited processes still count, gauges
+    only of running ones.
+    """
+    merged = {}
+    for pid, metrics in exports:
+        alive = pid is None or process_alive(pid)
+        for name, metric in metrics.items():
+            if metric['kind'] == 'gauge' and not alive:
+                continue
+            target = merged.setdefault(name, {**metric, 'samples': {}})
+            for labels, value in metric['samples']:
+                key = tuple(labels)
+                current = target['samples'].get(key)
+                target['samples'][key] = (
+                    value if current is None else add_values(current, value)
+                )
+    return merged
+
+
+def add_values(first, second):
+    if isinstance(first, dict):
+        return {
+            'buckets': [
+                a + b for a, b in zip(first['buckets'], second['buckets'])
+            ],
+            'sum': first['sum'] + second['sum'],
+            'count': first['count'] + second['count'],
+        }
+    return first + second
+
+
+def as_exports(merged: dict) -> dict:
+    """Turn metrics merged by merge_exports back into exported ones."""
+    return {
+        name: {
+            **metric,
+            'samples': [
+                [list(key), value] for key, value in metric['samples'].items()
+            ],
+        }
+        for name, metric in merged.items()
+    }
+
+
+def fold_exited(directory: Path, files: dict) -> dict:
+    """
+    Fold metrics files of exited processes into EXITED_FILE.
+
+    files maps names of the metrics files to their data; the files
+    folded are removed and the remaining ones returned. Names folded
+    are recorded with the totals, so files left behind by a crash
+    between writing the totals and removing them are not counted twice.
+    """
+    exited = files.get(EXITED_FILE) or {'pid': None, 'metrics': {}}
+    folded = set(exited.get('folded', ()))
+    dead = {
+        name: data for name, data in files.items()
+        if name != EXITED_FILE and not process_alive(data['pid'])
+    }
+    if not dead:
+        return files
+    exports = [(None, exited['metrics'])] + [
+        (None, {
+            metric_name: metric
+            for metric_name, metric in data['metrics'].items()
+            if metric['kind'] != 'gauge'
+        })
+        for name, data in dead.items() if name not in folded
+    ]
+    exited = {
+        'pid': None, 'folded': sorted(dead),
+        'metrics': as_exports(merge_exports(exports)),
+    }
+    write_json(directory / EXITED_FILE, exited)
+    for name in dead:
+        (directory / name).unlink(missing_ok=True)
+        del files[name]
+    files[EXITED_FILE] = exited
+    return files
+
+
+def collect_exports() -> dict:
+    """Return the metrics of every process sharing METRICS_DIR."""
+    if not settings.METRICS_DIR:
+        PROCESS_MEMORY.set(resident_memory())
+        return merge_exports([(None, REGISTRY.export())])
+    directory = Path(settings.METRICS_DIR)
+    write_process_file(directory)
+    with open(directory / LOCK_FILE, 'a') as lock:
+        # Scrapes of several workers must not fold the same files, nor
+        # read a file already folded into the totals.
+        if os.name == 'posix':
+            import fcntl
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        files = {}
+        for path in directory.glob('*.json'):
+            data = read_json(path)
+            if data is not None:
+                files[path.name] = data
+        if os.name == 'posix':
+            files = fold_exited(directory, files)
+    return merge_exports([
+        (data['pid'], data['metrics']) for data in files.values()
+    ])
+
+
+def format_value(value) -> str:
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(value)
+
+
+def format_labels(names, values, extra: tuple = ()) -> str:
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(
+        f'{name}="{str(value).translate(LABEL_ESCAPES)}"'
+        for name, value in pairs
+    ) + '}'
+
+
+def render(metrics: dict) -> str:
+    """Format merged metrics in the Prometheus text exposition format."""
+    lines = []
+    for name in sorted(metrics):
+        metric = metrics[name]
+        names = metric['labelnames']
+        lines.append(f'# HELP {name} {metric["documentation"]}')
+        lines.append(f'# TYPE {name} {metric["kind"]}')
+        for key in sorted(metric['samples']):
+            value = metric['samples'][key]
+            if metric['kind'] != 'histogram':
+                lines.append(
+                    f'{name}{format_labels(names, key)} {format_value(value)}'
+                )
+                continue
+            cumulative = 0
+            bounds = [*metric['bounds'], math.inf]
+            for bound, count in zip(bounds, value['buckets']):
+                cumulative += count
+                labels = format_labels(
+                    names, key, (('le', format_value(float(bound))),)
+                )
+                lines.append(f'{name}_bucket{labels} {cumulative}')
+            labels = format_labels(names, key)
+            lines.append(f'{name}_sum{labels} {format_value(value["sum"])}')
+            lines.append(f'{name}_count{labels} {value["count"]}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,283 @@
+"""Middleware of core app."""
+import itertools
+import logging
+import random
+import time
+import tracemalloc
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .memory import (REQUEST_MEMORY_PEAK, allocation_sites, memory_report,
+                     take_snapshot)
+from .metrics import Counter, Histogram, flush_if_due
+from .profiling import (PROFILE_PARAMETER, StackSampler, valid_token,
+                        write_profile)
+from .routers import pinned_to_primary, wrote_to_primary
+from .slowlog import current_view, slow_query_log
+from .timing import RequestTimings, current_timings, time_queries
+
+REPLICA_PIN_COOKIE: str = 'primary_pin'
+
+# Other methods are counted as "other" to bound label cardinality.
+COUNTED_METHODS: tuple = (
+    'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS',
+)
+
+HTTP_REQUESTS = Counter(
+    'http_requests_total', 'Requests by URL name, method and status.',
+    ('view', 'method', 'status')
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds', 'Request latency by URL name.',
+    ('view',)
+)
+DB_QUERIES = Counter(
+    'db_queries_total', 'Database queries by URL name.', ('view',)
+)
+
+timing_logger = logging.getLogger('core.timing')
+
+memory_logger = logging.getLogger('core.memory')
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Keep a client on the primary database shortly after it writes.
+
+    Every write marks the response with a cookie living for
+    REPLICA_STICKY_SECONDS, so the pin lasts that long after the last
+    write; while it is present every read of the client goes to the
+    primary, hiding replication lag.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = pinned_to_primary.set(REPLICA_PIN_COOKIE in request.COOKIES)
+        wrote_token = wrote_to_primary.set(False)
+        try:
+            response = self.get_response(request)
+            wrote = wrote_to_primary.get()
+        finally:
+            wrote_to_primary.reset(wrote_token)
+            pinned_to_primary.reset(token)
+        if wrote:
+            response.set_cookie(
+                REPLICA_PIN_COOKIE, '1',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True, samesite='Lax'
+            )
+        return response
+
+
+class ServerTimingMiddleware:
+    """
+    Measure the cost of a sampled share of requests.
+
+    SERVER_TIMING_SAMPLE_RATE of requests get their total, SQL, template
+    and cache costs logged to the core.timing logger and, when
+    SERVER_TIMING_PUBLIC is set or the user is staff, sent back in a
+    Server-Timing header. Unsampled requests skip all accounting.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.SERVER_TIMING_SAMPLE_RATE:
+            return self.get_response(request)
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(time_queries)
+                    )
+                response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        timings.finish()
+        user = getattr(request, 'user', None)
+        if settings.SERVER_TIMING_PUBLIC or (user and user.is_staff):
+            response['Server-Timing'] = timings.header()
+        timing_logger.info(
+            '%s %s %s %s', request.method, request.path,
+            response.status_code,
+            ' '.join(f'{key}={value}'
+                     for key, value in timings.as_dict().items()),
+            extra={'timings': timings.as_dict()}
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        timings = current_timings.get()
+        if timings is not None:
+            started = time.perf_counter()
+            db = timings.db
+
+            def rendered(response):
+                # Querysets evaluated by the template are counted as db
+                # time already, so tpl is the rendering alone.
+                timings.template += (
+                    time.perf_counter() - started - (timings.db - db)
+                )
+
+            response.add_post_render_callback(rendered)
+        return response
+
+
+class SlowQueryMiddleware:
+    """
+    Log queries slower than SLOW_QUERY_THRESHOLD_MS with their view.
+
+    Entries go to SLOW_QUERY_LOG; `manage.py slow_query_report` sums
+    them up. A log or threshold of None turns the log off.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if (settings.SLOW_QUERY_LOG is None
+                or settings.SLOW_QUERY_THRESHOLD_MS is None):
+            return self.get_response(request)
+        token = current_view.set(None)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(slow_query_log)
+                    )
+                return self.get_response(request)
+        finally:
+            current_view.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        current_view.set(request.resolver_match.view_name)
+
+
+class MetricsMiddleware:
+    """
+    Count requests, their latency and database queries per URL name.
+
+    Metrics are flushed to METRICS_DIR for the /metrics view when it
+    is shared by several worker processes.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(count_query))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+        match = request.resolver_match
+        view = match.view_name if match else 'unmatched'
+        method = (
+            request.method if request.method in COUNTED_METHODS else 'other'
+        )
+        HTTP_REQUESTS.inc(
+            view=view, method=method, status=response.status_code
+        )
+        HTTP_REQUEST_SECONDS.observe(duration, view=view)
+        if queries:
+            DB_QUERIES.inc(queries, view=view)
+        flush_if_due()
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profile single requests with a stack sampler.
+
+    A request is profiled when a staff user passes the profile query
+    flag signed for its path (see `manage.py profile_url`), or once
+    every PROFILE_ONE_IN requests when that is set. Collapsed stacks
+    are written to PROFILE_DIR; without it the middleware is removed
+    from the stack at startup and costs nothing.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILE_DIR:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.requests = itertools.count(1)
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+        with StackSampler(settings.PROFILE_INTERVAL) as sampler:
+            response = self.get_response(request)
+        match = request.resolver_match
+        label = match.view_name if match else 'unmatched'
+        path = write_profile(settings.PROFILE_DIR, label, sampler)
+        if request.user.is_staff:
+            response['X-Profile'] = path.name
+        return response
+
+    def should_profile(self, request) -> bool:
+        token = request.GET.get(PROFILE_PARAMETER)
+        if token is not None and request.user.is_staff and valid_token(
+            token, request.path, settings.PROFILE_TOKEN_MAX_AGE
+        ):
+            return True
+        one_in = settings.PROFILE_ONE_IN
+        return bool(one_in) and next(self.requests) % one_in == 0
+
+
+class MemoryTrackingMiddleware:
+    """
+    Trace memory allocated by requests when MEMORY_TRACKING is set.
+
+    Snapshots taken around a request give the lines that allocated
+    the most memory still held at its end; the peak is measured from
+    the memory traced when the request started. Both go to the
+    core.memory log and the staff memory report. tracemalloc is
+    process-wide, so concurrent requests of a threaded worker blur
+    each other's numbers; use it with single-threaded workers.
+    """
+
+    def __init__(self, get_response):
+        if not settings.MEMORY_TRACKING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(settings.MEMORY_TRACKING_FRAMES)
+
+    def __call__(self, request):
+        tracemalloc.reset_peak()
+        started, _ = tracemalloc.get_traced_memory()
+        before = take_snapshot()
+        response = self.get_response(request)
+        _, peak = tracemalloc.get_traced_memory()
+        sites = allocation_sites(
+            before, take_snapshot(), settings.MEMORY_TRACKING_TOP
+        )
+        peak -= started
+        match = request.resolver_match
+        view = match.view_name if match else 'unmatched'
+        REQUEST_MEMORY_PEAK.observe(peak, view=view)
+        memory_report.add(view, request.get_full_path(), peak, sites)
+        memory_logger.info(
+            '%s %s %s peak=%.1f KiB top: %s', request.method, request.path,
+            view, peak / 1024,
+            ', '.join(f'{site["site"]} {site["size_diff"] / 1024:+.1f} KiB'
+                      for site in sites[:3]),
+            extra={'memory': {'view': view, 'peak': peak, 'sites': sites}}
+        )
+        return response
@@ -0,0 +1,96 @@
+"""Sampling profiler writing collapsed stacks of single requests."""
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.core import signing
+
+PROFILE_PARAMETER: str = 'profile'
+
+PROFILE_SALT: str = 'core.profiling'
+
+_profile_numbers = itertools.count(1)
+
+
+def profile_token(path: str) -> str:
+    """Return a value of the profile query flag valid for a path."""
+    return signing.TimestampSigner(salt=PROFILE_SALT).sign(path)
+
+
+def valid_token(token: str, path: str, max_age: int) -> bool:
+    try:
+        signed_path = signing.TimestampSigner(salt=PROFILE_SALT).unsign(
+            token, max_age=max_age
+        )
+    except signing.BadSignature:
+        return False
+    return signed_path == path
+
+
+def frame_name(frame) -> str:
+    code = frame.f_code
+    filename = os.path.basename(code.co_filename)
+    return f'{code.co_name} ({filename}:{code.co_firstlineno})'.replace(
+        ';', ':'
+    )
+
+
+class StackSampler:
+    """
+    Sample the stack of a thread at a fixed interval.
+
+    A background thread records the stack of the profiled thread every
+    interval seconds, so the profiled code runs at full speed between
+    samples. Stacks are counted in the collapsed format read by
+    flamegraph.pl and speedscope: frames from the outermost one,
+    separated by semicolons, then the number of samples.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks = Counter()
+        self.target = threading.get_ident()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            stack = []
+            while frame is not None:
+                stack.append(frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return ''.join(
+            f'{stack} {count}\n' for stack, count in self.stacks.most_common()
+        )
+
+
+def write_profile(directory, label: str, sampler: StackSampler) -> Path:
+    """Save collapsed stacks to a new file named after the request."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    safe_label = ''.join(
+        char if char.isalnum() or char in '-_' else '_' for char in label
+    )
+    path = directory / (
+        f'{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}-'
+        f'{next(_profile_numbers)}-{safe_label}.collapsed'
+    )
+    path.write_text(sampler.collapsed(), encoding='utf-8')
+    return path
@@ -0,0 +1,54 @@
+"""Database routers."""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+
+pinned_to_primary: ContextVar = ContextVar('pinned_to_primary', default=False)
+
+# Whether the current request wrote, apart from whether it arrived
+# pinned, so every write extends the pin of the client.
+wrote_to_primary: ContextVar = ContextVar('wrote_to_primary', default=False)
+
+
+def pin_to_primary() -> None:
+    """Send reads of the current request or task to the primary."""
+    pinned_to_primary.set(True)
+    wrote_to_primary.set(True)
+
+
+class PrimaryReplicaRouter:
+    """
+    Route reads of REPLICA_ROUTED_APPS to DATABASE_REPLICAS.
+
+    Writes always go to the primary and pin the rest of the request to
+    it, so a request reads its own writes; ReplicaStickinessMiddleware
+    carries the pin over to the following requests of the client.
+    Outside of requests, e.g. in management commands, the pin lasts
+    for the rest of the thread once it writes.
+    """
+
+    def is_routed(self, model) -> bool:
+        return model._meta.app_label in settings.REPLICA_ROUTED_APPS
+
+    def db_for_read(self, model, **hints):
+        if (not settings.DATABASE_REPLICAS or not self.is_routed(model)
+                or pinned_to_primary.get()):
+            return None
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        if self.is_routed(model):
+            pin_to_primary()
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {'default', *settings.DATABASE_REPLICAS}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
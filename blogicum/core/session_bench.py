@@ -0,0 +1,114 @@
+"""Per-request overhead of the session storage profiles."""
+import statistics
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.auth import get_user_model, login
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.db import connections, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+User = get_user_model()
+
+BENCH_USERNAME: str = 'session-bench'
+
+
+class QueryCounter:
+    """Count queries run on every database connection while active."""
+
+    def __init__(self):
+        self.queries = 0
+        self._stack = ExitStack()
+
+    def __enter__(self):
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self.count))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+    def count(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+
+def read_user(request) -> HttpResponse:
+    """Load the user of a request, as every page does for its header."""
+    return HttpResponse(str(request.user.is_authenticated))
+
+
+def timed(handler, request, counter: QueryCounter) -> tuple:
+    """Return the response to a request and seconds and queries it took."""
+    queries = counter.queries
+    started = time.perf_counter()
+    response = handler(request)
+    return (
+        response, time.perf_counter() - started, counter.queries - queries
+    )
+
+
+def measure(profile: str, requests: int, logins: int) -> dict:
+    """
+    Time logins and authenticated requests with a session profile.
+
+    Requests pass only the session and authentication middleware, so
+    the timings are the overhead sessions add to every page; cached_db
+    uses SESSION_CACHE_ALIAS, process-local unless BLOGICUM_SESSION_CACHE
+    is set, so its timings leave out memcached round trips. Rows
+    written are rolled back and cached sessions deleted afterwards.
+    """
+    factory = RequestFactory(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+    with override_settings(SESSION_ENGINE=settings.SESSION_PROFILES[profile]):
+        with transaction.atomic():
+            user = User.objects.create_user(BENCH_USERNAME, password=None)
+            handler = SessionMiddleware(AuthenticationMiddleware(read_user))
+            login_handler = SessionMiddleware(AuthenticationMiddleware(
+                lambda request: login(request, user) or HttpResponse()
+            ))
+            login_times, login_queries, sessions = [], [], []
+            read_times, read_queries = [], []
+            with QueryCounter() as counter:
+                for _ in range(logins):
+                    response, seconds, queries = timed(
+                        login_handler, factory.post('/auth/login/'), counter
+                    )
+                    login_times.append(seconds)
+                    login_queries.append(queries)
+                    sessions.append(
+                        response.cookies[settings.SESSION_COOKIE_NAME].value
+                    )
+                for number in range(requests):
+                    factory.cookies[settings.SESSION_COOKIE_NAME] = sessions[
+                        number % len(sessions)
+                    ]
+                    response, seconds, queries = timed(
+                        handler, factory.get('/'), counter
+                    )
+                    if response.content != b'True':
+                        raise RuntimeError(
+                            f'Session of profile {profile} was not read.'
+                        )
+                    read_times.append(seconds)
+                    read_queries.append(queries)
+            store = SessionMiddleware(read_user).SessionStore
+            for session_key in sessions:
+                store(session_key).delete()
+            transaction.set_rollback(True)
+    return {
+        'request': statistics.median(read_times),
+        'request_queries': statistics.mean(read_queries),
+        'login': statistics.median(login_times),
+        'login_queries': statistics.mean(login_queries),
+        'cookie_bytes': max(len(session) for session in sessions),
+    }
+
+
+def run(profiles: list, requests: int, logins: int) -> dict:
+    """Measure every profile and return the results by profile."""
+    return {
+        profile: measure(profile, requests, logins) for profile in profiles
+    }
@@ -0,0 +1,156 @@
+"""Log of slow SQL queries with their plans."""
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Literals and placeholder lists vary between runs of the same query.
+FINGERPRINT_RULES: tuple = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+)
+
+# Tables that must never be read in full by a web request.
+FLAGGED_TABLES: tuple = ('blog_post', 'blog_comment')
+
+FULL_SCAN_PATTERNS: dict = {
+    'sqlite': r'^SCAN (?:TABLE )?"?{table}"?\b',
+    'postgresql': r'Seq Scan on "?{table}"?\b',
+}
+
+EXPLAIN_PREFIXES: dict = {
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+    'postgresql': 'EXPLAIN ',
+}
+
+# Fingerprints remembered as explained; past this many, no new ones
+# are explained until the process restarts.
+MAX_FINGERPRINTS: int = 10_000
+
+current_view: ContextVar = ContextVar('current_view', default=None)
+
+
+def fingerprint(sql: str) -> str:
+    """Return a short hash identifying the shape of a query."""
+    for pattern, replacement in FINGERPRINT_RULES:
+        sql = pattern.sub(replacement, sql)
+    return hashlib.sha1(sql.strip().encode()).hexdigest()[:16]
+
+
+def full_scans(vendor: str, plan: list) -> list:
+    """Return the flagged tables a query plan reads in full."""
+    pattern = FULL_SCAN_PATTERNS.get(vendor)
+    if pattern is None:
+        return []
+    return [
+        table for table in FLAGGED_TABLES
+        if any(re.search(pattern.format(table=table), line)
+               for line in plan)
+    ]
+
+
+class SlowQueryLog:
+    """
+    Execute wrapper appending queries slower than a threshold to a log.
+
+    Each JSON line has the view being served, the query fingerprint,
+    duration and SQL. The plan of a SELECT is captured the first time
+    its fingerprint is seen, at most once per
+    SLOW_QUERY_EXPLAIN_INTERVAL seconds, and full scans of
+    FLAGGED_TABLES are listed with it.
+    """
+
+    def __init__(self):
+        self.explained = set()
+        self.last_explain = float('-inf')
+        self.lock = threading.Lock()
+        self.explaining = threading.local()
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(self.explaining, 'active', False):
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            if duration * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+                self.record(sql, params, many, context, duration)
+
+    def record(self, sql, params, many, context, duration) -> None:
+        connection = context['connection']
+        key = fingerprint(sql)
+        entry = {
+            'time': timezone.now().isoformat(),
+            'view': current_view.get(),
+            'alias': connection.alias,
+            'fingerprint': key,
+            'duration_ms': round(duration * 1000, 1),
+            'sql': sql,
+        }
+        if not many and self.should_explain(key, sql):
+            plan = self.explain(connection, sql, params)
+            if plan is not None:
+                entry['plan'] = plan
+                entry['full_scans'] = full_scans(connection.vendor, plan)
+        try:
+            with self.lock, open(settings.SLOW_QUERY_LOG, 'a',
+                                 encoding='utf-8') as log:
+                log.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        except OSError:
+            logger.exception('Could not write the slow query log')
+
+    def should_explain(self, key: str, sql: str) -> bool:
+        if not sql.lstrip().upper().startswith('SELECT'):
+            return False
+        now = time.monotonic()
+        with self.lock:
+            if (key in self.explained
+                    or len(self.explained) >= MAX_FINGERPRINTS
+                    or now - self.last_explain
+                    < settings.SLOW_QUERY_EXPLAIN_INTERVAL):
+                return False
+            self.explained.add(key)
+            self.last_explain = now
+        return True
+
+    def explain(self, connection, sql, params):
+        """Return the plan of a query as lines of text, or None."""
+        prefix = EXPLAIN_PREFIXES.get(connection.vendor)
+        if prefix is None:
+            return None
+        self.explaining.active = True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(prefix + sql, params)
+                return [str(row[-1]) for row in cursor.fetchall()]
+        except DatabaseError:
+            logger.exception('Could not explain a slow query')
+            return None
+        finally:
+            self.explaining.active = False
+
+
+slow_query_log = SlowQueryLog()
+
+
+def read_log(path):
+    """Yield the entries of a slow query log, skipping broken lines."""
+    with open(path, encoding='utf-8') as log:
+        for line in log:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
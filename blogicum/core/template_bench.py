@@ -0,0 +1,331 @@
+"""Rendering benchmark of the site templates with sample contexts."""
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.forms import (AuthenticationForm, PasswordChangeForm,
+                                       PasswordResetForm, SetPasswordForm)
+from django.core.paginator import Paginator
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates
+from django.template.base import Template
+from django.test import RequestFactory
+from django.utils import timezone
+
+from blog.forms import (CommentForm, CustomUserCreationForm, PostForm,
+                        UserEditForm)
+from blog.models import Category, Comment, Location, Post
+from blog.views import PAGINATOR_ITEMS
+
+User = get_user_model()
+
+# Loader setups compared: templates read and parsed on every render,
+# as with DEBUG, and parsed once by the cached loader, as in production.
+PROFILES: dict = {
+    'uncached': settings.TEMPLATE_LOADERS,
+    'cached': settings.CACHED_TEMPLATE_LOADERS,
+}
+
+JINJA2_BACKEND: str = 'django.template.backends.jinja2.Jinja2'
+
+# Enough posts for a paginator with as many pages as a real feed shows.
+SAMPLE_POSTS: int = 20 * PAGINATOR_ITEMS
+
+SAMPLE_COMMENTS: int = 20
+
+SAMPLE_TEXT: str = (
+    'Сегодня мы прошли по старой дороге вдоль реки, заглянули в деревню '
+    'на холме и к вечеру добрались до озера. '
+) * 6
+
+# Views rendering a template under a path its markup checks.
+REQUEST_PATHS: dict = {
+    'blog/create.html': '/posts/1/edit/',
+    'blog/comment.html': '/posts/1/edit_comment/1',
+}
+
+FORMS: dict = {
+    'blog/create.html': lambda sample: PostForm(instance=sample['post']),
+    'blog/comment.html': lambda sample: CommentForm(
+        instance=sample['comment']
+    ),
+    'blog/user.html': lambda sample: UserEditForm(instance=sample['user']),
+    'registration/login.html': lambda sample: AuthenticationForm(),
+    'registration/password_change_form.html': lambda sample: (
+        PasswordChangeForm(sample['user'])
+    ),
+    'registration/password_reset_confirm.html': lambda sample: (
+        SetPasswordForm(sample['user'])
+    ),
+    'registration/password_reset_form.html': lambda sample: (
+        PasswordResetForm()
+    ),
+    'registration/registration_form.html': lambda sample: (
+        CustomUserCreationForm()
+    ),
+}
+
+
+def plain_render(template, context):
+    """Render a template as Django does without test or toolbar hooks."""
+    return template.nodelist.render(context)
+
+
+@contextmanager
+def plain_rendering():
+    """
+    Undo the instrumentation of Template._render while rendering.
+
+    The debug toolbar replaces it on import to record every render, so
+    with DEBUG each render would also pay for a signal.
+    """
+    render = Template._render
+    Template._render = plain_render
+    try:
+        yield
+    finally:
+        Template._render = render
+
+
+def template_names() -> list:
+    """Return names of all templates in the project templates directory."""
+    return sorted(
+        path.relative_to(settings.TEMPLATES_DIR).as_posix()
+        for path in settings.TEMPLATES_DIR.rglob('*.html')
+    )
+
+
+def backend(profile: str) -> DjangoTemplates:
+    """Return a template engine like the site's one with given loaders."""
+    options = settings.TEMPLATES[0]
+    return DjangoTemplates({
+        'NAME': f'bench-{profile}',
+        'DIRS': options['DIRS'],
+        'APP_DIRS': False,
+        'OPTIONS': {**options['OPTIONS'], 'loaders': PROFILES[profile]},
+    })
+
+
+def jinja2_backend():
+    """Return the site's Jinja2 engine without auto reload, if configured."""
+    options = next((
+        options for options in settings.TEMPLATES
+        if options['BACKEND'] == JINJA2_BACKEND
+    ), None)
+    if options is None:
+        return None
+    # Jinja2 is optional, so its backend is imported only when used.
+    from django.template.backends.jinja2 import Jinja2
+    return Jinja2({
+        'NAME': 'bench-jinja2',
+        'DIRS': options['DIRS'],
+        'APP_DIRS': False,
+        'OPTIONS': {**options['OPTIONS'], 'auto_reload': False},
+    })
+
+
+def sample_objects() -> dict:
+    """Build unsaved objects shaped like a page of the real feed."""
+    now = timezone.now()
+    user = User(
+        id=1, username='reader', first_name='Анна', last_name='Петрова',
+        date_joined=now - timedelta(days=400),
+    )
+    categories = [
+        Category(id=number, title=f'Путешествия {number}',
+                 slug=f'travel-{number}', description=SAMPLE_TEXT[:200],
+                 is_published=True)
+        for number in range(1, 6)
+    ]
+    locations = [
+        Location(id=number, name=f'Город {number}', is_published=True)
+        for number in range(1, 6)
+    ]
+    posts = []
+    for number in range(1, SAMPLE_POSTS + 1):
+        image = {}
+        # Every third post has an image with renditions, as uploads do.
+        if number % 3 == 0:
+            image = {
+                'image': f'posts/{number}.jpg',
+                'image_width': 1600, 'image_height': 1200,
+                'image_renditions': {
+                    image_format: [
+                        {'name': f'renditions/{number}-{width}.{extension}',
+                         'width': width, 'height': width * 3 // 4}
+                        for width in (480, 960, 1440)
+                    ]
+                    for image_format, extension in (('webp', 'webp'),
+                                                    ('jpeg', 'jpg'))
+                },
+            }
+        post = Post(
+            id=number, title=f'Прогулка по окрестностям, часть {number}',
+            text=SAMPLE_TEXT, pub_date=now - timedelta(hours=number),
+            is_published=True,
+            author=User(id=number % 7 + 2, username=f'author{number % 7}'),
+            category=categories[number % len(categories)],
+            location=locations[number % len(locations)],
+            **image,
+        )
+        post.comment_count = number % 12
+        posts.append(post)
+    post = posts[0]
+    comments = [
+        Comment(id=number, text=SAMPLE_TEXT[:300], post=post,
+                author=User(id=number + 20, username=f'reader{number}'),
+                created_at=now - timedelta(minutes=number))
+        for number in range(1, SAMPLE_COMMENTS + 1)
+    ]
+    page = Paginator(posts, PAGINATOR_ITEMS).page(3)
+    return {
+        'user': user, 'post': post, 'comment': comments[0],
+        'context': {
+            'page_obj': page, 'paginator': page.paginator,
+            'is_paginated': True, 'object_list': page.object_list,
+            'post': post, 'comment': comments[0], 'comments': comments,
+            'category': categories[0],
+            'profile': user, 'query': 'прогулка',
+            'page_query': '&q=%D0%BF', 'archived': False,
+        },
+    }
+
+
+def render_arguments(name: str, sample: dict):
+    """Return the context and the request to render a template with."""
+    request = RequestFactory().get(
+        REQUEST_PATHS.get(name, '/'), HTTP_HOST=settings.ALLOWED_HOSTS[0]
+    )
+    request.user = sample['user']
+    form = FORMS.get(name, lambda sample: CommentForm())(sample)
+    return {**sample['context'], 'form': form}, request
+
+
+def time_renders(engine, name: str, sample: dict, repeat: int) -> list:
+    """Return seconds taken by each of repeated renders of a template."""
+    context, request = render_arguments(name, sample)
+    engine.get_template(name).render(context, request)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        engine.get_template(name).render(context, request)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+class RenderStats:
+    """
+    Time and memory of every template rendered, includes apart.
+
+    While recording, each template's render is timed in full and
+    without the templates it includes or extends, and the peak of
+    memory allocated during it is taken from tracemalloc when it is
+    tracing. A parent template of {% extends %} renders the blocks of
+    its child, so their cost is counted to the parent.
+    """
+
+    def __init__(self):
+        self.templates = {}
+        self.stack = []
+
+    @contextmanager
+    def recording(self):
+        render = Template._render
+
+        def measured_render(template, context):
+            return self.measure(plain_render, template, context)
+
+        Template._render = measured_render
+        try:
+            yield self
+        finally:
+            Template._render = render
+
+    def measure(self, render, template, context):
+        tracing = tracemalloc.is_tracing()
+        frame = {'children': 0.0, 'base': 0, 'peak': 0}
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if self.stack:
+                parent = self.stack[-1]
+                parent['peak'] = max(parent['peak'], peak)
+            tracemalloc.reset_peak()
+            frame['base'] = frame['peak'] = current
+        self.stack.append(frame)
+        started = time.perf_counter()
+        try:
+            return render(template, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.stack.pop()
+            if self.stack:
+                self.stack[-1]['children'] += elapsed
+            allocated = 0
+            if tracing:
+                frame['peak'] = max(
+                    frame['peak'], tracemalloc.get_traced_memory()[1]
+                )
+                allocated = frame['peak'] - frame['base']
+                if self.stack:
+                    parent = self.stack[-1]
+                    parent['peak'] = max(parent['peak'], frame['peak'])
+            name = template.origin.template_name or template.origin.name
+            entry = self.templates.setdefault(name, {
+                'calls': 0, 'seconds': 0.0, 'self_seconds': 0.0, 'peak': 0,
+            })
+            entry['calls'] += 1
+            entry['seconds'] += elapsed
+            entry['self_seconds'] += elapsed - frame['children']
+            entry['peak'] = max(entry['peak'], allocated)
+
+
+def breakdown(engine, names: list, sample: dict, repeat: int) -> dict:
+    """Return time and allocations of templates and includes per render."""
+    stats = RenderStats()
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    try:
+        with stats.recording():
+            for name in names:
+                context, request = render_arguments(name, sample)
+                for _ in range(repeat):
+                    engine.get_template(name).render(context, request)
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+    return stats.templates
+
+
+def run(names: list, repeat: int, breakdown_repeat: int) -> dict:
+    """
+    Render templates with every profile and return the results.
+
+    Templates are also rendered with the Jinja2 engine when it is
+    configured and has an equivalent of them under the same name.
+    """
+    sample = sample_objects()
+    engines = {profile: backend(profile) for profile in PROFILES}
+    jinja2 = jinja2_backend()
+    if jinja2 is not None:
+        engines['jinja2'] = jinja2
+    pages = {}
+    with plain_rendering():
+        for name in names:
+            pages[name] = {}
+            for profile, engine in engines.items():
+                try:
+                    timings = time_renders(engine, name, sample, repeat)
+                except TemplateDoesNotExist:
+                    continue
+                pages[name][profile] = statistics.median(timings)
+    return {
+        'pages': pages,
+        'templates': breakdown(
+            engines['cached'], names, sample, breakdown_repeat
+        ),
+    }
@@ -0,0 +1,66 @@
+"""Per-request cost accounting for Server-Timing headers and logs."""
+import time
+from contextvars import ContextVar
+
+
+class RequestTimings:
+    """Durations in seconds and counters collected while serving a request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.db = 0.0
+        self.queries = 0
+        self.template = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def finish(self) -> None:
+        self.total = time.perf_counter() - self.started
+
+    def header(self) -> str:
+        """Format the timings as a Server-Timing header value."""
+        return ', '.join((
+            f'total;dur={self.total * 1000:.1f}',
+            f'db;dur={self.db * 1000:.1f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template * 1000:.1f}',
+            f'cache;desc="{self.cache_hits} hits, '
+            f'{self.cache_misses} misses"',
+        ))
+
+    def as_dict(self) -> dict:
+        return {
+            'total_ms': round(self.total * 1000, 1),
+            'db_ms': round(self.db * 1000, 1),
+            'queries': self.queries,
+            'template_ms': round(self.template * 1000, 1),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+        }
+
+
+current_timings: ContextVar = ContextVar('current_timings', default=None)
+
+
+def time_queries(execute, sql, params, many, context):
+    """Execute wrapper adding query time to the sampled request."""
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db += time.perf_counter() - started
+        timings.queries += 1
+
+
+def count_cache_lookup(hit: bool) -> None:
+    """Count a cache hit or miss of the sampled request."""
+    timings = current_timings.get()
+    if timings is None:
+        return
+    if hit:
+        timings.cache_hits += 1
+    else:
+        timings.cache_misses += 1
@@ -0,0 +1,208 @@
+"""Views of core app."""
+import mimetypes
+import os
+import re
+from http import HTTPStatus
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (FileResponse, Http404, HttpRequest, HttpResponse,
+                         HttpResponseNotModified, StreamingHttpResponse)
+from django.shortcuts import render
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_safe
+
+from .memory import memory_report
+from .metrics import CONTENT_TYPE, Counter, collect_exports
+from .metrics import render as render_metrics
+
+MEDIA_BYTES_SERVED = Counter(
+    'media_bytes_served_total', 'Media bytes sent or handed to the proxy.',
+    ('mode',)
+)
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+IMMUTABLE_CACHE_CONTROL: str = 'public, max-age=31536000, immutable'
+
+SENDFILE_HEADERS: dict = {
+    'x-sendfile': 'X-Sendfile',
+    'x-accel-redirect': 'X-Accel-Redirect',
+}
+
+
+def parse_range(header: str, size: int):
+    """
+    Parse a single byte range into inclusive (start, end) offsets.
+
+    Returns None when the header is absent, malformed or lists several
+    ranges (the whole file is served then) and raises ValueError when
+    the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if start == '':
+        length = int(end)
+        if length == 0:
+            raise ValueError('Empty suffix range.')
+        return max(0, size - length), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError('Range outside of the file.')
+    return start, end
+
+
+def read_range(path: str, start: int, length: int,
+               block_size: int = FileResponse.block_size):
+    """Yield a byte range of a file in blocks."""
+    with open(path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(block_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def is_immutable(name: str) -> bool:
+    """Check whether a media name never changes its content."""
+    return any(
+        re.search(pattern, name) for pattern in settings.MEDIA_IMMUTABLE_NAMES
+    )
+
+
+def not_modified(request: HttpRequest, etag: str, mtime: int) -> bool:
+    """Evaluate conditional request headers."""
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match is not None:
+        return etag in {tag.strip() for tag in if_none_match.split(',')} or (
+            if_none_match.strip() == '*'
+        )
+    if_modified_since = parse_http_date_safe(
+        request.headers.get('If-Modified-Since', '')
+    )
+    return if_modified_since is not None and mtime <= if_modified_since
+
+
+def media_stat(path: str):
+    """Resolve a media name to a path and stat it, or raise Http404."""
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+        stat = os.stat(fullpath)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404('Файл не найден')
+    if not os.path.isfile(fullpath):
+        raise Http404('Файл не найден')
+    return fullpath, stat
+
+
+def sendfile_response(path: str, fullpath: str,
+                      content_type: str) -> HttpResponse:
+    """Hand a file over to the proxy, which also handles Range."""
+    sendfile = settings.MEDIA_SENDFILE
+    response = HttpResponse(content_type=content_type)
+    response[SENDFILE_HEADERS[sendfile]] = (
+        fullpath if sendfile == 'x-sendfile'
+        else settings.MEDIA_ACCEL_REDIRECT_PREFIX + path
+    )
+    return response
+
+
+def file_response(request: HttpRequest, fullpath: str, size: int,
+                  content_type: str, byte_range) -> HttpResponse:
+    """Stream a whole file or one byte range of it."""
+    if byte_range is None:
+        status, start, length = HTTPStatus.OK, 0, size
+    else:
+        start, end = byte_range
+        status, length = HTTPStatus.PARTIAL_CONTENT, end - start + 1
+    if request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type, status=status)
+    elif byte_range is None:
+        response = FileResponse(
+            open(fullpath, 'rb'), content_type=content_type
+        )
+        MEDIA_BYTES_SERVED.inc(length, mode='full')
+    else:
+        response = StreamingHttpResponse(
+            read_range(fullpath, start, length),
+            content_type=content_type, status=status
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        MEDIA_BYTES_SERVED.inc(length, mode='range')
+    response['Content-Length'] = str(length)
+    return response
+
+
+@require_safe
+def serve_media(request: HttpRequest, path: str) -> HttpResponse:
+    """Serve a file from MEDIA_ROOT with caching and Range support."""
+    fullpath, stat = media_stat(path)
+    size, mtime = stat.st_size, int(stat.st_mtime)
+    etag = f'"{mtime:x}-{size:x}"'
+    headers = {
+        'Last-Modified': http_date(mtime),
+        'ETag': etag,
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': (
+            IMMUTABLE_CACHE_CONTROL if is_immutable(path)
+            else f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}'
+        ),
+    }
+    content_type = (
+        mimetypes.guess_type(fullpath)[0] or 'application/octet-stream'
+    )
+    if not_modified(request, etag, mtime):
+        response = HttpResponseNotModified()
+    elif settings.MEDIA_SENDFILE:
+        response = sendfile_response(path, fullpath, content_type)
+        MEDIA_BYTES_SERVED.inc(size, mode='sendfile')
+    else:
+        byte_range = None
+        if_range = request.headers.get('If-Range')
+        if if_range in (None, etag, headers['Last-Modified']):
+            try:
+                byte_range = parse_range(
+                    request.headers.get('Range', ''), size
+                )
+            except ValueError:
+                response = HttpResponse(
+                    status=HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+                )
+                response['Content-Range'] = f'bytes */{size}'
+                return response
+        response = file_response(
+            request, fullpath, size, content_type, byte_range
+        )
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+
+@never_cache
+@require_safe
+def metrics(request: HttpRequest) -> HttpResponse:
+    """Expose metrics of all worker processes to Prometheus."""
+    if not (request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS
+            or request.user.is_staff):
+        raise Http404
+    return HttpResponse(
+        render_metrics(collect_exports()), content_type=CONTENT_TYPE
+    )
+
+
+@never_cache
+@staff_member_required
+def memory(request: HttpRequest) -> HttpResponse:
+    """Show URL names whose requests allocated the most memory."""
+    return render(request, 'core/memory.html', {
+        'entries': memory_report.worst(settings.MEMORY_REPORT_SIZE),
+        'tracking': settings.MEMORY_TRACKING,
+    })
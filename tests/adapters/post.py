@@ -32,6 +32,8 @@ class PostModelAdapter(StudentModelAdapter):
             "author",
             "category",
             "location",
+            "image_width",
+            "image_height",
             "refresh_from_db",
         ]
 
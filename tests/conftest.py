@@ -83,6 +83,8 @@ pytest_plugins = [
     "fixtures.locations",
     "fixtures.categories",
     "fixtures.comments",
+    "fixtures.media",
+    "fixtures.queries",
     "adapters.comment",
 ]
 
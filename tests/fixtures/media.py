@@ -0,0 +1,8 @@
+import pytest
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path / 'media'
+    settings.MEDIA_ROOT.mkdir()
+    return settings.MEDIA_ROOT
@@ -0,0 +1,77 @@
+from collections import Counter
+from contextlib import ExitStack
+from typing import List
+
+import pytest
+from django.db import connections
+
+from core.slowlog import fingerprint
+
+# Query shapes a request may repeat without being an N+1 pattern:
+# savepoints of nested atomic blocks differ only in their names.
+REPEATABLE_PREFIXES = ('SAVEPOINT', 'RELEASE SAVEPOINT')
+
+
+class QueryLog:
+    """Record SQL run on every database connection while active."""
+
+    def __init__(self):
+        self.queries: List[str] = []
+        self._stack = None
+
+    def __enter__(self):
+        self.queries = []
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(
+                connection.execute_wrapper(self._record)
+            )
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+    def _record(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    def __len__(self):
+        return len(self.queries)
+
+    def repeated(self) -> List[str]:
+        """Return one example of every query shape run more than once."""
+        shapes = Counter(fingerprint(sql) for sql in self.queries)
+        examples = {}
+        for sql in self.queries:
+            shape = fingerprint(sql)
+            if (
+                shapes[shape] > 1 and shape not in examples
+                and not sql.lstrip().upper().startswith(REPEATABLE_PREFIXES)
+            ):
+                examples[shape] = sql
+        return list(examples.values())
+
+    def listing(self) -> str:
+        return '\n'.join(
+            f'{number}. {sql}'
+            for number, sql in enumerate(self.queries, 1)
+        )
+
+
+def assert_query_budget(log: QueryLog, budget: int, label: str) -> None:
+    """Fail when a request ran over budget or repeated a query shape."""
+    assert len(log) <= budget, (
+        f'Страница `{label}` выполняет {len(log)} запросов к базе данных '
+        f'при бюджете {budget}. Проверьте, что связанные объекты '
+        f'загружаются через `select_related`:\n{log.listing()}'
+    )
+    repeated = log.repeated()
+    assert not repeated, (
+        f'Страница `{label}` повторяет запросы одинаковой формы — '
+        'похоже на проблему N+1:\n' + '\n'.join(repeated)
+    )
+
+
+@pytest.fixture
+def query_log():
+    return QueryLog()
@@ -0,0 +1,81 @@
+from datetime import timedelta
+from http import HTTPStatus
+from io import BytesIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from mixer.backend.django import Mixer
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def old_post(mixer: Mixer, media_root, user, published_category):
+    img_io = BytesIO()
+    Image.new('RGB', (10, 10)).save(img_io, format='PNG')
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=400),
+        image=ImageFile(img_io, name='old.png')
+    )
+    mixer.blend(
+        'blog.Comment', post=post, author=user, text='Старый комментарий'
+    )
+    return post
+
+
+@pytest.fixture
+def fresh_post(mixer: Mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1)
+    )
+
+
+def test_old_posts_moved_with_comments(old_post, fresh_post, settings):
+    from blog.models import ArchivedComment, ArchivedPost, Comment, Post
+
+    call_command('archive_posts', days=365, batch_size=1)
+    assert list(Post.objects.all()) == [fresh_post], (
+        'Убедитесь, что в архив переносятся только старые публикации.'
+    )
+    assert not Comment.objects.exists()
+    archived = ArchivedPost.objects.get(pk=old_post.pk)
+    assert archived.title == old_post.title
+    assert archived.created_at == old_post.created_at, (
+        'Убедитесь, что при переносе в архив сохраняется дата создания.'
+    )
+    assert ArchivedComment.objects.filter(post=archived).count() == 1
+    assert (settings.MEDIA_ROOT / old_post.image.name).exists(), (
+        'Убедитесь, что изображение публикации сохраняется при переносе '
+        'в архив.'
+    )
+
+
+def test_archived_post_readable(old_post, user_client):
+    call_command('archive_posts', days=365)
+    response = user_client.get(
+        reverse('blog:post_detail', args=(old_post.pk,))
+    )
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что архивная публикация доступна по прежнему адресу.'
+    )
+    content = response.content.decode()
+    assert old_post.title in content
+    assert 'Старый комментарий' in content
+    assert 'form' not in response.context, (
+        'Убедитесь, что комментировать архивную публикацию нельзя.'
+    )
+
+
+def test_archived_image_survives_garbage_collection(old_post, settings):
+    call_command('archive_posts', days=365)
+    call_command('collect_media_garbage', min_age=0)
+    assert (settings.MEDIA_ROOT / old_post.image.name).exists(), (
+        'Убедитесь, что сборщик мусора не удаляет изображения архивных '
+        'публикаций.'
+    )
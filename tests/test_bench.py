@@ -0,0 +1,63 @@
+import runpy
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+PASSWORD = 'bench-password'
+
+
+@pytest.fixture
+def dataset(mixer):
+    users = mixer.cycle(3).blend(get_user_model(), is_staff=False)
+    for user in users:
+        user.set_password(PASSWORD)
+        user.save()
+    mixer.cycle(15).blend(
+        'blog.Post', author=mixer.sequence(*users), is_published=True,
+        category__is_published=True, location__is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+def test_traffic_mix_replayed(live_server, dataset):
+    from core import bench
+
+    targets = bench.Targets(seed=0, password=PASSWORD)
+    options = {
+        'clients': 2, 'seconds': 1, 'warmup': 0, 'seed': 0, 'timeout': 10,
+    }
+    results = bench.run(live_server.url, targets, options)
+    assert results['total']['requests'] > 0
+    assert results['total']['errors'] == 0, (
+        'Убедитесь, что запросы нагрузочного теста выполняются без ошибок.'
+    )
+    for name, view in results['views'].items():
+        if view['requests']:
+            assert view['p50_ms'] <= view['p95_ms'] <= view['p99_ms'], name
+    rows = bench.compare(results, results)
+    assert rows[0]['view'] == 'total'
+    assert rows[0]['rps'][2] == 0, (
+        'Убедитесь, что сравнение запуска с самим собой не даёт изменений.'
+    )
+
+
+def test_benchmark_server_runs_without_debug(settings, monkeypatch):
+    from core.management.commands.bench_http import SERVER_ENVIRONMENT
+
+    for name, value in SERVER_ENVIRONMENT.items():
+        monkeypatch.setenv(name, value)
+    path = settings.BASE_DIR / 'blogicum' / 'settings.py'
+    served = runpy.run_path(str(path))
+    assert served['DEBUG'] is False, (
+        'Убедитесь, что сервер нагрузочного теста запускается с DEBUG = '
+        'False, заданным до загрузки настроек.'
+    )
+    assert served['TEMPLATES'][0]['OPTIONS']['loaders'] == (
+        settings.CACHED_TEMPLATE_LOADERS
+    ), (
+        'Убедитесь, что сервер нагрузочного теста кеширует шаблоны.'
+    )
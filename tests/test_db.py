@@ -0,0 +1,149 @@
+import sqlite3
+import threading
+
+import pytest
+from django.db import connection, connections
+from django.test import Client
+from django.urls import reverse
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    ('pragma', 'expected'),
+    [('synchronous', 1), ('temp_store', 2), ('busy_timeout', 5000),
+     ('cache_size', -64000)],
+)
+def test_sqlite_pragmas_applied(pragma, expected):
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {pragma}')
+        assert cursor.fetchone()[0] == expected, (
+            f'Убедитесь, что при подключении к SQLite задаётся {pragma}.'
+        )
+
+
+@pytest.mark.django_db
+def test_persistent_connection_reused_and_counted():
+    from core.backends.persistent import DB_CONNECTIONS
+
+    connection.ensure_connection()
+    reused = DB_CONNECTIONS.value(alias='default', event='reused')
+    connection.close_if_unusable_or_obsolete()
+    assert connection.connection is not None, (
+        'Убедитесь, что соединение с базой данных сохраняется между '
+        'запросами.'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    assert DB_CONNECTIONS.value(alias='default', event='reused') == (
+        reused + 1
+    )
+
+
+@pytest.mark.django_db
+def test_connections_of_all_threads_closed(tmp_path):
+    from core.backends.persistent import close_all_connections
+
+    connections.databases['threaded'] = {
+        **connections.databases['default'],
+        'NAME': str(tmp_path / 'threaded.sqlite3'),
+    }
+    opened = []
+
+    def serve_request():
+        connections['threaded'].ensure_connection()
+        opened.append(connections['threaded'])
+
+    try:
+        thread = threading.Thread(target=serve_request)
+        thread.start()
+        thread.join()
+        close_all_connections()
+    finally:
+        del connections.databases['threaded']
+    assert opened[0].connection is None, (
+        'Убедитесь, что при завершении процесса закрываются соединения '
+        'всех потоков, а не только текущего.'
+    )
+
+
+@pytest.fixture
+def replica(settings, tmp_path):
+    """Register a second SQLite file as a lagging replica of default."""
+    from core.routers import pinned_to_primary
+
+    path = tmp_path / 'replica.sqlite3'
+    connections.databases['replica'] = {
+        **connections.databases['default'], 'NAME': str(path)
+    }
+    settings.DATABASE_REPLICAS = ['replica']
+
+    def replicate():
+        connection.ensure_connection()
+        target = sqlite3.connect(path)
+        connection.connection.backup(target)
+        target.close()
+        # Writes of the test itself pin it like a request that wrote.
+        pinned_to_primary.set(False)
+
+    yield replicate
+    connections['replica'].close()
+    del connections['replica']
+    del connections.databases['replica']
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reads_go_to_replica_until_client_writes(
+    replica, mixer, user, user_client, published_category
+):
+    from blog.models import Comment, Post
+
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category
+    )
+    replica()
+    assert Post.objects.get(pk=post.pk)._state.db == 'replica', (
+        'Убедитесь, что чтение моделей blog направляется на реплику.'
+    )
+    response = user_client.post(
+        reverse('blog:add_comment', args=(post.pk,)),
+        {'text': 'Комментарий после записи'}
+    )
+    assert Comment.objects.using('default').filter(post=post).exists(), (
+        'Убедитесь, что запись направляется в основную базу данных.'
+    )
+    assert 'primary_pin' in response.cookies, (
+        'Убедитесь, что после записи клиент закрепляется за основной '
+        'базой данных.'
+    )
+    detail = reverse('blog:post_detail', args=(post.pk,))
+    assert 'Комментарий после записи' in user_client.get(
+        detail
+    ).content.decode(), (
+        'Убедитесь, что после записи клиент читает из основной базы '
+        'данных и видит свои изменения.'
+    )
+    assert 'Комментарий после записи' not in Client().get(
+        detail
+    ).content.decode(), (
+        'Убедитесь, что клиенты без записи читают из реплики.'
+    )
+
+
+@pytest.mark.django_db
+def test_every_write_refreshes_primary_pin(
+    settings, mixer, user, user_client, published_category
+):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category
+    )
+    url = reverse('blog:add_comment', args=(post.pk,))
+    user_client.post(url, {'text': 'Первый комментарий'})
+    assert 'primary_pin' in user_client.cookies
+    response = user_client.post(url, {'text': 'Второй комментарий'})
+    assert 'primary_pin' in response.cookies, (
+        'Убедитесь, что каждая запись продлевает закрепление клиента за '
+        'основной базой данных.'
+    )
+    assert response.cookies['primary_pin']['max-age'] == (
+        settings.REPLICA_STICKY_SECONDS
+    )
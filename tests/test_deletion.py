@@ -0,0 +1,60 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+User = get_user_model()
+
+
+@pytest.fixture
+def prolific_user(mixer: Mixer, user, another_user, published_category):
+    posts = mixer.cycle(3).blend(
+        'blog.Post', author=user, category=published_category
+    )
+    for post in posts:
+        mixer.cycle(3).blend('blog.Comment', post=post, author=another_user)
+    other_post = mixer.blend(
+        'blog.Post', author=another_user, category=published_category
+    )
+    mixer.blend('blog.Comment', post=other_post, author=user)
+    return user
+
+
+def test_user_deleted_in_batches(prolific_user, another_user):
+    from blog.deletion import delete_user
+    from blog.models import Comment, Post
+
+    calls = []
+    delete_user(prolific_user, batch_size=2,
+                progress=lambda model, done: calls.append((model, done)))
+    assert not User.objects.filter(pk=prolific_user.pk).exists()
+    assert not Post.objects.filter(author=prolific_user).exists()
+    assert list(Post.objects.values_list('author', flat=True)) == [
+        another_user.pk
+    ], 'Убедитесь, что публикации других пользователей не удаляются.'
+    assert not Comment.objects.exists()
+    assert (Comment, 9) in calls and (Post, 3) in calls, (
+        'Убедитесь, что об удалении сообщается после каждой порции.'
+    )
+    assert (Comment, 2) in calls, (
+        'Убедитесь, что связанные объекты удаляются порциями.'
+    )
+
+
+def test_admin_summarizes_large_deletion(
+    prolific_user, admin_client, settings
+):
+    settings.DELETION_BATCH_SIZE = 2
+    url = reverse('admin:auth_user_delete', args=(prolific_user.pk,))
+    response = admin_client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert 'Публикации: 3' in response.content.decode(), (
+        'Убедитесь, что страница подтверждения удаления показывает '
+        'количество связанных объектов.'
+    )
+    admin_client.post(url, {'post': 'yes'})
+    assert not User.objects.filter(pk=prolific_user.pk).exists()
@@ -0,0 +1,90 @@
+import itertools
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+
+from blog.models import Category, Comment, Location, Post
+
+# The command switches pragmas, which SQLite refuses inside a transaction.
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+SIZES = {
+    'users': 5, 'categories': 3, 'locations': 4, 'posts': 30,
+    'comments': 60, 'batch_size': 7,
+}
+
+
+def indexes() -> dict:
+    """Return names of the indexes of tables generate_dataset fills."""
+    with connection.cursor() as cursor:
+        return {
+            model._meta.db_table: sorted(
+                name for name, constraint
+                in connection.introspection.get_constraints(
+                    cursor, model._meta.db_table
+                ).items()
+                if constraint['index']
+            )
+            for model in (Post, Comment)
+        }
+
+
+def pragma(name: str):
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+def test_dataset_generated():
+    from blog.search import ranked_ids, search_terms
+
+    expected = indexes()
+    call_command('generate_dataset', **SIZES, stdout=StringIO())
+    assert get_user_model().objects.count() == SIZES['users']
+    assert Category.objects.count() == SIZES['categories']
+    assert Location.objects.count() == SIZES['locations']
+    assert Post.objects.count() == SIZES['posts']
+    assert Comment.objects.count() == SIZES['comments'], (
+        'Убедитесь, что команда `generate_dataset` создаёт заданное '
+        'число строк.'
+    )
+    assert indexes() == expected, (
+        'Убедитесь, что после загрузки восстанавливаются все индексы.'
+    )
+    for post in Post.objects.all():
+        terms = search_terms(post.title)[:1]
+        assert post.pk in ranked_ids(connection, terms), (
+            'Убедитесь, что сгенерированные посты попадают в поисковый '
+            'индекс.'
+        )
+
+
+def test_failed_generation_restores_database(monkeypatch):
+    from blog.management.commands.generate_dataset import Command
+    from blog.search import install_index
+
+    expected = indexes()
+    synchronous = pragma('synchronous')
+    batches = Command.batches
+
+    def failing_batches(self, total, make_rows):
+        yield from itertools.islice(batches(self, total, make_rows), 10)
+        raise RuntimeError('Generation failed')
+
+    monkeypatch.setattr(Command, 'batches', failing_batches)
+    with pytest.raises(RuntimeError):
+        call_command('generate_dataset', **SIZES, stdout=StringIO())
+    assert indexes() == expected, (
+        'Убедитесь, что индексы восстанавливаются, даже если генерация '
+        'прервалась.'
+    )
+    assert pragma('synchronous') == synchronous, (
+        'Убедитесь, что после загрузки восстанавливаются настройки SQLite.'
+    )
+    assert not install_index(connection), (
+        'Убедитесь, что поисковый индекс восстанавливается, даже если '
+        'генерация прервалась.'
+    )
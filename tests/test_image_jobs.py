@@ -0,0 +1,69 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from django.utils import timezone
+from mixer.backend.django import Mixer
+from PIL import Image
+
+from blog.models import ImageJob
+from blog.tasks import enqueue_image_job
+
+
+@pytest.fixture
+def post_with_image(mixer: Mixer, media_root, user, published_category):
+    img = Image.new('RGB', (400, 300), color=(10, 150, 10))
+    img_io = BytesIO()
+    img.save(img_io, format='JPEG')
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        image=ImageFile(img_io, name='job.jpg')
+    )
+
+
+@pytest.mark.django_db
+def test_worker_processes_queued_image(post_with_image, client):
+    job = enqueue_image_job(post_with_image, post_with_image.image.name)
+    assert job is not None
+    content = client.get('/').content.decode('utf-8')
+    assert 'type="image/webp"' not in content, (
+        'Убедитесь, что до обработки изображения выводится оригинал.'
+    )
+    call_command('run_image_worker', once=True, workers=1)
+    post_with_image.refresh_from_db()
+    assert set(post_with_image.image_renditions) == {'webp', 'jpeg'}
+    assert not ImageJob.objects.exists()
+    content = client.get('/').content.decode('utf-8')
+    assert 'type="image/webp"' in content
+
+
+@pytest.mark.django_db
+def test_failed_job_retried_then_given_up(post_with_image, settings):
+    settings.IMAGE_JOB_MAX_ATTEMPTS = 2
+    job = ImageJob.objects.create(
+        post=post_with_image, image_name='post_images/missing.jpg'
+    )
+    call_command('run_image_worker', once=True, workers=1)
+    job.refresh_from_db()
+    assert (job.status, job.attempts) == (ImageJob.PENDING, 1)
+    assert job.run_after > timezone.now()
+    assert job.last_error
+    ImageJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+    call_command('run_image_worker', once=True, workers=1)
+    job.refresh_from_db()
+    assert (job.status, job.attempts) == (ImageJob.FAILED, 2)
+
+
+@pytest.mark.django_db
+def test_duplicate_image_reuses_renditions(post_with_image, settings):
+    settings.IMAGE_JOBS_EAGER = True
+    enqueue_image_job(post_with_image, post_with_image.image.name)
+    post_with_image.refresh_from_db()
+    other = type(post_with_image).objects.create(
+        title='copy', text='copy', author=post_with_image.author,
+        image=post_with_image.image.name
+    )
+    assert enqueue_image_job(other, other.image.name) is None
+    other.refresh_from_db()
+    assert other.image_renditions == post_with_image.image_renditions
@@ -0,0 +1,105 @@
+import hashlib
+from http import HTTPStatus
+from io import BytesIO
+
+import pytest
+from django.core.files.images import ImageFile
+from mixer.backend.django import Mixer
+from PIL import Image
+
+from blog.images import generate_renditions
+
+
+@pytest.fixture
+def post_with_large_image(
+        mixer: Mixer, media_root, user, published_location,
+        published_category):
+    img = Image.new('RGB', (800, 400), color=(73, 109, 137))
+    img_io = BytesIO()
+    img.save(img_io, format='PNG')
+    return mixer.blend(
+        'blog.Post',
+        location=published_location,
+        category=published_category,
+        author=user,
+        image=ImageFile(img_io, name='large_image.png'),
+    )
+
+
+@pytest.mark.django_db
+def test_renditions_generated(post_with_large_image, media_root):
+    renditions = generate_renditions(post_with_large_image)
+    assert set(renditions) == {'webp', 'jpeg'}, (
+        'Убедитесь, что для изображения без прозрачности создаются '
+        'варианты в форматах WebP и JPEG.'
+    )
+    widths = [item['width'] for item in renditions['webp']]
+    assert widths == [320, 640, 800], (
+        'Убедитесь, что варианты изображения не увеличиваются сверх '
+        'исходной ширины.'
+    )
+    for item in renditions['webp']:
+        assert (media_root / item['name']).exists()
+    post_with_large_image.refresh_from_db()
+    assert post_with_large_image.image_renditions == renditions
+
+
+@pytest.mark.django_db
+def test_renditions_reset_on_image_clear(post_with_large_image):
+    generate_renditions(post_with_large_image)
+    post_with_large_image.image = None
+    post_with_large_image.save()
+    post_with_large_image.refresh_from_db()
+    assert post_with_large_image.image_renditions == {}
+
+
+@pytest.mark.django_db
+def test_index_renders_srcset(client, post_with_large_image):
+    generate_renditions(post_with_large_image)
+    content = client.get('/').content.decode('utf-8')
+    assert 'type="image/webp"' in content
+    assert 'srcset=' in content and 'sizes=' in content
+    assert 'loading="lazy"' in content
+    assert 'width="800" height="400"' in content, (
+        'Убедитесь, что у изображения публикации указаны размеры, чтобы '
+        'избежать сдвига вёрстки.'
+    )
+
+
+@pytest.mark.django_db
+def test_image_metadata_captured(post_with_large_image):
+    post_with_large_image.refresh_from_db()
+    assert (
+        post_with_large_image.image_width,
+        post_with_large_image.image_height,
+    ) == (800, 400), (
+        'Убедитесь, что размеры изображения сохраняются при загрузке.'
+    )
+    with post_with_large_image.image.open('rb') as file:
+        content = file.read()
+    assert post_with_large_image.image_bytes == len(content)
+    assert post_with_large_image.image_sha256 == hashlib.sha256(
+        content).hexdigest()
+
+
+@pytest.mark.django_db
+def test_post_with_missing_image_file_renders(
+    client, admin_client, post_with_large_image
+):
+    from blog.models import Post
+
+    post = post_with_large_image
+    # As left by the metadata backfill for a file it could not read.
+    Post.objects.filter(pk=post.pk).update(
+        image='post_images/missing.png', image_width=None, image_height=None
+    )
+    for url, page_client in (
+        ('/', client),
+        (f'/posts/{post.pk}/', client),
+        ('/admin/blog/post/', admin_client),
+        (f'/admin/blog/post/{post.pk}/change/', admin_client),
+    ):
+        assert page_client.get(url).status_code == HTTPStatus.OK, (
+            'Убедитесь, что публикации с отсутствующим файлом изображения '
+            f'отображаются на странице `{url}`.'
+        )
@@ -0,0 +1,77 @@
+import re
+from datetime import timedelta
+
+import pytest
+from conftest import N_PER_PAGE
+from django.urls import reverse
+from django.utils import timezone
+
+pytest.importorskip('jinja2')
+
+pytestmark = [pytest.mark.django_db]
+
+JINJA2_VIEWS = (
+    'blog:index', 'blog:category_posts', 'blog:profile', 'blog:post_detail',
+)
+
+
+def normalized(response) -> str:
+    """Return page markup with whitespace and CSRF tokens made uniform."""
+    content = response.content.decode()
+    content = re.sub(r'(csrfmiddlewaretoken" value=")[^"]+', r'\1', content)
+    content = re.sub(r'\s+', ' ', content)
+    return re.sub(r'> <', '><', content).strip()
+
+
+@pytest.fixture
+def pages(mixer, user, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend('blog.Comment', post=post, author=user)
+    mixer.cycle(N_PER_PAGE).blend(
+        'blog.Post', author=user, category=post.category,
+        location=post.location, is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    post.image_renditions = {
+        'webp': [{'name': 'renditions/post-480.webp', 'width': 480}],
+        'jpeg': [{'name': 'renditions/post-480.jpg', 'width': 480,
+                  'height': 360}],
+    }
+    post.save(update_fields=['image_renditions'])
+    return (
+        reverse('blog:index'),
+        reverse('blog:index') + '?page=2',
+        reverse('blog:category_posts', args=(post.category.slug,)),
+        reverse('blog:profile', args=(post.author.username,)),
+        reverse('blog:post_detail', args=(post.pk,)),
+    )
+
+
+@pytest.mark.parametrize('logged_in', (False, True))
+def test_jinja2_output_matches(
+    settings, client, user_client, pages, logged_in
+):
+    client = user_client if logged_in else client
+    for url in pages:
+        settings.JINJA2_VIEWS = ()
+        expected = client.get(url)
+        settings.JINJA2_VIEWS = JINJA2_VIEWS
+        response = client.get(url)
+        assert 'base.html' not in [
+            template.name for template in response.templates
+        ], (
+            f'Убедитесь, что страница `{url}` отрисована Jinja2.'
+        )
+        assert normalized(response) == normalized(expected), (
+            f'Убедитесь, что шаблон Jinja2 страницы `{url}` выводит то же, '
+            'что и шаблон Django.'
+        )
+
+
+def test_jinja2_benchmarked():
+    from core import template_bench
+
+    timings = template_bench.run(['blog/index.html'], 2, 1)['pages']
+    assert 'jinja2' in timings['blog/index.html'], (
+        'Убедитесь, что бенчмарк шаблонов сравнивает шаблоны Jinja2.'
+    )
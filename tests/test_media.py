@@ -0,0 +1,84 @@
+from http import HTTPStatus
+
+import pytest
+from django.utils.http import http_date
+
+DIGEST = 'ab' * 32
+HASHED_NAME = f'post_images/ab/ab/{DIGEST}.jpg'
+CONTENT = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def media_file(media_root):
+    path = media_root / HASHED_NAME
+    path.parent.mkdir(parents=True)
+    path.write_bytes(CONTENT)
+    (media_root / 'plain.txt').write_text('plain')
+    return path
+
+
+def test_full_response(client, media_file):
+    response = client.get(f'/media/{HASHED_NAME}')
+    assert response.status_code == HTTPStatus.OK
+    assert b''.join(response.streaming_content) == CONTENT
+    assert response['Accept-Ranges'] == 'bytes'
+    assert 'immutable' in response['Cache-Control'], (
+        'Убедитесь, что файлы с именем по хешу содержимого кешируются '
+        'надолго.'
+    )
+    plain = client.get('/media/plain.txt')
+    assert 'immutable' not in plain['Cache-Control']
+
+
+@pytest.mark.parametrize(
+    ('header', 'expected'),
+    [
+        ('bytes=0-9', CONTENT[:10]),
+        ('bytes=10000-', CONTENT[10000:]),
+        ('bytes=-5', CONTENT[-5:]),
+    ],
+)
+def test_range_response(client, media_file, header, expected):
+    response = client.get(f'/media/{HASHED_NAME}', HTTP_RANGE=header)
+    assert response.status_code == HTTPStatus.PARTIAL_CONTENT
+    assert b''.join(response.streaming_content) == expected
+    assert response['Content-Length'] == str(len(expected))
+    assert response['Content-Range'].endswith(f'/{len(CONTENT)}')
+
+
+def test_unsatisfiable_range(client, media_file):
+    response = client.get(
+        f'/media/{HASHED_NAME}', HTTP_RANGE=f'bytes={len(CONTENT)}-'
+    )
+    assert response.status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+    assert response['Content-Range'] == f'bytes */{len(CONTENT)}'
+
+
+def test_conditional_requests(client, media_file):
+    response = client.get(f'/media/{HASHED_NAME}')
+    assert client.get(
+        f'/media/{HASHED_NAME}', HTTP_IF_NONE_MATCH=response['ETag']
+    ).status_code == HTTPStatus.NOT_MODIFIED
+    assert client.get(
+        f'/media/{HASHED_NAME}',
+        HTTP_IF_MODIFIED_SINCE=http_date(media_file.stat().st_mtime + 1)
+    ).status_code == HTTPStatus.NOT_MODIFIED
+    assert client.get(
+        f'/media/{HASHED_NAME}', HTTP_IF_MODIFIED_SINCE=http_date(0)
+    ).status_code == HTTPStatus.OK
+
+
+def test_accel_redirect(client, media_file, settings):
+    settings.MEDIA_SENDFILE = 'x-accel-redirect'
+    response = client.get(f'/media/{HASHED_NAME}')
+    assert response['X-Accel-Redirect'] == f'/protected-media/{HASHED_NAME}'
+    assert response.content == b''
+
+
+def test_missing_and_outside_files(client, media_file):
+    assert client.get('/media/missing.jpg').status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+    assert client.get('/media/../settings.py').status_code == (
+        HTTPStatus.NOT_FOUND
+    )
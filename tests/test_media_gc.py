@@ -0,0 +1,56 @@
+import os
+import time
+from io import BytesIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from mixer.backend.django import Mixer
+from PIL import Image
+
+
+@pytest.fixture
+def media(mixer: Mixer, media_root, user, published_category):
+    img_io = BytesIO()
+    Image.new('RGB', (10, 10)).save(img_io, format='PNG')
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        image=ImageFile(img_io, name='kept.png')
+    )
+    old = time.time() - 7200
+    files = {}
+    for name in ('post_images/orphan.jpg', 'renditions/stale-320w.webp',
+                 'post_images/fresh.jpg'):
+        path = media_root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b'orphan')
+        if 'fresh' not in name:
+            os.utime(path, (old, old))
+        files[name] = path
+    kept = media_root / post.image.name
+    os.utime(kept, (old, old))
+    files['kept'] = kept
+    return files
+
+
+@pytest.mark.django_db
+def test_orphans_removed(media):
+    call_command('collect_media_garbage', batch_size=1)
+    assert not media['post_images/orphan.jpg'].exists()
+    assert not media['renditions/stale-320w.webp'].exists()
+    assert media['post_images/fresh.jpg'].exists(), (
+        'Убедитесь, что недавно загруженные файлы не удаляются.'
+    )
+    assert media['kept'].exists(), (
+        'Убедитесь, что файлы, на которые ссылаются публикации, '
+        'не удаляются.'
+    )
+
+
+@pytest.mark.django_db
+def test_dry_run_and_quarantine(media, tmp_path):
+    call_command('collect_media_garbage', dry_run=True)
+    assert media['post_images/orphan.jpg'].exists()
+    call_command('collect_media_garbage', quarantine=tmp_path / 'quarantine')
+    assert not media['post_images/orphan.jpg'].exists()
+    assert (tmp_path / 'quarantine/post_images/orphan.jpg').exists()
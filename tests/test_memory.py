@@ -0,0 +1,50 @@
+import logging
+import tracemalloc
+from http import HTTPStatus
+
+import pytest
+from django.urls import reverse
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def memory_tracking(settings):
+    from core.memory import memory_report
+
+    settings.MEMORY_TRACKING = True
+    memory_report.clear()
+    yield
+    tracemalloc.stop()
+    memory_report.clear()
+
+
+def test_request_memory_logged(
+    client, memory_tracking, caplog, post_with_published_location
+):
+    with caplog.at_level(logging.INFO, logger='core.memory'):
+        client.get(reverse(
+            'blog:post_detail', args=(post_with_published_location.pk,)
+        ))
+    record = next(
+        record for record in caplog.records if record.name == 'core.memory'
+    )
+    assert record.memory['view'] == 'blog:post_detail'
+    assert record.memory['peak'] > 0, (
+        'Убедитесь, что в журнал записывается пик выделенной памяти.'
+    )
+    assert record.memory['sites'], (
+        'Убедитесь, что в журнал записываются места выделения памяти.'
+    )
+
+
+def test_memory_report_for_staff(client, admin_client, memory_tracking):
+    admin_client.get(reverse('blog:index'))
+    url = reverse('memory')
+    assert client.get(url).status_code == HTTPStatus.FOUND, (
+        'Убедитесь, что отчёт о памяти доступен только сотрудникам.'
+    )
+    response = admin_client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert 'blog:index' in response.content.decode()
+    assert response.context['entries'][0]['requests'] >= 1
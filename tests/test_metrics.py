@@ -0,0 +1,141 @@
+import json
+import os
+from http import HTTPStatus
+
+import pytest
+from django.urls import reverse
+
+pytestmark = [pytest.mark.django_db]
+
+# No process has a pid this large, so it counts as exited.
+EXITED_PID = 99999999
+
+
+@pytest.fixture
+def local_scraper(settings):
+    settings.METRICS_ALLOWED_IPS = ['127.0.0.1']
+
+
+def exited_requests(count: int) -> dict:
+    from core.metrics import REGISTRY
+
+    return {
+        'http_requests_total': {
+            **REGISTRY.get('http_requests_total').export(),
+            'samples': [[['blog:index', 'GET', '200'], count]],
+        },
+    }
+
+
+def index_requests(text: str) -> int:
+    line = next(
+        line for line in text.splitlines()
+        if line.startswith('http_requests_total{view="blog:index"')
+    )
+    return int(line.split()[-1])
+
+
+def scrape(client) -> str:
+    response = client.get(reverse('metrics'))
+    assert response.status_code == HTTPStatus.OK
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    return response.content.decode()
+
+
+def test_request_metrics_exposed(client, local_scraper):
+    client.get(reverse('blog:index'))
+    text = scrape(client)
+    for line in (
+        '# TYPE http_requests_total counter',
+        'http_requests_total{view="blog:index",method="GET",status="200"}',
+        '# TYPE http_request_duration_seconds histogram',
+        'http_request_duration_seconds_bucket{view="blog:index",le="+Inf"}',
+        'http_request_duration_seconds_count{view="blog:index"}',
+        'db_queries_total{view="blog:index"}',
+        'process_resident_memory_bytes ',
+    ):
+        assert line in text, f'Убедитесь, что /metrics содержит {line}'
+
+
+@pytest.mark.parametrize('address', ('203.0.113.5', '127.0.0.1'))
+def test_metrics_hidden_from_outside(client, address):
+    response = client.get(reverse('metrics'), REMOTE_ADDR=address)
+    assert response.status_code == HTTPStatus.NOT_FOUND, (
+        'Убедитесь, что метрики недоступны посторонним адресам, в том '
+        'числе локальным, за которыми может стоять обратный прокси.'
+    )
+
+
+def test_metrics_summed_across_processes(
+    client, settings, tmp_path, local_scraper
+):
+    from core.metrics import REGISTRY
+
+    settings.METRICS_DIR = tmp_path
+    exited = {
+        **exited_requests(1000),
+        'process_resident_memory_bytes': {
+            **REGISTRY.get('process_resident_memory_bytes').export(),
+            'samples': [[[], 10 ** 12]],
+        },
+    }
+    (tmp_path / f'{EXITED_PID}.json').write_text(
+        json.dumps({'pid': EXITED_PID, 'metrics': exited})
+    )
+    client.get(reverse('blog:index'))
+    text = scrape(client)
+    assert index_requests(text) > 1000, (
+        'Убедитесь, что счётчики всех процессов суммируются.'
+    )
+    memory = next(
+        line for line in text.splitlines()
+        if line.startswith('process_resident_memory_bytes ')
+    )
+    assert int(memory.split()[-1]) < 10 ** 12, (
+        'Убедитесь, что показатели завершившихся процессов не учитываются.'
+    )
+
+
+def test_exited_processes_folded(client, settings, tmp_path, local_scraper):
+    settings.METRICS_DIR = tmp_path
+    # A file of an exited process whose pid this process reuses.
+    reused = tmp_path / f'{os.getpid()}-exited.json'
+    reused.write_text(
+        json.dumps({'pid': os.getpid(), 'metrics': exited_requests(500)})
+    )
+    for number in range(2):
+        (tmp_path / f'{EXITED_PID}-{number}.json').write_text(
+            json.dumps({'pid': EXITED_PID, 'metrics': exited_requests(1000)})
+        )
+    client.get(reverse('blog:index'))
+    first = index_requests(scrape(client))
+    assert first > 2500
+    reused_metrics = json.loads(reused.read_text())['metrics']
+    assert reused_metrics == exited_requests(500), (
+        'Убедитесь, что процесс с тем же pid не затирает чужой файл метрик.'
+    )
+    assert not list(tmp_path.glob(f'{EXITED_PID}-*.json')), (
+        'Убедитесь, что файлы завершившихся процессов удаляются.'
+    )
+    second = index_requests(scrape(client))
+    assert second >= first, (
+        'Убедитесь, что счётчики не уменьшаются после удаления файлов '
+        'завершившихся процессов.'
+    )
+
+
+def test_histogram_exposition():
+    from core.metrics import Histogram, Registry, merge_exports, render
+
+    registry = Registry()
+    latency = Histogram(
+        'latency_seconds', 'Latency.', ('view',), buckets=(0.1, 1),
+        registry=registry
+    )
+    for value in (0.05, 0.5, 5):
+        latency.observe(value, view='a"b')
+    text = render(merge_exports([(None, registry.export())]))
+    assert 'latency_seconds_bucket{view="a\\"b",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{view="a\\"b",le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{view="a\\"b",le="+Inf"} 3' in text
+    assert 'latency_seconds_sum{view="a\\"b"} 5.55' in text
@@ -0,0 +1,56 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def profile_dir(settings, tmp_path):
+    settings.PROFILE_DIR = tmp_path
+    settings.PROFILE_INTERVAL = 0.0005
+    return tmp_path
+
+
+def signed_url(capsys, url: str) -> str:
+    call_command('profile_url', url)
+    return capsys.readouterr().out.strip()
+
+
+def test_staff_request_profiled(admin_client, profile_dir, capsys):
+    url = signed_url(capsys, reverse('blog:index') + '?page=1')
+    response = admin_client.get(url)
+    assert 'X-Profile' in response, (
+        'Убедитесь, что запрос сотрудника с подписанным флагом '
+        'профилируется.'
+    )
+    profile = profile_dir / response['X-Profile']
+    lines = profile.read_text(encoding='utf-8').splitlines()
+    assert lines, 'Убедитесь, что профиль содержит выборки стека.'
+    stack, count = lines[0].rsplit(' ', 1)
+    assert int(count) > 0 and ';' in stack
+
+
+def test_flag_checked(client, admin_client, profile_dir, capsys):
+    url = signed_url(capsys, reverse('blog:index'))
+    assert 'X-Profile' not in client.get(url), (
+        'Убедитесь, что запросы анонимных пользователей не профилируются '
+        'по флагу.'
+    )
+    assert 'X-Profile' not in admin_client.get(
+        reverse('blog:index') + '?profile=forged'
+    )
+    other = signed_url(capsys, '/pages/about/')
+    assert 'X-Profile' not in admin_client.get(
+        reverse('blog:index') + '?' + other.split('?', 1)[1]
+    ), 'Убедитесь, что подписанный флаг действует только для своего пути.'
+    assert not list(profile_dir.iterdir())
+
+
+def test_one_in_n_requests_profiled(client, profile_dir, settings):
+    settings.PROFILE_ONE_IN = 2
+    for _ in range(4):
+        client.get(reverse('blog:index'))
+    assert len(list(profile_dir.iterdir())) == 2, (
+        'Убедитесь, что профилируется каждый N-й запрос.'
+    )
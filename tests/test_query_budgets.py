@@ -0,0 +1,96 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from conftest import N_PER_PAGE
+from django.urls import reverse
+from django.utils import timezone
+from fixtures.queries import assert_query_budget
+
+pytestmark = [pytest.mark.django_db]
+
+COMMENTS_PER_POST = 3
+
+# Most queries a page of blog/urls.py may run for its author with a page of
+# posts by different authors, in different categories and locations;
+# two of them load the session and the user.
+QUERY_BUDGETS = {
+    'index': 4,
+    'search': 5,
+    'category_posts': 5,
+    'profile': 5,
+    'post_detail': 4,
+    'create_post': 4,
+    'edit_post': 5,
+    'delete_post': 4,
+    'add_comment': 5,
+    'edit_comment': 3,
+    'delete_comment': 3,
+    'edit_profile': 3,
+}
+
+
+@pytest.fixture
+def full_page(mixer, user, published_category):
+    past = timezone.now() - timedelta(days=1)
+    posts = [
+        mixer.blend(
+            'blog.Post', author=author, category=category,
+            location=location, is_published=True, pub_date=past,
+        )
+        for author, category, location in zip(
+            [user] + mixer.cycle(N_PER_PAGE - 1).blend('auth.User'),
+            [published_category] + mixer.cycle(N_PER_PAGE - 1).blend(
+                'blog.Category', is_published=True
+            ),
+            mixer.cycle(N_PER_PAGE).blend('blog.Location', is_published=True),
+        )
+    ]
+    post = posts[0]
+    comments = mixer.cycle(COMMENTS_PER_POST).blend(
+        'blog.Comment', post=post, author=mixer.SELECT
+    )
+    comments[0].author = user
+    comments[0].save()
+    return post, comments[0]
+
+
+@pytest.fixture
+def pages(full_page, user):
+    post, comment = full_page
+    return {
+        'index': ('get', ()),
+        'search': ('get', (), {'q': post.title.split()[0]}),
+        'category_posts': ('get', (post.category.slug,)),
+        'profile': ('get', (user.username,)),
+        'post_detail': ('get', (post.pk,)),
+        'create_post': ('get', ()),
+        'edit_post': ('get', (post.pk,)),
+        'delete_post': ('get', (post.pk,)),
+        'add_comment': ('post', (post.pk,), {'text': 'Комментарий'}),
+        'edit_comment': ('get', (post.pk, comment.pk)),
+        'delete_comment': ('get', (post.pk, comment.pk)),
+        'edit_profile': ('get', (user.username,)),
+    }
+
+
+def test_every_url_has_budget():
+    from blog.urls import urlpatterns
+
+    missing = {pattern.name for pattern in urlpatterns} - set(QUERY_BUDGETS)
+    assert not missing, (
+        'Укажите бюджет запросов к базе данных для страниц: '
+        f'{", ".join(sorted(missing))}.'
+    )
+
+
+@pytest.mark.parametrize('name', QUERY_BUDGETS)
+def test_query_budget(name, pages, user_client, query_log):
+    method, args, *data = pages[name]
+    url = reverse(f'blog:{name}', args=args)
+    with query_log:
+        response = getattr(user_client, method)(url, *data)
+    assert response.status_code in (HTTPStatus.OK, HTTPStatus.FOUND), (
+        f'Убедитесь, что страница `{url}` доступна автору.'
+    )
+    assert_query_budget(query_log, QUERY_BUDGETS[name], url)
@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def searchable_posts(mixer: Mixer, user, published_category):
+    def blend(title, text, **kwargs):
+        kwargs.setdefault('is_published', True)
+        kwargs.setdefault('pub_date', timezone.now() - timedelta(days=1))
+        return mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            title=title, text=text, **kwargs
+        )
+
+    return {
+        'title': blend('Ёжик в тумане', 'Про лошадку.'),
+        'text': blend('Мультфильм', 'Ежик ищет лошадку в тумане.'),
+        'hidden': blend('Ежик', 'Снят с публикации.', is_published=False),
+        'future': blend(
+            'Ежик', 'Отложенный пост.',
+            pub_date=timezone.now() + timedelta(days=1)
+        ),
+        'other': blend('Другое', 'Ничего общего.'),
+    }
+
+
+def search(client, query):
+    response = client.get(reverse('blog:search'), {'q': query})
+    return list(response.context['page_obj'])
+
+
+def test_search_ranks_and_respects_visibility(client, searchable_posts):
+    found = search(client, 'ёжик ТУМАНЕ')
+    assert found == [searchable_posts['title'], searchable_posts['text']], (
+        'Убедитесь, что поиск находит только опубликованные посты со всеми '
+        'словами запроса, а совпадения в заголовке выше совпадений в тексте.'
+    )
+
+
+def test_search_index_follows_changes(client, searchable_posts):
+    post = searchable_posts['other']
+    post.text = 'Теперь и здесь есть ёжик.'
+    post.save()
+    assert post in search(client, 'ежик'), (
+        'Убедитесь, что изменения поста попадают в поисковый индекс.'
+    )
+    searchable_posts['title'].delete()
+    assert searchable_posts['title'].pk not in {
+        found.pk for found in search(client, 'лошадку')
+    }, 'Убедитесь, что удалённые посты пропадают из поискового индекса.'
+
+
+def test_search_without_terms_is_empty(client, searchable_posts):
+    assert search(client, ' !? ') == [], (
+        'Убедитесь, что пустой запрос не возвращает постов.'
+    )
+
+
+def test_search_triggers_repaired(searchable_posts):
+    from blog.models import Post
+    from blog.search import install_index, search_posts
+
+    with connection.cursor() as cursor:
+        cursor.execute('DROP TRIGGER blog_post_fts_insert')
+    assert install_index(connection), (
+        'Убедитесь, что пропавшие триггеры поискового индекса '
+        'восстанавливаются.'
+    )
+    assert len(search_posts(Post.objects.all(), 'лошадку')) == 2
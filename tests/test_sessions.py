@@ -0,0 +1,88 @@
+import runpy
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.sessions.models import Session
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize('profile', ('cached_db', 'signed_cookies'))
+def test_session_read_without_database(settings, user, profile, query_log):
+    settings.SESSION_ENGINE = settings.SESSION_PROFILES[profile]
+    client = Client()
+    client.force_login(user)
+    with query_log:
+        response = client.get(reverse('blog:index'))
+    assert response.context['user'] == user, (
+        f'Убедитесь, что с профилем сессий `{profile}` пользователь '
+        'остаётся авторизован.'
+    )
+    assert not [sql for sql in query_log.queries if 'django_session' in sql], (
+        f'Убедитесь, что с профилем сессий `{profile}` сессия читается '
+        f'без запроса к базе данных:\n{query_log.listing()}'
+    )
+
+
+def test_purge_sessions_deletes_expired():
+    now = timezone.now()
+    for number in range(5):
+        Session.objects.create(
+            session_key=f'expired{number}', session_data='',
+            expire_date=now - timedelta(days=1),
+        )
+    Session.objects.create(
+        session_key='active', session_data='',
+        expire_date=now + timedelta(days=1),
+    )
+    call_command('purge_sessions', batch_size=2, stdout=StringIO())
+    assert list(Session.objects.values_list('session_key', flat=True)) == [
+        'active'
+    ], (
+        'Убедитесь, что команда `purge_sessions` удаляет только '
+        'истёкшие сессии.'
+    )
+
+
+def test_sessions_benchmarked():
+    out = StringIO()
+    call_command('bench_sessions', requests=4, logins=2, stdout=out)
+    lines = out.getvalue().splitlines()[1:]
+    assert [line.split()[0] for line in lines] == [
+        'db', 'cached_db', 'signed_cookies'
+    ], (
+        'Убедитесь, что бенчмарк сессий сравнивает все профили.'
+    )
+    assert not Session.objects.exists()
+
+
+def test_unknown_session_profile_rejected():
+    with pytest.raises(CommandError):
+        call_command('bench_sessions', 'redis', stdout=StringIO())
+
+
+def test_unknown_session_profile_in_environment(settings, monkeypatch):
+    monkeypatch.setenv('BLOGICUM_SESSION_PROFILE', 'redis')
+    with pytest.raises(ImproperlyConfigured, match='signed_cookies'):
+        runpy.run_path(str(settings.BASE_DIR / 'blogicum' / 'settings.py'))
+
+
+def test_cached_db_profile_needs_shared_cache(settings, monkeypatch):
+    path = str(settings.BASE_DIR / 'blogicum' / 'settings.py')
+    monkeypatch.setenv('BLOGICUM_SESSION_PROFILE', 'cached_db')
+    monkeypatch.delenv('BLOGICUM_SESSION_CACHE', raising=False)
+    with pytest.raises(ImproperlyConfigured, match='BLOGICUM_SESSION_CACHE'):
+        runpy.run_path(path)
+    monkeypatch.setenv('BLOGICUM_SESSION_CACHE', '127.0.0.1:11211')
+    served = runpy.run_path(path)
+    sessions = served['CACHES'][served['SESSION_CACHE_ALIAS']]
+    assert 'memcached' in sessions['BACKEND'], (
+        'Убедитесь, что профиль сессий `cached_db` использует кеш, общий '
+        'для всех процессов.'
+    )
@@ -0,0 +1,62 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+
+@pytest.fixture
+def slow_log(settings, tmp_path):
+    from core.slowlog import slow_query_log
+
+    settings.SLOW_QUERY_THRESHOLD_MS = 0
+    settings.SLOW_QUERY_EXPLAIN_INTERVAL = 0
+    settings.SLOW_QUERY_LOG = tmp_path / 'slow.jsonl'
+    slow_query_log.explained.clear()
+    yield settings.SLOW_QUERY_LOG
+    slow_query_log.explained.clear()
+
+
+@pytest.mark.django_db
+def test_slow_queries_logged_with_view_and_plan(client, slow_log, capsys):
+    from core.slowlog import read_log
+
+    client.get(reverse('blog:index'))
+    client.get(reverse('blog:index'))
+    entries = list(read_log(slow_log))
+    assert entries, 'Убедитесь, что медленные запросы записываются в журнал.'
+    assert {entry['view'] for entry in entries} == {'blog:index'}, (
+        'Убедитесь, что в журнале указывается представление запроса.'
+    )
+    explained = [entry for entry in entries if 'plan' in entry]
+    assert explained and all(
+        isinstance(entry['full_scans'], list) for entry in explained
+    )
+    fingerprints = [entry['fingerprint'] for entry in explained]
+    assert len(fingerprints) == len(set(fingerprints)), (
+        'Убедитесь, что план запроса сохраняется только для новых запросов.'
+    )
+    call_command('slow_query_report', top=3)
+    assert 'blog:index' in capsys.readouterr().out
+
+
+def test_fingerprint_and_full_scans():
+    from core.slowlog import fingerprint, full_scans
+
+    assert fingerprint(
+        'SELECT * FROM blog_post WHERE id IN (1, 2, 3) AND title = \'x\''
+    ) == fingerprint(
+        'SELECT *  FROM blog_post WHERE id IN (%s, %s) AND title = %s'
+    ), 'Убедитесь, что отпечаток запроса не зависит от параметров.'
+    assert full_scans('sqlite', [
+        'SCAN blog_post', 'SEARCH blog_comment USING INDEX x (post_id=?)'
+    ]) == ['blog_post'], (
+        'Убедитесь, что полный просмотр таблиц публикаций отмечается.'
+    )
+
+
+@pytest.mark.django_db
+def test_slow_query_log_off_by_default(client, settings):
+    assert settings.SLOW_QUERY_LOG is None, (
+        'Убедитесь, что журнал медленных запросов выключен по умолчанию.'
+    )
+    settings.SLOW_QUERY_THRESHOLD_MS = 0
+    assert client.get(reverse('blog:index')).status_code == 200
@@ -0,0 +1,88 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.files.storage import FileSystemStorage
+from django.db import connection
+from mixer.backend.django import Mixer
+from PIL import Image
+
+from blog.models import MediaFile, Post
+
+
+def make_image_file(name='meme.png'):
+    img = Image.new('RGB', (60, 40), color=(200, 10, 10))
+    img_io = BytesIO()
+    img.save(img_io, format='PNG')
+    return ImageFile(img_io, name=name)
+
+
+@pytest.fixture
+def duplicate_posts(mixer: Mixer, media_root, user, published_category):
+    return [
+        mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            image=make_image_file(name)
+        )
+        for name in ('meme.png', 'meme_copy.png')
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_identical_uploads_stored_once(duplicate_posts, media_root):
+    first, second = duplicate_posts
+    assert first.image.name == second.image.name, (
+        'Убедитесь, что одинаковые изображения сохраняются под одним '
+        'именем, вычисленным по их содержимому.'
+    )
+    digest = first.image_sha256
+    assert first.image.name == (
+        f'post_images/{digest[:2]}/{digest[2:4]}/{digest}.png'
+    )
+    assert len(list(media_root.rglob('*.png'))) == 1
+    assert MediaFile.objects.get(name=first.image.name).references == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_file_removed_with_last_reference(duplicate_posts, media_root):
+    first, second = duplicate_posts
+    path = media_root / first.image.name
+    first.delete()
+    assert path.exists()
+    assert MediaFile.objects.get(name=second.image.name).references == 1
+    second.delete()
+    assert not path.exists()
+    assert not MediaFile.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_replaced_image_released(duplicate_posts, media_root):
+    first, second = duplicate_posts
+    old_name = first.image.name
+    for post in duplicate_posts:
+        post = Post.objects.get(pk=post.pk)
+        post.image = make_image_file('other.jpg')
+        post.save()
+    assert not (media_root / old_name).exists()
+    assert not MediaFile.objects.filter(name=old_name).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_file_unlinked_inside_transaction(
+    duplicate_posts, media_root, monkeypatch
+):
+    unlinked = []
+
+    def delete(storage, name):
+        unlinked.append(connection.in_atomic_block)
+        return unlink(storage, name)
+
+    unlink = FileSystemStorage.delete
+    monkeypatch.setattr(FileSystemStorage, 'delete', delete)
+    for post in duplicate_posts:
+        post.delete()
+    assert unlinked == [True], (
+        'Убедитесь, что файл удаляется в той же транзакции, что и его '
+        'запись MediaFile, чтобы параллельная загрузка не осталась '
+        'без файла.'
+    )
@@ -0,0 +1,44 @@
+from io import StringIO
+
+import pytest
+from conftest import N_PER_PAGE
+from django.core.management import CommandError, call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_page_rendered_with_includes():
+    from core import template_bench
+
+    results = template_bench.run(['blog/index.html'], 2, 1)
+    timings = results['pages']['blog/index.html']
+    assert timings['uncached'] > 0 and timings['cached'] > 0
+    templates = results['templates']
+    assert templates['includes/post_card.html']['calls'] == N_PER_PAGE, (
+        'Убедитесь, что время отрисовки учитывается для каждого '
+        'подключаемого шаблона.'
+    )
+    assert templates['base.html']['peak'] > 0, (
+        'Убедитесь, что учитывается память, выделенная при отрисовке.'
+    )
+
+
+def test_unknown_template_rejected():
+    with pytest.raises(CommandError):
+        call_command('bench_templates', 'blog/missing.html', stdout=StringIO())
+
+
+def test_zero_timings_reported(monkeypatch):
+    from core import template_bench
+
+    monkeypatch.setattr(template_bench, 'run', lambda *args: {
+        'pages': {
+            'blog/index.html': {'uncached': 0.0, 'cached': 0.0, 'jinja2': 0.0}
+        },
+        'templates': {},
+    })
+    out = StringIO()
+    call_command('bench_templates', 'blog/index.html', stdout=out)
+    assert 'blog/index.html' in out.getvalue(), (
+        'Убедитесь, что отчёт выводится и при нулевом времени отрисовки.'
+    )
@@ -0,0 +1,88 @@
+import logging
+import time
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+QUERY_DELAY = 0.05
+
+
+def test_server_timing_header(client, settings, caplog):
+    settings.SERVER_TIMING_SAMPLE_RATE = 1.0
+    settings.SERVER_TIMING_PUBLIC = True
+    with caplog.at_level(logging.INFO, logger='core.timing'):
+        response = client.get(reverse('blog:index'))
+    header = response['Server-Timing']
+    for metric in ('total;dur=', 'db;dur=', 'tpl;dur=', 'cache;desc='):
+        assert metric in header, (
+            f'Убедитесь, что заголовок Server-Timing содержит {metric}'
+        )
+    assert 'queries' in header
+    record = caplog.records[-1]
+    assert record.timings['queries'] > 0, (
+        'Убедитесь, что запросы к базе данных учитываются в журнале.'
+    )
+    assert record.timings['template_ms'] > 0
+
+
+def test_server_timing_hidden_from_public(client, admin_client, settings):
+    settings.SERVER_TIMING_SAMPLE_RATE = 1.0
+    settings.SERVER_TIMING_PUBLIC = False
+    url = reverse('blog:index')
+    assert 'Server-Timing' not in client.get(url), (
+        'Убедитесь, что заголовок Server-Timing без настройки '
+        'SERVER_TIMING_PUBLIC получают только сотрудники.'
+    )
+    assert 'Server-Timing' in admin_client.get(url)
+    settings.SERVER_TIMING_SAMPLE_RATE = 0
+    assert 'Server-Timing' not in admin_client.get(url)
+
+
+def test_cache_lookups_counted():
+    from core.timing import RequestTimings, current_timings
+
+    timings = RequestTimings()
+    token = current_timings.set(timings)
+    try:
+        cache.set('answer', 42)
+        assert cache.get('answer') == 42
+        assert cache.get('question', 'default') == 'default'
+        cache.get_many(['answer', 'question'])
+    finally:
+        current_timings.reset(token)
+    assert (timings.cache_hits, timings.cache_misses) == (2, 2)
+
+
+def test_template_time_excludes_queries(client, settings, caplog, monkeypatch,
+                                        mixer, user, published_category):
+    from core import middleware
+    from core.timing import time_queries
+
+    def slow_queries(execute, sql, params, many, context):
+        def slow_execute(*args):
+            time.sleep(QUERY_DELAY)
+            return execute(*args)
+
+        return time_queries(slow_execute, sql, params, many, context)
+
+    mixer.cycle(3).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1),
+    )
+    monkeypatch.setattr(middleware, 'time_queries', slow_queries)
+    settings.SERVER_TIMING_SAMPLE_RATE = 1.0
+    with caplog.at_level(logging.INFO, logger='core.timing'):
+        client.get(reverse('blog:index'))
+    timings = caplog.records[-1].timings
+    # Each value is rounded to 0.1 ms.
+    split = timings['template_ms'] + timings['db_ms']
+    assert split <= timings['total_ms'] + 0.2, (
+        'Убедитесь, что время запросов, выполненных при отрисовке шаблона, '
+        'не учитывается в tpl повторно.'
+    )
+    assert timings['template_ms'] < QUERY_DELAY * 1000
@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+User = get_user_model()
+
+
+@pytest.fixture
+def blog_content(mixer: Mixer, user, another_user, published_category):
+    posts = mixer.cycle(3).blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=timezone.now() - timedelta(days=1)
+    )
+    for post in posts:
+        mixer.cycle(2).blend('blog.Comment', post=post, author=another_user)
+    mixer.blend('blog.Profanity', word='ругательство')
+    return posts
+
+
+@pytest.fixture
+def dump(tmp_path, blog_content):
+    path = tmp_path / 'blog.jsonl.gz'
+    call_command('export_blog', str(path), chunk_size=2)
+    return path
+
+
+def test_import_remaps_keys(dump, blog_content, published_category):
+    from blog.models import Category, Comment, Post, Profanity
+
+    call_command('import_blog', str(dump), batch_size=2)
+    assert Post.objects.count() == 6
+    assert Category.objects.count() == 1, (
+        'Убедитесь, что категории с существующим slug не дублируются.'
+    )
+    assert Profanity.objects.count() == 1
+    original = blog_content[0]
+    copy = Post.objects.exclude(
+        pk__in=[post.pk for post in blog_content]
+    ).get(title=original.title)
+    assert copy.category == published_category
+    assert copy.author == original.author
+    assert copy.created_at == original.created_at, (
+        'Убедитесь, что при импорте сохраняется дата создания.'
+    )
+    assert sorted(copy.comments.values_list('text', flat=True)) == sorted(
+        original.comments.values_list('text', flat=True)
+    ), 'Убедитесь, что комментарии привязываются к новым публикациям.'
+    assert Comment.objects.count() == 12
+
+
+def test_import_creates_missing_authors(dump, user, another_user):
+    from blog.models import Category, Post
+
+    username = user.username
+    User.objects.all().delete()
+    Category.objects.all().delete()
+    call_command('import_blog', str(dump))
+    restored = User.objects.get(username=username)
+    assert not restored.has_usable_password()
+    assert Post.objects.filter(author=restored).count() == 3, (
+        'Убедитесь, что публикации импортируются вместе с авторами.'
+    )
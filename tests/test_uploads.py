@@ -0,0 +1,92 @@
+from http import HTTPStatus
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client
+from django.utils import timezone
+from PIL import Image
+
+from blog.models import Post
+
+
+def image_upload(size=(50, 50), image_format='PNG', name='upload.png'):
+    img_io = BytesIO()
+    Image.new('RGB', size, color=(1, 2, 3)).save(img_io, format=image_format)
+    return SimpleUploadedFile(name, img_io.getvalue())
+
+
+@pytest.fixture
+def post_data(published_category, published_location, media_root):
+    return {
+        'title': 'Заголовок',
+        'text': 'Текст',
+        'pub_date': timezone.localtime().strftime('%Y-%m-%dT%H:%M'),
+        'category': published_category.id,
+        'location': published_location.id,
+    }
+
+
+def create_post(user_client, post_data, image):
+    return user_client.post('/posts/create/', {**post_data, 'image': image})
+
+
+@pytest.mark.django_db
+def test_valid_upload_accepted(user_client, post_data):
+    response = create_post(user_client, post_data, image_upload())
+    assert response.status_code == HTTPStatus.FOUND
+    assert Post.objects.get().image_width == 50
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    ('limits', 'image'),
+    [
+        ({'POST_IMAGE_MAX_BYTES': 1024},
+         image_upload((300, 300), 'BMP', 'big.bmp')),
+        ({'POST_IMAGE_MAX_PIXELS': 1_000_000}, image_upload((2000, 2000))),
+        ({}, image_upload((20, 20), 'TIFF', 'scan.tiff')),
+    ],
+    ids=['bytes', 'pixels', 'format'],
+)
+def test_upload_rejected_early(user_client, post_data, settings,
+                               limits, image):
+    for name, value in limits.items():
+        setattr(settings, name, value)
+    response = create_post(user_client, post_data, image)
+    assert response.status_code == HTTPStatus.OK
+    assert 'image' in response.context['form'].errors, (
+        'Убедитесь, что слишком большие изображения и неподдерживаемые '
+        'форматы отклоняются с ошибкой формы.'
+    )
+    assert not Post.objects.exists()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('view', ('create', 'edit'))
+def test_csrf_enforced_on_uploads(mixer, user, post_data, settings, view):
+    url = '/posts/create/'
+    if view == 'edit':
+        post = mixer.blend(
+            'blog.Post', author=user, category_id=post_data['category'],
+            location_id=post_data['location'], image='',
+        )
+        url = f'/posts/{post.id}/edit/'
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+    client.get(url)
+    data = {**post_data, 'image': image_upload()}
+    response = client.post(url, data)
+    assert response.status_code == HTTPStatus.FORBIDDEN, (
+        'Убедитесь, что форма загрузки изображения по-прежнему '
+        'проверяет CSRF-токен.'
+    )
+    token = client.cookies[settings.CSRF_COOKIE_NAME].value
+    data = {
+        **post_data, 'image': image_upload(), 'csrfmiddlewaretoken': token
+    }
+    response = client.post(url, data)
+    assert response.status_code == HTTPStatus.FOUND, (
+        'Убедитесь, что форма с верным CSRF-токеном принимается.'
+    )
+    assert Post.objects.get().image_width == 50